@@ -0,0 +1,62 @@
+import asyncio
+from logging.config import fileConfig
+
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from alembic import context
+
+from app.database import Base, DATABASE_URL
+from app.models import (  # noqa: F401  registra todas las tablas en Base.metadata
+    cambio_ari, cliente, cuenta, egreso, factura, habitacion, ingreso, noche_ocupada, pago, parametro,
+    periodo_cerrado, reportes, reserva, resumen_diario, usuario
+)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def incluir_objeto(objeto, nombre, tipo, reflejado, comparado_con) -> bool:
+    """Dejar fuera de autogenerate las vistas materializadas de reportes (migración 0007)"""
+    return not (tipo == "table" and objeto.info.get("es_vista"))
+
+
+def run_migrations_offline() -> None:
+    """Generar el SQL de las migraciones sin conectarse a la base de datos"""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_object=incluir_objeto,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=incluir_objeto)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    connectable = create_async_engine(DATABASE_URL, poolclass=pool.NullPool)
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_async_migrations())
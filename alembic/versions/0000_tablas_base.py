@@ -0,0 +1,131 @@
+"""Tablas base del sistema (las de base/nombre-reservas más parametros)
+
+Permite crear la base de datos desde cero solo con `alembic upgrade head`.
+Las tablas se crean si no existen: en una base creada con el script SQL o
+por versiones anteriores de la aplicación esta migración no cambia nada.
+Las vistas de reportes las crea la migración 0007.
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0000"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "roles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nombre", sa.String(50), nullable=False, unique=True),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "usuarios",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nombre", sa.String(100), nullable=False),
+        sa.Column("correo", sa.String(100), nullable=False, unique=True),
+        sa.Column("contraseña", sa.Text(), nullable=False),
+        sa.Column("rol_id", sa.Integer(), sa.ForeignKey("roles.id")),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "clientes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nombre", sa.String(100), nullable=False),
+        sa.Column("documento_identidad", sa.String(20), nullable=False, unique=True),
+        sa.Column("correo", sa.String(100)),
+        sa.Column("telefono", sa.String(20)),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "habitaciones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("numero", sa.String(10), nullable=False, unique=True),
+        sa.Column("tipo", sa.String(50), nullable=False),
+        sa.Column("precio_noche", sa.Numeric(10, 2), nullable=False),
+        sa.Column("estado", sa.String(20), server_default="disponible"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "reservas",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("cliente_id", sa.Integer(), sa.ForeignKey("clientes.id")),
+        sa.Column("habitacion_id", sa.Integer(), sa.ForeignKey("habitaciones.id")),
+        sa.Column("fecha_inicio", sa.Date(), nullable=False),
+        sa.Column("fecha_fin", sa.Date(), nullable=False),
+        sa.Column("estado", sa.String(20), server_default="reservada"),
+        sa.Column("fecha_reserva", sa.TIMESTAMP(), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "facturas",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("reserva_id", sa.Integer(), sa.ForeignKey("reservas.id")),
+        sa.Column("fecha_emision", sa.Date(), nullable=False),
+        sa.Column("total", sa.Numeric(10, 2), nullable=False),
+        sa.Column("estado", sa.String(20), server_default="pendiente"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "pagos",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("factura_id", sa.Integer(), sa.ForeignKey("facturas.id")),
+        sa.Column("fecha_pago", sa.Date(), nullable=False),
+        sa.Column("monto", sa.Numeric(10, 2), nullable=False),
+        sa.Column("metodo_pago", sa.String(50), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "ingresos",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("reserva_id", sa.Integer(), sa.ForeignKey("reservas.id")),
+        sa.Column("monto", sa.Numeric(10, 2), nullable=False),
+        sa.Column("descripcion", sa.Text()),
+        sa.Column("fecha", sa.Date(), server_default=sa.func.current_date()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "egresos",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("descripcion", sa.Text(), nullable=False),
+        sa.Column("monto", sa.Numeric(10, 2), nullable=False),
+        sa.Column("fecha", sa.Date(), server_default=sa.func.current_date()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "cuentas",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("codigo", sa.String(100), nullable=False, unique=True),
+        sa.Column("nombre", sa.String(100), nullable=False),
+        sa.Column("tipo", sa.String(20), nullable=False),
+        sa.Column("nivel", sa.Integer(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "parametros",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("clave", sa.String(50), nullable=False),
+        sa.Column("valor", sa.Text(), nullable=False),
+        sa.Column("descripcion", sa.Text()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_parametros_clave", "parametros", ["clave"], unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_parametros_clave", table_name="parametros")
+    for tabla in (
+        "parametros", "cuentas", "egresos", "ingresos", "pagos", "facturas",
+        "reservas", "habitaciones", "clientes", "usuarios", "roles",
+    ):
+        op.drop_table(tabla)
@@ -0,0 +1,51 @@
+"""Restricción de exclusión contra reservas solapadas
+
+Agrega la columna generada reservas.periodo (daterange semiabierto
+[fecha_inicio, fecha_fin)) y una restricción EXCLUDE USING gist que impide
+dos reservas activas de la misma habitación con noches en común.
+
+Si ya existen reservas activas solapadas, PostgreSQL rechaza la
+restricción y hay que resolverlas antes de migrar.
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import DATERANGE
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = "0000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # btree_gist permite usar '=' sobre habitacion_id dentro de un índice gist
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column(
+        "reservas",
+        sa.Column(
+            "periodo",
+            DATERANGE(),
+            sa.Computed("daterange(fecha_inicio, fecha_fin, '[)')", persisted=True),
+        ),
+    )
+    op.create_exclude_constraint(
+        "reservas_sin_solapamiento",
+        "reservas",
+        ("habitacion_id", "="),
+        ("periodo", "&&"),
+        where="estado = 'reservada'",
+        using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("reservas_sin_solapamiento", "reservas")
+    op.drop_column("reservas", "periodo")
@@ -0,0 +1,39 @@
+"""La restricción de solapamiento cubre también las reservas en curso
+
+Con la máquina de estados de reservas, una reserva con check-in
+('en_curso') sigue ocupando la habitación.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recrear_restriccion(where: str) -> None:
+    op.drop_constraint("reservas_sin_solapamiento", "reservas")
+    op.create_exclude_constraint(
+        "reservas_sin_solapamiento",
+        "reservas",
+        ("habitacion_id", "="),
+        ("periodo", "&&"),
+        where=where,
+        using="gist",
+    )
+
+
+def upgrade() -> None:
+    _recrear_restriccion("estado IN ('reservada', 'en_curso')")
+
+
+def downgrade() -> None:
+    _recrear_restriccion("estado = 'reservada'")
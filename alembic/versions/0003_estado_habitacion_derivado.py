@@ -0,0 +1,34 @@
+"""La ocupación de las habitaciones se deriva de las reservas
+
+habitaciones.estado ya no guarda 'ocupada'; solo el estado operativo
+('disponible' o un bloqueo manual como 'mantenimiento').
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE habitaciones SET estado = 'disponible' WHERE estado = 'ocupada'")
+
+
+def downgrade() -> None:
+    op.execute("""
+        UPDATE habitaciones h SET estado = 'ocupada'
+        WHERE h.estado = 'disponible'
+          AND EXISTS (
+              SELECT 1 FROM reservas r
+              WHERE r.habitacion_id = h.id AND r.estado IN ('reservada', 'en_curso')
+          )
+    """)
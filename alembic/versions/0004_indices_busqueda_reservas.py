@@ -0,0 +1,42 @@
+"""Índices compuestos para la búsqueda paginada de reservas
+
+Cada filtro de /reservas/buscar tiene un índice (filtro, id) que sirve
+también el orden por id del cursor; el filtro por fechas usa un índice
+gist sobre periodo. Se crean con CONCURRENTLY para no bloquear escrituras.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICES = (
+    ("ix_reservas_cliente_id_id", ["cliente_id", "id"], None),
+    ("ix_reservas_habitacion_id_id", ["habitacion_id", "id"], None),
+    ("ix_reservas_estado_id", ["estado", "id"], None),
+    ("ix_reservas_periodo", ["periodo"], "gist"),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nombre, columnas, metodo in INDICES:
+            op.create_index(
+                nombre, "reservas", columnas,
+                postgresql_using=metodo, postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nombre, _, _ in INDICES:
+            op.drop_index(nombre, table_name="reservas", postgresql_concurrently=True, if_exists=True)
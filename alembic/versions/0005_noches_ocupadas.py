@@ -0,0 +1,57 @@
+"""Tabla de hechos noches_ocupadas (una fila por habitación y noche ocupada)
+
+Se llena con las noches de las reservas reservadas, en curso o completadas.
+Para tablas de reservas muy grandes se puede crear la tabla vacía con
+`alembic upgrade 0005 -x sin_relleno=1` y luego ejecutar
+`python -m app.comandos.noches_ocupadas rellenar` por lotes.
+
+La tabla y el índice se crean si no existen y el relleno no duplica noches:
+si versiones anteriores de la aplicación crearon la tabla vacía al iniciar,
+la migración igual la llena.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "noches_ocupadas",
+        sa.Column("reserva_id", sa.Integer(), sa.ForeignKey("reservas.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("fecha", sa.Date(), nullable=False),
+        sa.Column("habitacion_id", sa.Integer(), sa.ForeignKey("habitaciones.id"), nullable=False),
+        sa.Column("estado", sa.String(20), nullable=False),
+        sa.PrimaryKeyConstraint("reserva_id", "fecha"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_noches_ocupadas_fecha_habitacion", "noches_ocupadas", ["fecha", "habitacion_id"], if_not_exists=True
+    )
+
+    if context.get_x_argument(as_dictionary=True).get("sin_relleno"):
+        return
+    op.execute("""
+        INSERT INTO noches_ocupadas (reserva_id, fecha, habitacion_id, estado)
+        SELECT r.id, g.fecha::date, r.habitacion_id, r.estado
+        FROM reservas r
+        CROSS JOIN LATERAL generate_series(r.fecha_inicio, r.fecha_fin - 1, interval '1 day') AS g(fecha)
+        WHERE r.estado IN ('reservada', 'en_curso', 'completada')
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_noches_ocupadas_fecha_habitacion", table_name="noches_ocupadas")
+    op.drop_table("noches_ocupadas")
@@ -0,0 +1,33 @@
+"""Registro de cambios ARI (disponibilidad y tarifas) para el feed incremental
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cambios_ari",
+        sa.Column("seq", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("tipo", sa.String(50), nullable=False),
+        sa.Column("fecha_inicio", sa.Date()),
+        sa.Column("fecha_fin", sa.Date()),
+        sa.Column("motivo", sa.String(30), nullable=False),
+        sa.Column("registrado", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cambios_ari")
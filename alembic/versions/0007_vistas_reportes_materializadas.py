@@ -0,0 +1,86 @@
+"""Vistas de reportes como vistas materializadas con índices
+
+Define en el repositorio las vistas que usan /reportes/* y las materializa.
+Cada una tiene un índice único (requisito de REFRESH ... CONCURRENTLY) y
+los índices de los filtros de los reportes. La aplicación las refresca en
+segundo plano cuando cambian las tablas de origen (app/services/vistas_reportes.py).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VISTAS = {
+    "vistadellibro_diario": """
+        SELECT 'Ingreso'::varchar(20) AS tipo, i.id AS movimiento_id, i.fecha, i.descripcion, i.monto
+        FROM ingresos i
+        UNION ALL
+        SELECT 'Egreso'::varchar(20) AS tipo, e.id AS movimiento_id, e.fecha, e.descripcion, e.monto
+        FROM egresos e
+    """,
+    "vistadelregistro_huespedes": """
+        SELECT r.id AS reserva_id, c.nombre AS cliente, c.documento_identidad, c.correo, c.telefono,
+               r.fecha_inicio, r.fecha_fin, h.numero AS habitacion, h.tipo AS tipo_habitacion,
+               r.estado AS estado_reserva
+        FROM reservas r
+        JOIN clientes c ON c.id = r.cliente_id
+        JOIN habitaciones h ON h.id = r.habitacion_id
+    """,
+    "vistadelregistro_ocupacion": """
+        SELECT r.id AS reserva_id, h.numero AS habitacion, h.tipo, r.fecha_inicio, r.fecha_fin,
+               r.estado AS estado_reserva, c.nombre AS cliente
+        FROM reservas r
+        JOIN habitaciones h ON h.id = r.habitacion_id
+        JOIN clientes c ON c.id = r.cliente_id
+    """,
+}
+
+INDICES = (
+    ("ux_vistadellibro_diario_movimiento", "vistadellibro_diario", "tipo, movimiento_id", True),
+    ("ix_vistadellibro_diario_fecha", "vistadellibro_diario", "fecha DESC, tipo", False),
+    ("ux_vistadelregistro_huespedes_reserva", "vistadelregistro_huespedes", "reserva_id", True),
+    ("ix_vistadelregistro_huespedes_fecha_inicio", "vistadelregistro_huespedes", "fecha_inicio DESC", False),
+    ("ix_vistadelregistro_huespedes_documento", "vistadelregistro_huespedes", "documento_identidad", False),
+    ("ux_vistadelregistro_ocupacion_reserva", "vistadelregistro_ocupacion", "reserva_id", True),
+    ("ix_vistadelregistro_ocupacion_habitacion", "vistadelregistro_ocupacion",
+     "habitacion, fecha_inicio DESC", False),
+)
+
+
+def _quitar_relacion(nombre: str) -> None:
+    # La vista pudo existir como vista normal (creada a mano) o como tabla vacía
+    # creada por Base.metadata.create_all antes de excluir los modelos de vistas
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_class WHERE relname = '{nombre}' AND relkind = 'v') THEN
+                DROP VIEW {nombre};
+            ELSIF EXISTS (SELECT 1 FROM pg_class WHERE relname = '{nombre}' AND relkind = 'r') THEN
+                DROP TABLE {nombre};
+            END IF;
+        END $$
+    """)
+
+
+def upgrade() -> None:
+    for nombre, consulta in VISTAS.items():
+        _quitar_relacion(nombre)
+        op.execute(f"CREATE MATERIALIZED VIEW {nombre} AS {consulta} WITH DATA")
+    for indice, vista, columnas, unico in INDICES:
+        op.execute(f"CREATE {'UNIQUE ' if unico else ''}INDEX {indice} ON {vista} ({columnas})")
+
+
+def downgrade() -> None:
+    for nombre, consulta in VISTAS.items():
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {nombre}")
+        op.execute(f"CREATE VIEW {nombre} AS {consulta}")
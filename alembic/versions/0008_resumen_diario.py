@@ -0,0 +1,55 @@
+"""Resumen diario de ingresos y egresos para el resumen financiero
+
+La tabla se crea si no existe y el relleno recalcula cada día desde
+ingresos y egresos: si versiones anteriores de la aplicación crearon la
+tabla al iniciar, la migración igual deja los totales completos.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resumen_diario",
+        sa.Column("fecha", sa.Date(), primary_key=True),
+        sa.Column("total_ingresos", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("total_egresos", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("cantidad_ingresos", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cantidad_egresos", sa.Integer(), nullable=False, server_default="0"),
+        if_not_exists=True,
+    )
+    # Movimientos existentes; los nuevos los acumulan crear_ingreso y crear_egreso
+    op.execute("""
+        INSERT INTO resumen_diario (fecha, total_ingresos, total_egresos, cantidad_ingresos, cantidad_egresos)
+        SELECT fecha, SUM(ingresos), SUM(egresos), SUM(n_ingresos), SUM(n_egresos)
+        FROM (
+            SELECT fecha, SUM(monto) AS ingresos, 0 AS egresos, COUNT(*) AS n_ingresos, 0 AS n_egresos
+            FROM ingresos WHERE fecha IS NOT NULL GROUP BY fecha
+            UNION ALL
+            SELECT fecha, 0, SUM(monto), 0, COUNT(*)
+            FROM egresos WHERE fecha IS NOT NULL GROUP BY fecha
+        ) movimientos
+        GROUP BY fecha
+        ON CONFLICT (fecha) DO UPDATE SET
+            total_ingresos = EXCLUDED.total_ingresos,
+            total_egresos = EXCLUDED.total_egresos,
+            cantidad_ingresos = EXCLUDED.cantidad_ingresos,
+            cantidad_egresos = EXCLUDED.cantidad_egresos
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("resumen_diario")
@@ -0,0 +1,33 @@
+"""Índices (fecha, id) en ingresos y egresos para los últimos movimientos del dashboard
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLAS = ("ingresos", "egresos")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for tabla in TABLAS:
+            op.create_index(
+                f"ix_{tabla}_fecha_id", tabla, ["fecha", "id"],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for tabla in TABLAS:
+            op.drop_index(f"ix_{tabla}_fecha_id", table_name=tabla, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,45 @@
+"""Cierre de períodos contables con instantáneas comprimidas de los reportes
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "periodos_cerrados",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("anio", sa.Integer(), nullable=False),
+        sa.Column("mes", sa.Integer(), nullable=False),
+        sa.Column("fecha_inicio", sa.Date(), nullable=False),
+        sa.Column("fecha_fin", sa.Date(), nullable=False),
+        sa.Column("cerrado_en", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("anio", "mes", name="uq_periodos_cerrados_anio_mes"),
+    )
+    op.create_table(
+        "instantaneas_reportes",
+        sa.Column(
+            "periodo_id", sa.Integer(),
+            sa.ForeignKey("periodos_cerrados.id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("reporte", sa.String(30), primary_key=True),
+        sa.Column("filas", sa.Integer(), nullable=False),
+        sa.Column("contenido", sa.LargeBinary(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("instantaneas_reportes")
+    op.drop_table("periodos_cerrados")
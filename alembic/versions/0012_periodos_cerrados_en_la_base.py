@@ -0,0 +1,63 @@
+"""Rechazar en la base los movimientos de períodos cerrados
+
+Un trigger en ingresos y egresos rechaza, dentro de la misma transacción que
+escribe, las altas, cambios y bajas con fecha en un período cerrado. El cierre
+bloquea ingresos y egresos en modo SHARE mientras toma las instantáneas: una
+escritura concurrente espera a que termine y, al continuar, la consulta del
+trigger (con una instantánea nueva en READ COMMITTED) ya ve el período.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, Sequence[str], None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLAS = ("ingresos", "egresos")
+
+
+def upgrade() -> None:
+    # check_violation (23514): la aplicación lo traduce a HTTP 400
+    op.execute("""
+        CREATE OR REPLACE FUNCTION verificar_periodo_abierto() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' AND EXISTS (
+                SELECT 1 FROM periodos_cerrados p WHERE OLD.fecha BETWEEN p.fecha_inicio AND p.fecha_fin
+            ) THEN
+                RAISE EXCEPTION 'El período contable de % está cerrado', to_char(OLD.fecha, 'YYYY-MM')
+                    USING ERRCODE = 'check_violation';
+            END IF;
+            IF TG_OP <> 'DELETE' AND EXISTS (
+                SELECT 1 FROM periodos_cerrados p WHERE NEW.fecha BETWEEN p.fecha_inicio AND p.fecha_fin
+            ) THEN
+                RAISE EXCEPTION 'El período contable de % está cerrado', to_char(NEW.fecha, 'YYYY-MM')
+                    USING ERRCODE = 'check_violation';
+            END IF;
+            IF TG_OP = 'DELETE' THEN
+                RETURN OLD;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for tabla in TABLAS:
+        op.execute(f"DROP TRIGGER IF EXISTS {tabla}_periodo_abierto ON {tabla}")
+        op.execute(f"""
+            CREATE TRIGGER {tabla}_periodo_abierto
+            BEFORE INSERT OR UPDATE OR DELETE ON {tabla}
+            FOR EACH ROW EXECUTE FUNCTION verificar_periodo_abierto()
+        """)
+
+
+def downgrade() -> None:
+    for tabla in TABLAS:
+        op.execute(f"DROP TRIGGER IF EXISTS {tabla}_periodo_abierto ON {tabla}")
+    op.execute("DROP FUNCTION IF EXISTS verificar_periodo_abierto()")
@@ -0,0 +1,43 @@
+"""Índices (fecha DESC NULLS LAST, id DESC) para los últimos movimientos
+
+Los últimos movimientos ordenan con NULLS LAST para que las filas sin fecha
+no desplacen a las más recientes; el índice (fecha, id) leído hacia atrás da
+NULLS FIRST y ya no sirve para ese orden, así que se reemplaza.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, Sequence[str], None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLAS = ("ingresos", "egresos")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for tabla in TABLAS:
+            op.create_index(
+                f"ix_{tabla}_fecha_desc_id", tabla, [sa.text("fecha DESC NULLS LAST"), sa.text("id DESC")],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.drop_index(f"ix_{tabla}_fecha_id", table_name=tabla, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for tabla in TABLAS:
+            op.create_index(
+                f"ix_{tabla}_fecha_id", tabla, ["fecha", "id"],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.drop_index(f"ix_{tabla}_fecha_desc_id", table_name=tabla, postgresql_concurrently=True, if_exists=True)
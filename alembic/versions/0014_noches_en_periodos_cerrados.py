@@ -0,0 +1,36 @@
+"""Rechazar en la base los cambios de ocupación de períodos cerrados
+
+El cierre guarda una instantánea de la ocupación diaria, que se lee de
+noches_ocupadas. El mismo trigger de ingresos y egresos (migración 0012)
+rechaza las altas y bajas de noches con fecha en un período cerrado y los
+cambios de fecha o habitación; los cambios de estado (check-in, check-out)
+no alteran la ocupación y se admiten. El cierre bloquea noches_ocupadas en
+modo SHARE igual que las tablas de movimientos.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, Sequence[str], None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS noches_ocupadas_periodo_abierto ON noches_ocupadas")
+    op.execute("""
+        CREATE TRIGGER noches_ocupadas_periodo_abierto
+        BEFORE INSERT OR DELETE OR UPDATE OF fecha, habitacion_id ON noches_ocupadas
+        FOR EACH ROW EXECUTE FUNCTION verificar_periodo_abierto()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS noches_ocupadas_periodo_abierto ON noches_ocupadas")
@@ -0,0 +1,61 @@
+"""Mantenimiento de la tabla noches_ocupadas.
+
+Uso:
+    python -m app.comandos.noches_ocupadas rellenar [--lote 10000]
+    python -m app.comandos.noches_ocupadas verificar [--reparar]
+
+`rellenar` genera las noches de las reservas existentes (no duplica las que
+ya están). `verificar` compara la tabla con las reservas y termina con código
+1 si hay diferencias; con --reparar además las corrige.
+"""
+import argparse
+import asyncio
+import sys
+
+from app.database import AsyncSessionLocal, engine
+from app.crud.ocupacion import rellenar_noches, verificar_noches
+
+
+async def rellenar(lote: int) -> int:
+    async with AsyncSessionLocal() as db:
+        insertadas = await rellenar_noches(db, lote=lote)
+    print(f"Noches insertadas: {insertadas}")
+    return 0
+
+
+async def verificar(reparar: bool) -> int:
+    async with AsyncSessionLocal() as db:
+        diferencias = await verificar_noches(db, reparar=reparar)
+    for nombre, cantidad in diferencias.items():
+        print(f"Noches {nombre}: {cantidad}")
+    if not any(diferencias.values()):
+        print("noches_ocupadas es consistente con las reservas")
+        return 0
+    if reparar:
+        print("Diferencias corregidas")
+        return 0
+    return 1
+
+
+async def ejecutar(args) -> int:
+    try:
+        if args.comando == "rellenar":
+            return await rellenar(args.lote)
+        return await verificar(args.reparar)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    parser_rellenar = subcomandos.add_parser("rellenar", help="Generar las noches de las reservas existentes")
+    parser_rellenar.add_argument("--lote", type=int, default=10_000, help="Reservas por transacción")
+    parser_verificar = subcomandos.add_parser("verificar", help="Comparar noches_ocupadas con las reservas")
+    parser_verificar.add_argument("--reparar", action="store_true", help="Corregir las diferencias encontradas")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(ejecutar(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+from datetime import date, timedelta
+from typing import List, Optional
+from sqlalchemy import Date, String, func, insert, literal, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.cambio_ari import CambioARI
+from app.models.habitacion import Habitacion
+from app.models.reserva import Reserva, ESTADOS_ACTIVOS
+from app.schemas.habitacion import CambiosARI, CeldaARI
+from app.services.disponibilidad import matriz_disponibilidad, noches_cambiadas
+
+# Bloqueo consultivo que ordena las escrituras en cambios_ari (ver _serializar_registro)
+CLAVE_BLOQUEO_ARI = 0x415249
+_BLOQUEAR_REGISTRO = text("SELECT pg_advisory_xact_lock(:clave)").bindparams(clave=CLAVE_BLOQUEO_ARI)
+
+
+async def _serializar_registro(db: AsyncSession) -> None:
+    """Tomar el bloqueo del registro ARI hasta el fin de la transacción del llamador.
+
+    `seq` se asigna al insertar, no al confirmar: sin el bloqueo, una
+    transacción con un seq menor podría confirmarse después de que un cliente
+    del feed ya avanzó `desde_seq` más allá, y ese cambio no se entregaría
+    nunca. Con el bloqueo, quien inserta en cambios_ari espera a que confirme
+    o deshaga el anterior, así que los seq se hacen visibles en orden y todo
+    seq menor o igual al último visible ya está confirmado. Se toma justo
+    antes del INSERT (lo último antes del commit), así que se retiene poco.
+    """
+    await db.execute(_BLOQUEAR_REGISTRO)
+
+
+async def registrar_cambio(
+    db: AsyncSession,
+    tipo: str,
+    motivo: str,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None
+) -> None:
+    """Agregar un cambio ARI a la transacción en curso (se guarda con el commit del llamador)"""
+    await _serializar_registro(db)
+    db.add(CambioARI(tipo=tipo, motivo=motivo, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin))
+
+
+async def registrar_cambio_habitacion(
+    db: AsyncSession,
+    habitacion_id: int,
+    motivo: str,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None
+) -> None:
+    """Registrar un cambio para el tipo de la habitación, sin cargarla (sin confirmar la transacción)"""
+    await _serializar_registro(db)
+    await db.execute(
+        insert(CambioARI).from_select(
+            ["tipo", "motivo", "fecha_inicio", "fecha_fin"],
+            select(
+                Habitacion.tipo,
+                literal(motivo, String),
+                literal(fecha_inicio, Date),
+                literal(fecha_fin, Date),
+            ).where(Habitacion.id == habitacion_id)
+        )
+    )
+
+
+async def registrar_cambios_reservas(db: AsyncSession, reserva_ids: List[int], motivo: str) -> None:
+    """Registrar las noches de varias reservas como cambiadas (sin confirmar la transacción)"""
+    if not reserva_ids:
+        return
+    await _serializar_registro(db)
+    await db.execute(
+        insert(CambioARI).from_select(
+            ["tipo", "motivo", "fecha_inicio", "fecha_fin"],
+            select(Habitacion.tipo, literal(motivo, String), Reserva.fecha_inicio, Reserva.fecha_fin)
+            .join(Habitacion, Reserva.habitacion_id == Habitacion.id)
+            .where(Reserva.id.in_(reserva_ids))
+        )
+    )
+
+
+async def obtener_ultimo_seq(db: AsyncSession) -> int:
+    """Último número de secuencia del registro de cambios (0 si está vacío).
+
+    Todos los cambios con un seq menor o igual ya están confirmados (ver
+    _serializar_registro): es un punto de partida seguro para el feed.
+    """
+    result = await db.execute(select(func.coalesce(func.max(CambioARI.seq), 0)))
+    return result.scalar()
+
+
+async def obtener_cambios(
+    db: AsyncSession,
+    desde_seq: int,
+    fecha_inicio: date,
+    dias: int,
+    limite: int = 5000
+) -> CambiosARI:
+    """Celdas (tipo, fecha) de la ventana cuya disponibilidad o tarifa cambió después de `desde_seq`.
+
+    Se leen a lo sumo `limite` cambios; si hay más, `hay_mas` es verdadero y se
+    debe volver a consultar con `hasta_seq`. El costo depende de los cambios
+    leídos y de los tipos que tocan, no del inventario completo.
+
+    Garantía: como las escrituras en cambios_ari se serializan hasta el commit,
+    ningún cambio aparece después con un seq menor o igual a `hasta_seq`. Un
+    cliente que siempre consulta desde el último `hasta_seq` recibe todos los
+    cambios al menos una vez (una celda puede repetirse, nunca faltar).
+    """
+    result = await db.execute(
+        select(CambioARI.seq, CambioARI.tipo, CambioARI.fecha_inicio, CambioARI.fecha_fin)
+        .where(CambioARI.seq > desde_seq)
+        .order_by(CambioARI.seq)
+        .limit(limite + 1)
+    )
+    cambios = result.all()
+    hay_mas = len(cambios) > limite
+    cambios = cambios[:limite]
+    hasta_seq = cambios[-1].seq if cambios else desde_seq
+
+    mascaras = noches_cambiadas(((c.tipo, c.fecha_inicio, c.fecha_fin) for c in cambios), fecha_inicio, dias)
+    if not mascaras:
+        return CambiosARI(desde_seq=desde_seq, hasta_seq=hasta_seq, hay_mas=hay_mas, celdas=[])
+
+    # Recalcular solo los tipos tocados y el tramo de noches que abarcan sus cambios
+    tipos = list(mascaras)
+    columnas = [i for mascara in mascaras.values() for i in mascara.nonzero()[0][[0, -1]]]
+    primera, ultima = min(columnas), max(columnas)
+    tramo_inicio = fecha_inicio + timedelta(days=int(primera))
+    tramo_dias = int(ultima - primera) + 1
+
+    result = await db.execute(
+        select(Habitacion.tipo, func.count(Habitacion.id), func.min(Habitacion.precio_noche))
+        .where(Habitacion.tipo.in_(tipos), Habitacion.estado == "disponible")
+        .group_by(Habitacion.tipo)
+    )
+    inventario = {tipo: (total, precio) for tipo, total, precio in result.all()}
+
+    tramo = func.daterange(
+        literal(tramo_inicio, Date), literal(tramo_inicio + timedelta(days=tramo_dias), Date), "[)"
+    )
+    result = await db.execute(
+        select(Habitacion.tipo, Reserva.fecha_inicio, Reserva.fecha_fin)
+        .join(Habitacion, Reserva.habitacion_id == Habitacion.id)
+        .where(
+            Habitacion.tipo.in_(tipos),
+            Habitacion.estado == "disponible",
+            Reserva.estado.in_(ESTADOS_ACTIVOS),
+            Reserva.periodo.overlaps(tramo)
+        )
+    )
+    totales = {tipo: inventario.get(tipo, (0, None))[0] for tipo in tipos}
+    orden, matriz = matriz_disponibilidad(totales, result.all(), tramo_inicio, tramo_dias)
+
+    celdas = []
+    for fila, tipo in enumerate(orden):
+        precio = inventario.get(tipo, (0, None))[1]
+        for columna in mascaras[tipo][primera:ultima + 1].nonzero()[0]:
+            celdas.append(CeldaARI(
+                tipo=tipo,
+                fecha=tramo_inicio + timedelta(days=int(columna)),
+                disponibles=int(matriz[fila, columna]),
+                precio_noche=float(precio) if precio is not None else None
+            ))
+    return CambiosARI(desde_seq=desde_seq, hasta_seq=hasta_seq, hay_mas=hay_mas, celdas=celdas)
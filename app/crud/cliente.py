@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.cliente import Cliente
-from app.schemas.cliente import ClienteCreate
+from app.schemas.cliente import ClienteCreate, Cliente as ClienteSchema
+from app.services.vistas_reportes import refresco_vistas
+from app.services.versiones import versiones_tablas
 
 
 async def create_cliente(session: AsyncSession, data: ClienteCreate) -> Cliente:
@@ -19,9 +21,11 @@ async def get_cliente(session: AsyncSession, cliente_id: int) -> Cliente | None:
     return result.scalar_one_or_none()
 
 
-async def list_clientes(session: AsyncSession) -> list[Cliente]:
-    result = await session.execute(select(Cliente))
-    return result.scalars().all()
+async def list_clientes(session: AsyncSession) -> list[ClienteSchema]:
+    # Filas Core armadas directo en el esquema de respuesta: sin entidades ORM ni validación por fila
+    campos = list(ClienteSchema.model_fields)
+    result = await session.execute(select(*[getattr(Cliente, c) for c in campos]))
+    return [ClienteSchema.model_construct(**fila._mapping) for fila in result.all()]
 
 
 async def delete_cliente(session: AsyncSession, cliente_id: int) -> bool:
@@ -30,6 +34,8 @@ async def delete_cliente(session: AsyncSession, cliente_id: int) -> bool:
         return False
     await session.delete(cliente)
     await session.commit()
+    refresco_vistas.marcar("clientes")
+    versiones_tablas.incrementar("clientes")
     return True
 
 
@@ -40,5 +46,7 @@ async def update_cliente(session: AsyncSession, cliente_id: int, data: ClienteCr
     for field, value in data.model_dump().items():
         setattr(cliente, field, value)
     await session.commit()
+    refresco_vistas.marcar("clientes")
+    versiones_tablas.incrementar("clientes")
     await session.refresh(cliente)
     return cliente
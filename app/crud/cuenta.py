@@ -3,12 +3,14 @@ from sqlalchemy.future import select
 from sqlalchemy import or_
 from app.models.cuenta import Cuenta
 from app.schemas.cuenta import CuentaCreate, CuentaUpdate
+from app.services.versiones import versiones_tablas
 from typing import List, Optional
 
 async def crear_cuenta(db: AsyncSession, data: CuentaCreate) -> Cuenta:
     nueva_cuenta = Cuenta(**data.model_dump())
     db.add(nueva_cuenta)
     await db.commit()
+    versiones_tablas.incrementar("cuentas")
     await db.refresh(nueva_cuenta)
     return nueva_cuenta
 
@@ -55,6 +57,7 @@ async def actualizar_cuenta(db: AsyncSession, cuenta_id: int, data: CuentaUpdate
         setattr(cuenta, field, value)
     
     await db.commit()
+    versiones_tablas.incrementar("cuentas")
     await db.refresh(cuenta)
     return cuenta
 
@@ -65,4 +68,5 @@ async def eliminar_cuenta(db: AsyncSession, cuenta_id: int) -> bool:
     
     await db.delete(cuenta)
     await db.commit()
+    versiones_tablas.incrementar("cuentas")
     return True
@@ -1,12 +1,34 @@
+from datetime import date
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.egreso import Egreso
 from app.schemas.egreso import EgresoCreate
+from app.services.vistas_reportes import refresco_vistas
+from app.services.cache_reportes import cache_reportes
+from app.services.versiones import versiones_tablas
+from app.services.periodos import CHECK_VIOLATION, error_periodo_cerrado, periodos_cerrados
+from app.crud.resumen_diario import acumular_egreso
 
 async def crear_egreso(db: AsyncSession, egreso: EgresoCreate):
     db_egreso = Egreso(**egreso.dict())
+    # Fecha explícita para que el movimiento y el resumen diario coincidan
+    db_egreso.fecha = db_egreso.fecha or date.today()
+    await periodos_cerrados.asegurar_cargado(db)
+    periodos_cerrados.verificar_abierto(db_egreso.fecha)
     db.add(db_egreso)
-    await db.commit()
+    try:
+        await acumular_egreso(db, db_egreso.fecha, db_egreso.monto)
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        # Trigger de la base: el período se cerró (en este u otro proceso) antes de confirmar
+        if getattr(exc.orig, "sqlstate", None) == CHECK_VIOLATION:
+            raise error_periodo_cerrado(db_egreso.fecha)
+        raise
+    refresco_vistas.marcar("egresos")
+    versiones_tablas.incrementar("egresos")
+    cache_reportes.invalidar("egresos", db_egreso.fecha, db_egreso.fecha)
     await db.refresh(db_egreso)
     return db_egreso
 
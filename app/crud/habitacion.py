@@ -1,30 +1,133 @@
+import numpy as np
+from sqlalchemy import Date, func, literal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.habitacion import Habitacion
-from app.schemas.habitacion import HabitacionCreate
+from app.models.reserva import Reserva, ESTADOS_ACTIVOS
+from app.schemas.habitacion import HabitacionCreate, HabitacionOut
+from app.services.cache_reportes import cache_reportes
+from app.services.calendario import calendario
+from app.services.contadores import contadores_reservas
+from app.services.disponibilidad import matriz_disponibilidad
+from app.services.versiones import versiones_tablas
+from app.crud.ari import obtener_ultimo_seq, registrar_cambio
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+
+async def _con_estado_derivado(
+    db: AsyncSession,
+    habitaciones: List[Habitacion],
+    fecha: Optional[date] = None
+) -> List[HabitacionOut]:
+    """Completar el estado de ocupación en `fecha` (hoy por defecto) y el conteo de reservas activas.
+
+    Los bloqueos manuales ('mantenimiento', ...) se respetan; una habitación
+    'disponible' se muestra 'ocupada' si tiene una reserva activa esa noche.
+    """
+    await calendario.asegurar_cargado(db)
+    ocupadas = set(calendario.ocupadas_en(fecha or date.today()))
+    conteos = await contadores_reservas.obtener(db, [h.id for h in habitaciones])
+    resultado = []
+    for h in habitaciones:
+        estado = "ocupada" if h.estado == "disponible" and h.id in ocupadas else h.estado
+        resultado.append(HabitacionOut(
+            id=h.id,
+            numero=h.numero,
+            tipo=h.tipo,
+            precio_noche=h.precio_noche,
+            estado=estado,
+            reservas_activas=conteos[h.id],
+        ))
+    return resultado
+
 
 async def crear_habitacion(db: AsyncSession, habitacion: HabitacionCreate):
     db_hab = Habitacion(**habitacion.dict())
     db.add(db_hab)
+    await registrar_cambio(db, db_hab.tipo, "habitacion_creada")
     await db.commit()
     await db.refresh(db_hab)
+    calendario.agregar_habitacion(db_hab.id, db_hab.tipo)
+    cache_reportes.invalidar("habitaciones")
+    versiones_tablas.incrementar("habitaciones")
     return db_hab
 
-async def obtener_habitaciones(db: AsyncSession):
+async def obtener_habitaciones(db: AsyncSession, fecha: Optional[date] = None):
     result = await db.execute(select(Habitacion))
-    return result.scalars().all()
+    return await _con_estado_derivado(db, result.scalars().all(), fecha)
+
+
+async def obtener_habitaciones_disponibles(
+    db: AsyncSession,
+    fecha_inicio: date,
+    fecha_fin: date,
+    tipo: Optional[str] = None
+):
+    """Habitaciones sin reservas activas en [fecha_inicio, fecha_fin), según el calendario en memoria"""
+    await calendario.asegurar_cargado(db)
+    ids = calendario.disponibles(fecha_inicio, fecha_fin, tipo)
+    if not ids:
+        return []
+    # Mismo criterio que crear_reserva: no se reservan habitaciones con bloqueo manual
+    result = await db.execute(
+        select(Habitacion)
+        .where(Habitacion.id.in_(ids), Habitacion.estado == "disponible")
+        .order_by(Habitacion.numero)
+    )
+    return await _con_estado_derivado(db, result.scalars().all(), fecha_inicio)
 
 
-async def obtener_habitacion_por_id(db: AsyncSession, habitacion_id: int):
+async def obtener_matriz_disponibilidad(
+    db: AsyncSession,
+    fecha_inicio: date,
+    dias: int
+) -> Tuple[int, List[str], np.ndarray]:
+    """Habitaciones libres por tipo y noche, a partir de las reservas activas que tocan la ventana.
+
+    Retorna también el último seq del registro ARI, leído antes que los datos:
+    un cambio concurrente se vuelve a enviar en el feed en vez de perderse.
+    """
+    seq = await obtener_ultimo_seq(db)
+    fecha_fin = fecha_inicio + timedelta(days=dias)
+    # Mismo criterio que crear_reserva: las habitaciones con bloqueo manual no se ofrecen
+    result = await db.execute(
+        select(Habitacion.tipo, func.count(Habitacion.id))
+        .where(Habitacion.estado == "disponible")
+        .group_by(Habitacion.tipo)
+    )
+    habitaciones_por_tipo = dict(result.all())
+
+    ventana = func.daterange(literal(fecha_inicio, Date), literal(fecha_fin, Date), "[)")
+    result = await db.execute(
+        select(Habitacion.tipo, Reserva.fecha_inicio, Reserva.fecha_fin)
+        .join(Habitacion, Reserva.habitacion_id == Habitacion.id)
+        .where(
+            Reserva.estado.in_(ESTADOS_ACTIVOS),
+            Reserva.periodo.overlaps(ventana),
+            Habitacion.estado == "disponible"
+        )
+    )
+    tipos, disponibles = matriz_disponibilidad(habitaciones_por_tipo, result.all(), fecha_inicio, dias)
+    return seq, tipos, disponibles
+
+
+async def obtener_habitacion_por_id(db: AsyncSession, habitacion_id: int, fecha: Optional[date] = None):
     result = await db.execute(select(Habitacion).where(Habitacion.id == habitacion_id))
-    return result.scalar_one_or_none()
+    habitacion = result.scalar_one_or_none()
+    if not habitacion:
+        return None
+    return (await _con_estado_derivado(db, [habitacion], fecha))[0]
 
 async def actualizar_estado_habitacion(db: AsyncSession, habitacion_id: int, nuevo_estado: str):
     result = await db.execute(select(Habitacion).where(Habitacion.id == habitacion_id))
     habitacion = result.scalar_one_or_none()
     if habitacion:
+        if habitacion.estado != nuevo_estado:
+            await registrar_cambio(db, habitacion.tipo, "estado_habitacion")
         habitacion.estado = nuevo_estado
         await db.commit()
+        versiones_tablas.incrementar("habitaciones")
         await db.refresh(habitacion)
     return habitacion
 
@@ -1,12 +1,34 @@
+from datetime import date
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.ingreso import Ingreso
 from app.schemas.ingreso import IngresoCreate
+from app.services.vistas_reportes import refresco_vistas
+from app.services.cache_reportes import cache_reportes
+from app.services.versiones import versiones_tablas
+from app.services.periodos import CHECK_VIOLATION, error_periodo_cerrado, periodos_cerrados
+from app.crud.resumen_diario import acumular_ingreso
 
 async def crear_ingreso(db: AsyncSession, ingreso: IngresoCreate):
     db_ingreso = Ingreso(**ingreso.dict())
+    # Fecha explícita para que el movimiento y el resumen diario coincidan
+    db_ingreso.fecha = db_ingreso.fecha or date.today()
+    await periodos_cerrados.asegurar_cargado(db)
+    periodos_cerrados.verificar_abierto(db_ingreso.fecha)
     db.add(db_ingreso)
-    await db.commit()
+    try:
+        await acumular_ingreso(db, db_ingreso.fecha, db_ingreso.monto)
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        # Trigger de la base: el período se cerró (en este u otro proceso) antes de confirmar
+        if getattr(exc.orig, "sqlstate", None) == CHECK_VIOLATION:
+            raise error_periodo_cerrado(db_ingreso.fecha)
+        raise
+    refresco_vistas.marcar("ingresos")
+    versiones_tablas.incrementar("ingresos")
+    cache_reportes.invalidar("ingresos", db_ingreso.fecha, db_ingreso.fecha)
     await db.refresh(db_ingreso)
     return db_ingreso
 
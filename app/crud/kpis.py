@@ -0,0 +1,147 @@
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.habitacion import Habitacion
+from app.models.reserva import ESTADOS_OCUPACION
+from app.schemas.reportes import KPIsHotel, TramoAnticipacion
+from app.services.kpis import LIMITES_ANTICIPACION, ReservasKPI, calcular_kpis, etiquetas_anticipacion
+
+# Reservas con noches en [:inicio, :fin): noches totales, noches dentro del período,
+# anticipación (días entre la reserva y la llegada) e importe de la reserva
+# (ingresos cobrados o, si no hay, precio_noche de la habitación por las noches)
+_RESERVAS_PERIODO = """
+    SELECT r.fecha_inicio,
+           r.fecha_fin,
+           r.fecha_fin - r.fecha_inicio AS noches,
+           LEAST(r.fecha_fin, :fin) - GREATEST(r.fecha_inicio, :inicio) AS noches_periodo,
+           GREATEST(r.fecha_inicio - r.fecha_reserva::date, 0) AS anticipacion,
+           COALESCE(p.pagado, h.precio_noche * (r.fecha_fin - r.fecha_inicio)) AS importe
+    FROM reservas r
+    JOIN habitaciones h ON h.id = r.habitacion_id
+    LEFT JOIN LATERAL (
+        SELECT SUM(i.monto) AS pagado FROM ingresos i WHERE i.reserva_id = r.id
+    ) p ON true
+    WHERE r.estado IN :estados
+      AND r.periodo && daterange(:inicio, :fin, '[)')
+"""
+
+
+def _tramos_sql() -> str:
+    tramos = []
+    for inferior, superior in zip(LIMITES_ANTICIPACION, LIMITES_ANTICIPACION[1:] + (None,)):
+        condicion = f"anticipacion >= {inferior}" + (f" AND anticipacion < {superior}" if superior else "")
+        tramos.append(f"COUNT(*) FILTER (WHERE fecha_inicio >= :inicio AND {condicion})")
+    return ",\n           ".join(tramos)
+
+
+def _consulta_reservas(tipo: Optional[str]) -> str:
+    return _RESERVAS_PERIODO + ("  AND h.tipo = :tipo\n" if tipo else "")
+
+
+async def _contar_habitaciones(db: AsyncSession, tipo: Optional[str]) -> int:
+    query = select(func.count(Habitacion.id))
+    if tipo:
+        query = query.where(Habitacion.tipo == tipo)
+    return (await db.execute(query)).scalar()
+
+
+def _armar_kpis(periodo: str, tipo: Optional[str], habitaciones: int, valores: Dict) -> KPIsHotel:
+    """Derivar ADR, RevPAR y ocupación de los totales del período"""
+    centavos = Decimal("0.01")
+    ingresos = Decimal(str(valores["ingresos_habitaciones"])).quantize(centavos, ROUND_HALF_UP)
+    vendidas = valores["noches_vendidas"]
+    disponibles = valores["noches_disponibles"]
+    adr = (ingresos / vendidas).quantize(centavos, ROUND_HALF_UP) if vendidas else Decimal("0.00")
+    revpar = (ingresos / disponibles).quantize(centavos, ROUND_HALF_UP) if disponibles else Decimal("0.00")
+    return KPIsHotel(
+        periodo=periodo,
+        tipo_habitacion=tipo,
+        habitaciones=habitaciones,
+        noches_disponibles=disponibles,
+        noches_vendidas=vendidas,
+        ocupacion=round(vendidas / disponibles * 100, 2) if disponibles else 0,
+        ingresos_habitaciones=ingresos,
+        adr=adr,
+        revpar=revpar,
+        llegadas=valores["llegadas"],
+        estadia_promedio=round(float(valores["estadia_promedio"]), 2),
+        anticipacion=[
+            TramoAnticipacion(tramo=etiqueta, reservas=cantidad)
+            for etiqueta, cantidad in zip(etiquetas_anticipacion(), valores["anticipacion"])
+        ]
+    )
+
+
+async def obtener_kpis(
+    db: AsyncSession,
+    fecha_inicio: date,
+    fecha_fin: date,
+    tipo: Optional[str] = None
+) -> KPIsHotel:
+    """Obtener ADR, RevPAR, ocupación, estadía promedio y anticipación del período en una pasada SQL"""
+    habitaciones = await _contar_habitaciones(db, tipo)
+    query = text(f"""
+        WITH r AS ({_consulta_reservas(tipo)})
+        SELECT COALESCE(SUM(noches_periodo), 0) AS noches_vendidas,
+               COALESCE(SUM(importe * noches_periodo / noches), 0) AS ingresos_habitaciones,
+               COUNT(*) FILTER (WHERE fecha_inicio >= :inicio) AS llegadas,
+               COALESCE(AVG(noches) FILTER (WHERE fecha_inicio >= :inicio), 0) AS estadia_promedio,
+               {_tramos_sql()}
+        FROM r
+    """).bindparams(bindparam("estados", expanding=True))
+    fin = fecha_fin + timedelta(days=1)
+    parametros = {"estados": list(ESTADOS_OCUPACION), "inicio": fecha_inicio, "fin": fin}
+    if tipo:
+        parametros["tipo"] = tipo
+    fila = (await db.execute(query, parametros)).one()
+
+    valores = {
+        "noches_vendidas": int(fila[0]),
+        "ingresos_habitaciones": fila[1],
+        "llegadas": fila[2],
+        "estadia_promedio": fila[3],
+        "anticipacion": [int(c) for c in fila[4:]],
+        "noches_disponibles": habitaciones * (fin - fecha_inicio).days,
+    }
+    return _armar_kpis(f"{fecha_inicio} - {fecha_fin}", tipo, habitaciones, valores)
+
+
+async def cargar_reservas_kpi(
+    db: AsyncSession,
+    fecha_inicio: date,
+    fecha_fin: date,
+    tipo: Optional[str] = None
+) -> ReservasKPI:
+    """Cargar en arreglos las reservas con noches en [fecha_inicio, fecha_fin] para calcular en memoria"""
+    query = text(
+        f"SELECT fecha_inicio, fecha_fin, anticipacion, importe FROM ({_consulta_reservas(tipo)}) r"
+    ).bindparams(bindparam("estados", expanding=True))
+    parametros = {
+        "estados": list(ESTADOS_OCUPACION),
+        "inicio": fecha_inicio,
+        "fin": fecha_fin + timedelta(days=1),
+    }
+    if tipo:
+        parametros["tipo"] = tipo
+    result = await db.execute(query, parametros)
+    return ReservasKPI.desde_filas(result.all())
+
+
+async def obtener_kpis_mensuales(
+    db: AsyncSession,
+    anio: int,
+    tipo: Optional[str] = None
+) -> List[KPIsHotel]:
+    """Obtener los KPIs de cada mes del año: una sola carga de reservas y cálculo vectorizado por mes"""
+    habitaciones = await _contar_habitaciones(db, tipo)
+    reservas = await cargar_reservas_kpi(db, date(anio, 1, 1), date(anio, 12, 31), tipo)
+    resultado = []
+    for mes in range(1, 13):
+        inicio = date(anio, mes, 1)
+        fin = (date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)) - timedelta(days=1)
+        valores = calcular_kpis(reservas, habitaciones, inicio, fin)
+        resultado.append(_armar_kpis(f"{inicio:%Y-%m}", tipo, habitaciones, valores))
+    return resultado
@@ -0,0 +1,128 @@
+from typing import Dict, List
+from sqlalchemy import bindparam, delete, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.noche_ocupada import NocheOcupada
+from app.models.reserva import ESTADOS_OCUPACION
+
+# Noches [fecha_inicio, fecha_fin) de cada reserva cuyo estado cuenta para la ocupación
+_NOCHES_ESPERADAS = """
+    SELECT r.id AS reserva_id, g.fecha::date AS fecha, r.habitacion_id, r.estado
+    FROM reservas r
+    CROSS JOIN LATERAL generate_series(r.fecha_inicio, r.fecha_fin - 1, interval '1 day') AS g(fecha)
+    WHERE r.estado IN :estados
+"""
+
+_INSERTAR_NOCHES = text(f"""
+    INSERT INTO noches_ocupadas (reserva_id, fecha, habitacion_id, estado)
+    SELECT * FROM ({_NOCHES_ESPERADAS} AND r.id IN :ids) AS esperadas
+    ON CONFLICT DO NOTHING
+""").bindparams(bindparam("estados", expanding=True), bindparam("ids", expanding=True))
+
+_RELLENAR_LOTE = text(f"""
+    INSERT INTO noches_ocupadas (reserva_id, fecha, habitacion_id, estado)
+    SELECT * FROM ({_NOCHES_ESPERADAS} AND r.id > :desde AND r.id <= :hasta) AS esperadas
+    ON CONFLICT DO NOTHING
+""").bindparams(bindparam("estados", expanding=True))
+
+
+async def registrar_noches(db: AsyncSession, reserva_ids: List[int]) -> None:
+    """Agregar las noches de las reservas indicadas (sin confirmar la transacción).
+
+    Inserta una fila por noche: el largo de la estadía lo acota crear_reserva
+    (MAX_NOCHES_ESTADIA) antes de llegar aquí.
+    """
+    if reserva_ids:
+        await db.execute(_INSERTAR_NOCHES, {"estados": list(ESTADOS_OCUPACION), "ids": list(reserva_ids)})
+
+
+async def actualizar_noches(db: AsyncSession, reserva_ids: List[int], estado: str) -> None:
+    """Reflejar un cambio de estado de reservas en sus noches (sin confirmar la transacción).
+
+    Si el nuevo estado sigue contando para la ocupación se actualiza el estado
+    de las noches; si no (cancelada, no_presentada), las noches se eliminan.
+    """
+    if not reserva_ids:
+        return
+    if estado in ESTADOS_OCUPACION:
+        await db.execute(
+            update(NocheOcupada)
+            .where(NocheOcupada.reserva_id.in_(reserva_ids))
+            .values(estado=estado)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        await db.execute(
+            delete(NocheOcupada)
+            .where(NocheOcupada.reserva_id.in_(reserva_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def rellenar_noches(db: AsyncSession, lote: int = 10_000) -> int:
+    """Generar las noches de las reservas existentes, por lotes de ids; retorna las filas insertadas"""
+    maximo = (await db.execute(text("SELECT COALESCE(MAX(id), 0) FROM reservas"))).scalar()
+    insertadas = 0
+    for desde in range(0, maximo, lote):
+        result = await db.execute(
+            _RELLENAR_LOTE,
+            {"estados": list(ESTADOS_OCUPACION), "desde": desde, "hasta": desde + lote}
+        )
+        insertadas += result.rowcount
+        await db.commit()
+    return insertadas
+
+
+async def verificar_noches(db: AsyncSession, reparar: bool = False) -> Dict[str, int]:
+    """Comparar noches_ocupadas con las reservas y, opcionalmente, corregir las diferencias.
+
+    Retorna cuántas noches faltan, sobran o tienen habitación/estado distintos.
+    """
+    consultas = {
+        "faltantes": f"""
+            FROM ({_NOCHES_ESPERADAS}) e
+            WHERE NOT EXISTS (
+                SELECT 1 FROM noches_ocupadas n
+                WHERE n.reserva_id = e.reserva_id AND n.fecha = e.fecha
+            )
+        """,
+        "sobrantes": f"""
+            FROM noches_ocupadas n
+            WHERE NOT EXISTS (
+                SELECT 1 FROM ({_NOCHES_ESPERADAS}) e
+                WHERE e.reserva_id = n.reserva_id AND e.fecha = n.fecha
+            )
+        """,
+        "distintas": f"""
+            FROM noches_ocupadas n
+            JOIN ({_NOCHES_ESPERADAS}) e ON e.reserva_id = n.reserva_id AND e.fecha = n.fecha
+            WHERE e.habitacion_id <> n.habitacion_id OR e.estado <> n.estado
+        """,
+    }
+    parametros = {"estados": list(ESTADOS_OCUPACION)}
+    diferencias = {}
+    for nombre, cuerpo in consultas.items():
+        consulta = text(f"SELECT COUNT(*) {cuerpo}").bindparams(bindparam("estados", expanding=True))
+        diferencias[nombre] = (await db.execute(consulta, parametros)).scalar()
+
+    if reparar and any(diferencias.values()):
+        await db.execute(text(f"""
+            DELETE FROM noches_ocupadas n
+            WHERE NOT EXISTS (
+                SELECT 1 FROM ({_NOCHES_ESPERADAS}) e
+                WHERE e.reserva_id = n.reserva_id AND e.fecha = n.fecha
+            )
+        """).bindparams(bindparam("estados", expanding=True)), parametros)
+        await db.execute(text(f"""
+            UPDATE noches_ocupadas n
+            SET habitacion_id = e.habitacion_id, estado = e.estado
+            FROM ({_NOCHES_ESPERADAS}) e
+            WHERE e.reserva_id = n.reserva_id AND e.fecha = n.fecha
+              AND (e.habitacion_id <> n.habitacion_id OR e.estado <> n.estado)
+        """).bindparams(bindparam("estados", expanding=True)), parametros)
+        await db.execute(text(f"""
+            INSERT INTO noches_ocupadas (reserva_id, fecha, habitacion_id, estado)
+            SELECT * FROM ({_NOCHES_ESPERADAS}) AS esperadas
+            ON CONFLICT DO NOTHING
+        """).bindparams(bindparam("estados", expanding=True)), parametros)
+        await db.commit()
+    return diferencias
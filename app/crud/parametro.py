@@ -3,6 +3,7 @@ from sqlalchemy.future import select
 from sqlalchemy import update, delete
 from app.models.parametro import Parametro
 from app.schemas.parametro import ParametroCreate, ParametroUpdate
+from app.services.versiones import versiones_tablas
 from typing import List, Optional
 
 async def get_parametro(db: AsyncSession, parametro_id: int) -> Optional[Parametro]:
@@ -31,6 +32,7 @@ async def create_parametro(db: AsyncSession, parametro: ParametroCreate) -> Para
     db_parametro = Parametro(**parametro.model_dump())
     db.add(db_parametro)
     await db.commit()
+    versiones_tablas.incrementar("parametros")
     await db.refresh(db_parametro)
     return db_parametro
 
@@ -50,6 +52,7 @@ async def update_parametro(db: AsyncSession, parametro_id: int, parametro_data:
             .values(**update_data)
         )
         await db.commit()
+        versiones_tablas.incrementar("parametros")
         await db.refresh(parametro)
     
     return parametro
@@ -64,4 +67,5 @@ async def delete_parametro(db: AsyncSession, parametro_id: int) -> bool:
         delete(Parametro).where(Parametro.id == parametro_id)
     )
     await db.commit()
+    versiones_tablas.incrementar("parametros")
     return True
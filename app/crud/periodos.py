@@ -0,0 +1,135 @@
+import calendar
+from datetime import date, timedelta
+from typing import List
+from fastapi import HTTPException
+from sqlalchemy import distinct, func, literal, text, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.egreso import Egreso
+from app.models.habitacion import Habitacion
+from app.models.ingreso import Ingreso
+from app.models.noche_ocupada import NocheOcupada
+from app.models.periodo_cerrado import PeriodoCerrado, InstantaneaReporte
+from app.models.resumen_diario import ResumenDiario
+from app.services.periodos import (
+    periodos_cerrados,
+    comprimir,
+    INSTANTANEA_LIBRO_DIARIO,
+    INSTANTANEA_OCUPACION_DIARIA,
+    INSTANTANEA_RESUMEN_DIARIO
+)
+
+UNIQUE_VIOLATION = "23505"  # SQLSTATE de PostgreSQL para unique_violation
+
+
+async def listar_periodos_cerrados(db: AsyncSession) -> List[PeriodoCerrado]:
+    result = await db.execute(select(PeriodoCerrado).order_by(PeriodoCerrado.fecha_inicio))
+    return result.scalars().all()
+
+
+async def _filas_libro_diario(db: AsyncSession, desde: date, hasta: date) -> list:
+    """Movimientos del período leídos de las tablas de origen (la vista materializada puede estar atrasada)"""
+    ingresos = select(
+        Ingreso.fecha, literal("Ingreso").label("tipo"), Ingreso.descripcion, Ingreso.monto, Ingreso.id
+    ).where(Ingreso.fecha >= desde, Ingreso.fecha <= hasta)
+    egresos = select(
+        Egreso.fecha, literal("Egreso").label("tipo"), Egreso.descripcion, Egreso.monto, Egreso.id
+    ).where(Egreso.fecha >= desde, Egreso.fecha <= hasta)
+    movimientos = union_all(ingresos, egresos).subquery()
+    result = await db.execute(
+        select(*movimientos.c).order_by(movimientos.c.fecha, movimientos.c.tipo, movimientos.c.id)
+    )
+    return result.all()
+
+
+async def _filas_resumen_diario(db: AsyncSession, desde: date, hasta: date) -> list:
+    result = await db.execute(
+        select(
+            ResumenDiario.fecha,
+            ResumenDiario.total_ingresos,
+            ResumenDiario.total_egresos,
+            ResumenDiario.cantidad_ingresos,
+            ResumenDiario.cantidad_egresos
+        )
+        .where(ResumenDiario.fecha >= desde, ResumenDiario.fecha <= hasta)
+        .order_by(ResumenDiario.fecha)
+    )
+    return result.all()
+
+
+async def _filas_ocupacion_diaria(db: AsyncSession, desde: date, hasta: date) -> list:
+    """Una fila por día del período, con las habitaciones ocupadas y el total de habitaciones al cerrar"""
+    total_habitaciones = (await db.execute(select(func.count(Habitacion.id)))).scalar()
+    result = await db.execute(
+        select(NocheOcupada.fecha, func.count(distinct(NocheOcupada.habitacion_id)))
+        .where(NocheOcupada.fecha >= desde, NocheOcupada.fecha <= hasta)
+        .group_by(NocheOcupada.fecha)
+    )
+    ocupadas_por_dia = dict(result.all())
+    return [
+        (dia, ocupadas_por_dia.get(dia, 0), total_habitaciones)
+        for dia in (desde + timedelta(days=n) for n in range((hasta - desde).days + 1))
+    ]
+
+
+async def cerrar_periodo(db: AsyncSession, anio: int, mes: int) -> PeriodoCerrado:
+    """Cerrar un mes: guardar las instantáneas de sus reportes y no admitir más movimientos en él.
+
+    Los meses se cierran en orden y solo cuando ya terminaron. Los cierres se
+    hacen de a uno: periodos_cerrados se bloquea en modo SHARE ROW EXCLUSIVE
+    (choca consigo mismo, no con las lecturas) y el orden se verifica con el
+    último cierre de la base. Mientras se toman las instantáneas, ingresos,
+    egresos, resumen_diario y noches_ocupadas quedan bloqueados en modo SHARE:
+    los movimientos y reservas en curso terminan antes de leerlos y los nuevos
+    esperan al cierre; al continuar, los triggers de esas tablas los rechazan
+    si son del período.
+    """
+    fecha_inicio = date(anio, mes, 1)
+    fecha_fin = date(anio, mes, calendar.monthrange(anio, mes)[1])
+    if fecha_fin >= date.today():
+        raise HTTPException(status_code=400, detail="Solo se pueden cerrar meses ya terminados.")
+
+    await db.execute(text("LOCK TABLE periodos_cerrados IN SHARE ROW EXCLUSIVE MODE"))
+    ultimo = (await db.execute(select(func.max(PeriodoCerrado.fecha_fin)))).scalar()
+    if ultimo is not None and fecha_inicio <= ultimo:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"El período {anio}-{mes:02d} ya está cerrado.")
+    if ultimo is not None and fecha_inicio != ultimo + timedelta(days=1):
+        await db.rollback()
+        siguiente = ultimo + timedelta(days=1)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Los períodos se cierran en orden: primero debe cerrarse {siguiente:%Y-%m}."
+        )
+    if not periodos_cerrados.cargado or periodos_cerrados.ultimo_cierre != ultimo:
+        await periodos_cerrados.cargar(db)
+
+    periodos_cerrados.iniciar_cierre(fecha_inicio, fecha_fin)
+    try:
+        await db.execute(text("LOCK TABLE ingresos, egresos, resumen_diario, noches_ocupadas IN SHARE MODE"))
+        periodo = PeriodoCerrado(anio=anio, mes=mes, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
+        db.add(periodo)
+        try:
+            await db.flush()
+            for reporte, leer in (
+                (INSTANTANEA_LIBRO_DIARIO, _filas_libro_diario),
+                (INSTANTANEA_RESUMEN_DIARIO, _filas_resumen_diario),
+                (INSTANTANEA_OCUPACION_DIARIA, _filas_ocupacion_diaria),
+            ):
+                filas = await leer(db, fecha_inicio, fecha_fin)
+                db.add(InstantaneaReporte(
+                    periodo_id=periodo.id, reporte=reporte, filas=len(filas), contenido=comprimir(filas)
+                ))
+            await db.commit()
+        except IntegrityError as exc:
+            await db.rollback()
+            # uq_periodos_cerrados_anio_mes: el mes lo cerró otra transacción fuera de este protocolo
+            if getattr(exc.orig, "sqlstate", None) == UNIQUE_VIOLATION:
+                raise HTTPException(status_code=409, detail=f"El período {anio}-{mes:02d} ya está cerrado.")
+            raise
+        periodos_cerrados.registrar(periodo.id, fecha_inicio, fecha_fin)
+    finally:
+        periodos_cerrados.terminar_cierre(fecha_inicio, fecha_fin)
+    await db.refresh(periodo)
+    return periodo
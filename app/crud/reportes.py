@@ -1,28 +1,81 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, func, text
+from sqlalchemy import and_, distinct, func, literal, text, union_all
 from app.models.reportes import VistaLibroDiario, VistaRegistroHuespedes, VistaRegistroOcupacion
+from app.models.ingreso import Ingreso
+from app.models.egreso import Egreso
 from app.models.habitacion import Habitacion
+from app.models.noche_ocupada import NocheOcupada
+from app.models.resumen_diario import ResumenDiario
+from app.services.un_solo_vuelo import un_solo_vuelo
+from app.services.periodos import (
+    periodos_cerrados,
+    INSTANTANEA_LIBRO_DIARIO,
+    INSTANTANEA_OCUPACION_DIARIA,
+    INSTANTANEA_RESUMEN_DIARIO
+)
 from app.schemas.reportes import (
     LibroDiarioSchema, 
     RegistroHuespedesSchema, 
     RegistroOcupacionSchema,
     ResumenFinanciero,
-    EstadisticasOcupacion
+    EstadisticasOcupacion,
+    OcupacionDiaria,
+    PuntoSerie
 )
-from typing import List, Optional
-from datetime import date
+from app.services.exportacion import TAMANO_LOTE
+from typing import AsyncIterator, List, Optional, Sequence
+from datetime import date, timedelta
 from decimal import Decimal
 
 
-async def obtener_libro_diario(
-    db: AsyncSession, 
-    fecha_inicio: Optional[date] = None,
-    fecha_fin: Optional[date] = None,
-    tipo: Optional[str] = None
-) -> List[VistaLibroDiario]:
-    """Obtener registros del libro diario con filtros opcionales"""
-    query = select(VistaLibroDiario)
+def _paginar(query, limite: Optional[int], desplazamiento: int):
+    """Aplicar LIMIT/OFFSET en SQL (sin límite si `limite` es None)"""
+    if limite is not None:
+        query = query.limit(limite)
+    if desplazamiento:
+        query = query.offset(desplazamiento)
+    return query
+
+
+def _ordenar(columna, orden: str):
+    return columna.asc() if orden == "asc" else columna.desc()
+
+
+# Columnas de las exportaciones: las mismas que los esquemas de respuesta
+COLUMNAS_LIBRO_DIARIO = tuple(LibroDiarioSchema.model_fields)
+COLUMNAS_REGISTRO_HUESPEDES = tuple(RegistroHuespedesSchema.model_fields)
+COLUMNAS_REGISTRO_OCUPACION = tuple(RegistroOcupacionSchema.model_fields)
+# Tipos SQL de esas columnas, para las exportaciones columnares con tipos (decimal, fecha)
+TIPOS_LIBRO_DIARIO = tuple(VistaLibroDiario.__table__.c[c].type for c in COLUMNAS_LIBRO_DIARIO)
+TIPOS_REGISTRO_HUESPEDES = tuple(VistaRegistroHuespedes.__table__.c[c].type for c in COLUMNAS_REGISTRO_HUESPEDES)
+TIPOS_REGISTRO_OCUPACION = tuple(VistaRegistroOcupacion.__table__.c[c].type for c in COLUMNAS_REGISTRO_OCUPACION)
+
+
+def _columnas(vista, nombres: Sequence[str]):
+    return [getattr(vista, c) for c in nombres]
+
+
+def _construir(esquema, nombres: Sequence[str], filas) -> list:
+    """Armar los esquemas de respuesta desde filas Core (sin mapa de identidad ni validación por fila)"""
+    return [esquema.model_construct(**dict(zip(nombres, fila))) for fila in filas]
+
+
+async def _tramos(db: AsyncSession, fecha_inicio: Optional[date], fecha_fin: Optional[date]):
+    """Tramos del rango pedido en orden de fecha; los cerrados se leen de las instantáneas"""
+    await periodos_cerrados.asegurar_cargado(db)
+    return periodos_cerrados.dividir(fecha_inicio, fecha_fin)
+
+
+async def _iterar_lotes(db: AsyncSession, query) -> AsyncIterator[Sequence]:
+    """Leer la consulta con un cursor del servidor, de a TAMANO_LOTE filas"""
+    result = await db.stream(query.execution_options(yield_per=TAMANO_LOTE))
+    async for lote in result.partitions():
+        yield lote
+
+
+def _consulta_libro_diario(columnas, fecha_inicio, fecha_fin, tipo, orden):
+    query = select(*columnas)
     
     conditions = []
     if fecha_inicio:
@@ -35,21 +88,15 @@ async def obtener_libro_diario(
     if conditions:
         query = query.where(and_(*conditions))
     
-    query = query.order_by(VistaLibroDiario.fecha.desc())
-    
-    result = await db.execute(query)
-    return result.scalars().all()
+    return query.order_by(
+        _ordenar(VistaLibroDiario.fecha, orden),
+        VistaLibroDiario.tipo,
+        _ordenar(VistaLibroDiario.movimiento_id, orden)
+    )
 
 
-async def obtener_registro_huespedes(
-    db: AsyncSession,
-    fecha_inicio: Optional[date] = None,
-    fecha_fin: Optional[date] = None,
-    documento_identidad: Optional[str] = None,
-    nombre_cliente: Optional[str] = None
-) -> List[VistaRegistroHuespedes]:
-    """Obtener registro de huéspedes con filtros opcionales"""
-    query = select(VistaRegistroHuespedes)
+def _consulta_registro_huespedes(columnas, fecha_inicio, fecha_fin, documento_identidad, nombre_cliente, orden):
+    query = select(*columnas)
     
     conditions = []
     if fecha_inicio:
@@ -64,21 +111,14 @@ async def obtener_registro_huespedes(
     if conditions:
         query = query.where(and_(*conditions))
     
-    query = query.order_by(VistaRegistroHuespedes.fecha_inicio.desc())
-    
-    result = await db.execute(query)
-    return result.scalars().all()
+    return query.order_by(
+        _ordenar(VistaRegistroHuespedes.fecha_inicio, orden),
+        _ordenar(VistaRegistroHuespedes.reserva_id, orden)
+    )
 
 
-async def obtener_registro_ocupacion(
-    db: AsyncSession,
-    fecha_inicio: Optional[date] = None,
-    fecha_fin: Optional[date] = None,
-    numero_habitacion: Optional[str] = None,
-    tipo_habitacion: Optional[str] = None
-) -> List[VistaRegistroOcupacion]:
-    """Obtener registro de ocupación con filtros opcionales"""
-    query = select(VistaRegistroOcupacion)
+def _consulta_registro_ocupacion(columnas, fecha_inicio, fecha_fin, numero_habitacion, tipo_habitacion, orden):
+    query = select(*columnas)
     
     conditions = []
     if fecha_inicio:
@@ -93,46 +133,266 @@ async def obtener_registro_ocupacion(
     if conditions:
         query = query.where(and_(*conditions))
     
-    query = query.order_by(VistaRegistroOcupacion.habitacion, VistaRegistroOcupacion.fecha_inicio.desc())
+    return query.order_by(
+        VistaRegistroOcupacion.habitacion,
+        _ordenar(VistaRegistroOcupacion.fecha_inicio, orden),
+        _ordenar(VistaRegistroOcupacion.reserva_id, orden)
+    )
+
+
+@un_solo_vuelo
+async def obtener_libro_diario(
+    db: AsyncSession, 
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo: Optional[str] = None,
+    limite: Optional[int] = None,
+    desplazamiento: int = 0,
+    orden: str = "desc"
+) -> List[LibroDiarioSchema]:
+    """Obtener registros del libro diario con filtros opcionales, ordenados por fecha y paginados en SQL.
+
+    Se leen columnas, no entidades: la vista no tiene clave real y el mapa de
+    identidad fusionaría movimientos con igual fecha, tipo y descripción.
+    """
+    tramos = await _tramos(db, fecha_inicio, fecha_fin)
+    if any(cerrado for _, _, cerrado in tramos):
+        filas = await _libro_diario_por_tramos(db, tramos, tipo, limite, desplazamiento, orden)
+        return _construir(LibroDiarioSchema, COLUMNAS_LIBRO_DIARIO, filas)
+
+    query = _consulta_libro_diario(
+        _columnas(VistaLibroDiario, COLUMNAS_LIBRO_DIARIO), fecha_inicio, fecha_fin, tipo, orden
+    )
+    query = _paginar(query, limite, desplazamiento)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    return _construir(LibroDiarioSchema, COLUMNAS_LIBRO_DIARIO, result.all())
 
 
-async def obtener_resumen_financiero(
+async def _libro_diario_por_tramos(db: AsyncSession, tramos, tipo, limite, desplazamiento, orden) -> list:
+    """Libro diario con los tramos cerrados leídos de las instantáneas y los abiertos de la vista.
+
+    Los tramos no se solapan: se recorren en el orden pedido y se concatenan.
+    Con `limite`, cada tramo en vivo lee solo las filas que aún faltan.
+    """
+    necesarias = None if limite is None else desplazamiento + limite
+    filas = []
+    for desde, hasta, cerrado in (tramos if orden == "asc" else reversed(tramos)):
+        if necesarias is not None and len(filas) >= necesarias:
+            break
+        if cerrado:
+            # Instantánea en orden (fecha, tipo, movimiento_id) ascendente
+            parte = await periodos_cerrados.filas(db, INSTANTANEA_LIBRO_DIARIO, desde, hasta)
+            if tipo:
+                parte = [fila for fila in parte if fila[1] == tipo]
+            if orden != "asc":
+                parte = sorted(parte, key=lambda f: (-f[0].toordinal(), f[1], -f[4]))
+            filas.extend(fila[:len(COLUMNAS_LIBRO_DIARIO)] for fila in parte)
+        else:
+            query = _consulta_libro_diario(
+                _columnas(VistaLibroDiario, COLUMNAS_LIBRO_DIARIO), desde, hasta, tipo, orden
+            )
+            query = _paginar(query, None if necesarias is None else necesarias - len(filas), 0)
+            filas.extend((await db.execute(query)).all())
+    return filas[desplazamiento:necesarias]
+
+
+@un_solo_vuelo
+async def obtener_registro_huespedes(
     db: AsyncSession,
     fecha_inicio: Optional[date] = None,
-    fecha_fin: Optional[date] = None
-) -> ResumenFinanciero:
-    """Obtener resumen financiero con totales de ingresos y egresos"""
-    
-    # Query para obtener totales usando SQL directo para mayor flexibilidad
-    query_ingresos = text("""
-        SELECT COALESCE(SUM(monto), 0) as total_ingresos
-        FROM ingresos
-        WHERE (:fecha_inicio IS NULL OR fecha >= :fecha_inicio)
-        AND (:fecha_fin IS NULL OR fecha <= :fecha_fin)
-    """)
+    fecha_fin: Optional[date] = None,
+    documento_identidad: Optional[str] = None,
+    nombre_cliente: Optional[str] = None,
+    limite: Optional[int] = None,
+    desplazamiento: int = 0,
+    orden: str = "desc"
+) -> List[RegistroHuespedesSchema]:
+    """Obtener registro de huéspedes con filtros opcionales, ordenado por fecha de inicio y paginado en SQL"""
+    query = _consulta_registro_huespedes(
+        _columnas(VistaRegistroHuespedes, COLUMNAS_REGISTRO_HUESPEDES), fecha_inicio, fecha_fin, documento_identidad, nombre_cliente, orden
+    )
+    query = _paginar(query, limite, desplazamiento)
     
-    query_egresos = text("""
-        SELECT COALESCE(SUM(monto), 0) as total_egresos
-        FROM egresos
-        WHERE (:fecha_inicio IS NULL OR fecha >= :fecha_inicio)
-        AND (:fecha_fin IS NULL OR fecha <= :fecha_fin)
-    """)
+    result = await db.execute(query)
+    return _construir(RegistroHuespedesSchema, COLUMNAS_REGISTRO_HUESPEDES, result.all())
+
+
+@un_solo_vuelo
+async def obtener_registro_ocupacion(
+    db: AsyncSession,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    numero_habitacion: Optional[str] = None,
+    tipo_habitacion: Optional[str] = None,
+    limite: Optional[int] = None,
+    desplazamiento: int = 0,
+    orden: str = "desc"
+) -> List[RegistroOcupacionSchema]:
+    """Obtener registro de ocupación con filtros opcionales, por habitación y fecha de inicio, paginado en SQL"""
+    query = _consulta_registro_ocupacion(
+        _columnas(VistaRegistroOcupacion, COLUMNAS_REGISTRO_OCUPACION), fecha_inicio, fecha_fin, numero_habitacion, tipo_habitacion, orden
+    )
+    query = _paginar(query, limite, desplazamiento)
     
-    # Ejecutar queries
-    result_ingresos = await db.execute(
-        query_ingresos, 
-        {"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin}
+    result = await db.execute(query)
+    return _construir(RegistroOcupacionSchema, COLUMNAS_REGISTRO_OCUPACION, result.all())
+
+
+def iterar_libro_diario(
+    db: AsyncSession,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo: Optional[str] = None,
+    orden: str = "desc"
+) -> AsyncIterator[Sequence]:
+    """Lotes de filas (COLUMNAS_LIBRO_DIARIO) del libro diario para exportar sin cargarlo entero"""
+    columnas = _columnas(VistaLibroDiario, COLUMNAS_LIBRO_DIARIO)
+    return _iterar_lotes(db, _consulta_libro_diario(columnas, fecha_inicio, fecha_fin, tipo, orden))
+
+
+def iterar_registro_huespedes(
+    db: AsyncSession,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    documento_identidad: Optional[str] = None,
+    nombre_cliente: Optional[str] = None,
+    orden: str = "desc"
+) -> AsyncIterator[Sequence]:
+    """Lotes de filas (COLUMNAS_REGISTRO_HUESPEDES) del registro de huéspedes para exportar"""
+    columnas = _columnas(VistaRegistroHuespedes, COLUMNAS_REGISTRO_HUESPEDES)
+    return _iterar_lotes(db, _consulta_registro_huespedes(
+        columnas, fecha_inicio, fecha_fin, documento_identidad, nombre_cliente, orden
+    ))
+
+
+def iterar_registro_ocupacion(
+    db: AsyncSession,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    numero_habitacion: Optional[str] = None,
+    tipo_habitacion: Optional[str] = None,
+    orden: str = "desc"
+) -> AsyncIterator[Sequence]:
+    """Lotes de filas (COLUMNAS_REGISTRO_OCUPACION) del registro de ocupación para exportar"""
+    columnas = _columnas(VistaRegistroOcupacion, COLUMNAS_REGISTRO_OCUPACION)
+    return _iterar_lotes(db, _consulta_registro_ocupacion(
+        columnas, fecha_inicio, fecha_fin, numero_habitacion, tipo_habitacion, orden
+    ))
+
+
+async def _contar(db: AsyncSession, query) -> int:
+    result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    return result.scalar()
+
+
+async def contar_libro_diario(
+    db: AsyncSession,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo: Optional[str] = None
+) -> int:
+    """Filas que devolvería iterar_libro_diario (avance de los trabajos de exportación)"""
+    return await _contar(db, _consulta_libro_diario([VistaLibroDiario.movimiento_id], fecha_inicio, fecha_fin, tipo, "desc"))
+
+
+async def contar_registro_huespedes(
+    db: AsyncSession,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    documento_identidad: Optional[str] = None,
+    nombre_cliente: Optional[str] = None
+) -> int:
+    """Filas que devolvería iterar_registro_huespedes"""
+    return await _contar(db, _consulta_registro_huespedes(
+        [VistaRegistroHuespedes.reserva_id], fecha_inicio, fecha_fin, documento_identidad, nombre_cliente, "desc"
+    ))
+
+
+async def contar_registro_ocupacion(
+    db: AsyncSession,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    numero_habitacion: Optional[str] = None,
+    tipo_habitacion: Optional[str] = None
+) -> int:
+    """Filas que devolvería iterar_registro_ocupacion"""
+    return await _contar(db, _consulta_registro_ocupacion(
+        [VistaRegistroOcupacion.reserva_id], fecha_inicio, fecha_fin, numero_habitacion, tipo_habitacion, "desc"
+    ))
+
+
+@un_solo_vuelo
+async def obtener_ultimos_movimientos(db: AsyncSession, limite: int = 10) -> List[LibroDiarioSchema]:
+    """Obtener los últimos movimientos (ingresos y egresos) directamente de las tablas de origen.
+
+    Cada tabla aporta sus `limite` filas más recientes leyendo el índice
+    (fecha DESC NULLS LAST, id DESC), y se mezclan: el costo no depende del
+    tamaño del libro. Los movimientos sin fecha van al final.
+    """
+    ingresos = (
+        select(
+            Ingreso.fecha, literal("Ingreso").label("tipo"), Ingreso.descripcion, Ingreso.monto, Ingreso.id
+        )
+        .order_by(Ingreso.fecha.desc().nulls_last(), Ingreso.id.desc())
+        .limit(limite)
+    )
+    egresos = (
+        select(
+            Egreso.fecha, literal("Egreso").label("tipo"), Egreso.descripcion, Egreso.monto, Egreso.id
+        )
+        .order_by(Egreso.fecha.desc().nulls_last(), Egreso.id.desc())
+        .limit(limite)
+    )
+    movimientos = union_all(ingresos, egresos).subquery()
+    query = (
+        select(movimientos.c.fecha, movimientos.c.tipo, movimientos.c.descripcion, movimientos.c.monto)
+        .order_by(movimientos.c.fecha.desc().nulls_last(), movimientos.c.id.desc())
+        .limit(limite)
     )
-    result_egresos = await db.execute(
-        query_egresos, 
-        {"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin}
+    result = await db.execute(query)
+    return [LibroDiarioSchema.model_validate(fila, from_attributes=True) for fila in result.all()]
+
+
+async def _sumar_resumen_diario(db: AsyncSession, fecha_inicio: Optional[date], fecha_fin: Optional[date]):
+    # Una sola consulta sobre el resumen diario (una fila por día con movimientos)
+    query = select(
+        func.coalesce(func.sum(ResumenDiario.total_ingresos), 0),
+        func.coalesce(func.sum(ResumenDiario.total_egresos), 0)
     )
+    conditions = []
+    if fecha_inicio:
+        conditions.append(ResumenDiario.fecha >= fecha_inicio)
+    if fecha_fin:
+        conditions.append(ResumenDiario.fecha <= fecha_fin)
+    if conditions:
+        query = query.where(and_(*conditions))
     
-    total_ingresos = result_ingresos.scalar() or Decimal('0')
-    total_egresos = result_egresos.scalar() or Decimal('0')
+    result = await db.execute(query)
+    total_ingresos, total_egresos = result.one()
+    return Decimal(total_ingresos), Decimal(total_egresos)
+
+
+@un_solo_vuelo
+async def obtener_resumen_financiero(
+    db: AsyncSession,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None
+) -> ResumenFinanciero:
+    """Obtener resumen financiero con totales de ingresos y egresos.
+
+    Los días de períodos cerrados se suman desde su instantánea y el resto en vivo.
+    """
+    total_ingresos = total_egresos = Decimal("0")
+    for desde, hasta, cerrado in await _tramos(db, fecha_inicio, fecha_fin):
+        if cerrado:
+            for _, ingresos, egresos, _, _ in await periodos_cerrados.filas(db, INSTANTANEA_RESUMEN_DIARIO, desde, hasta):
+                total_ingresos += ingresos
+                total_egresos += egresos
+        else:
+            ingresos, egresos = await _sumar_resumen_diario(db, desde, hasta)
+            total_ingresos += ingresos
+            total_egresos += egresos
     saldo = total_ingresos - total_egresos
     
     # Determinar el periodo
@@ -153,39 +413,43 @@ async def obtener_resumen_financiero(
     )
 
 
+@un_solo_vuelo
 async def obtener_estadisticas_ocupacion(
     db: AsyncSession,
     fecha_inicio: Optional[date] = None,
     fecha_fin: Optional[date] = None
 ) -> EstadisticasOcupacion:
-    """Obtener estadísticas de ocupación de habitaciones"""
-    
-    # Total de habitaciones
-    query_total_habitaciones = select(func.count(Habitacion.id))
-    result_total = await db.execute(query_total_habitaciones)
-    total_habitaciones = result_total.scalar()
-    
-    # Query para reservas en el período
-    query_reservas = text("""
-        SELECT COUNT(*) as total_reservas,
-               COUNT(DISTINCT habitacion_id) as habitaciones_ocupadas
-        FROM reservas
-        WHERE estado IN ('reservada', 'completada')
-        AND (:fecha_inicio IS NULL OR fecha_inicio >= :fecha_inicio)
-        AND (:fecha_fin IS NULL OR fecha_fin <= :fecha_fin)
-    """)
+    """Obtener estadísticas de ocupación de habitaciones a partir de las noches ocupadas"""
     
-    result_reservas = await db.execute(
-        query_reservas,
-        {"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin}
+    # Total de habitaciones y noches ocupadas del período (recorrido del índice por fecha) en una sola consulta
+    total_habitaciones_sq = select(func.count(Habitacion.id)).scalar_subquery()
+    query_noches = select(
+        total_habitaciones_sq,
+        func.count(),
+        func.count(distinct(NocheOcupada.reserva_id)),
+        func.count(distinct(NocheOcupada.habitacion_id)),
+        func.min(NocheOcupada.fecha),
+        func.max(NocheOcupada.fecha)
     )
+    conditions = []
+    if fecha_inicio:
+        conditions.append(NocheOcupada.fecha >= fecha_inicio)
+    if fecha_fin:
+        conditions.append(NocheOcupada.fecha <= fecha_fin)
+    if conditions:
+        query_noches = query_noches.where(and_(*conditions))
     
-    row = result_reservas.fetchone()
-    total_reservas = row[0] if row else 0
-    habitaciones_ocupadas = row[1] if row else 0
+    result_noches = await db.execute(query_noches)
+    total_habitaciones, noches_ocupadas, total_reservas, habitaciones_ocupadas, primera, ultima = result_noches.one()
+    
+    # Sin límites explícitos, el período va de la primera a la última noche ocupada
+    desde = fecha_inicio or primera
+    hasta = fecha_fin or ultima
+    dias = (hasta - desde).days + 1 if desde and hasta and desde <= hasta else 0
+    noches_disponibles = total_habitaciones * dias
     
     habitaciones_disponibles = total_habitaciones - habitaciones_ocupadas
-    porcentaje_ocupacion = (habitaciones_ocupadas / total_habitaciones * 100) if total_habitaciones > 0 else 0
+    porcentaje_ocupacion = (noches_ocupadas / noches_disponibles * 100) if noches_disponibles > 0 else 0
     
     # Determinar el periodo
     if fecha_inicio and fecha_fin:
@@ -201,6 +465,126 @@ async def obtener_estadisticas_ocupacion(
         total_reservas=total_reservas,
         habitaciones_ocupadas=habitaciones_ocupadas,
         habitaciones_disponibles=habitaciones_disponibles,
+        noches_ocupadas=noches_ocupadas,
+        noches_disponibles=noches_disponibles,
         porcentaje_ocupacion=round(porcentaje_ocupacion, 2),
         periodo=periodo
-    )
\ No newline at end of file
+    )
+
+
+@un_solo_vuelo
+async def obtener_ocupacion_diaria(
+    db: AsyncSession,
+    fecha_inicio: date,
+    fecha_fin: date
+) -> List[OcupacionDiaria]:
+    """Obtener la ocupación de cada día del período, incluyendo los días sin noches ocupadas.
+
+    Los días de períodos cerrados salen de su instantánea, con el total de
+    habitaciones que había al cerrar.
+    """
+    tramos = await _tramos(db, fecha_inicio, fecha_fin)
+    cerrados = {}
+    ocupadas_por_dia = {}
+    total_habitaciones = None
+    for desde, hasta, cerrado in tramos:
+        if cerrado:
+            for dia, ocupadas, total in await periodos_cerrados.filas(db, INSTANTANEA_OCUPACION_DIARIA, desde, hasta):
+                cerrados[dia] = (ocupadas, total)
+            continue
+        if total_habitaciones is None:
+            result_total = await db.execute(select(func.count(Habitacion.id)))
+            total_habitaciones = result_total.scalar()
+        
+        query = (
+            select(NocheOcupada.fecha, func.count(distinct(NocheOcupada.habitacion_id)))
+            .where(NocheOcupada.fecha >= desde, NocheOcupada.fecha <= hasta)
+            .group_by(NocheOcupada.fecha)
+        )
+        result = await db.execute(query)
+        ocupadas_por_dia.update(result.all())
+    
+    serie = []
+    for desplazamiento in range((fecha_fin - fecha_inicio).days + 1):
+        dia = fecha_inicio + timedelta(days=desplazamiento)
+        ocupadas, total_habitaciones_dia = cerrados.get(dia, (ocupadas_por_dia.get(dia, 0), total_habitaciones))
+        porcentaje = (ocupadas / total_habitaciones_dia * 100) if total_habitaciones_dia else 0
+        serie.append(OcupacionDiaria(
+            fecha=dia,
+            habitaciones_ocupadas=ocupadas,
+            porcentaje_ocupacion=round(porcentaje, 2)
+        ))
+    return serie
+
+
+# Granularidad -> (unidad de date_trunc, paso de generate_series)
+GRANULARIDADES = {
+    "dia": ("day", "1 day"),
+    "semana": ("week", "1 week"),
+    "mes": ("month", "1 month"),
+    "anio": ("year", "1 year"),
+}
+
+
+@un_solo_vuelo
+async def obtener_serie_movimientos(
+    db: AsyncSession,
+    granularidad: str,
+    fecha_inicio: date,
+    fecha_fin: date,
+    tipo: Optional[str] = None
+) -> List[PuntoSerie]:
+    """Obtener totales de ingresos y egresos por período, incluyendo los períodos sin movimientos.
+
+    Los períodos se agrupan en la base de datos sobre el resumen diario; las
+    semanas empiezan el lunes. `tipo` ('Ingreso' o 'Egreso') limita los totales a ese tipo.
+    """
+    unidad, paso = GRANULARIDADES[granularidad]
+    query = text("""
+        WITH periodos AS (
+            SELECT generate_series(
+                date_trunc(:unidad, CAST(:fecha_inicio AS date)::timestamp),
+                date_trunc(:unidad, CAST(:fecha_fin AS date)::timestamp),
+                CAST(:paso AS interval)
+            )::date AS periodo
+        ),
+        totales AS (
+            SELECT date_trunc(:unidad, fecha::timestamp)::date AS periodo,
+                   SUM(total_ingresos) AS ingresos,
+                   SUM(total_egresos) AS egresos,
+                   SUM(cantidad_ingresos) AS cantidad_ingresos,
+                   SUM(cantidad_egresos) AS cantidad_egresos
+            FROM resumen_diario
+            WHERE fecha >= :fecha_inicio AND fecha <= :fecha_fin
+            GROUP BY 1
+        )
+        SELECT p.periodo,
+               COALESCE(t.ingresos, 0) AS ingresos,
+               COALESCE(t.egresos, 0) AS egresos,
+               COALESCE(t.cantidad_ingresos, 0) AS cantidad_ingresos,
+               COALESCE(t.cantidad_egresos, 0) AS cantidad_egresos
+        FROM periodos p
+        LEFT JOIN totales t ON t.periodo = p.periodo
+        ORDER BY p.periodo
+    """)
+    result = await db.execute(query, {
+        "unidad": unidad,
+        "paso": paso,
+        "fecha_inicio": fecha_inicio,
+        "fecha_fin": fecha_fin
+    })
+    
+    serie = []
+    for periodo, ingresos, egresos, cantidad_ingresos, cantidad_egresos in result.all():
+        if tipo == "Ingreso":
+            egresos, cantidad_egresos = Decimal("0"), 0
+        elif tipo == "Egreso":
+            ingresos, cantidad_ingresos = Decimal("0"), 0
+        serie.append(PuntoSerie(
+            periodo=periodo,
+            ingresos=ingresos,
+            egresos=egresos,
+            saldo=ingresos - egresos,
+            cantidad=cantidad_ingresos + cantidad_egresos
+        ))
+    return serie
@@ -1,83 +1,161 @@
-from sqlalchemy import and_, or_
+from sqlalchemy import Date, Integer, func, insert, literal
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.reserva import Reserva
 from app.models.habitacion import Habitacion
-from app.schemas.reserva import ReservaCreate
+from app.schemas.reserva import ReservaCreate, ReservaRead, verificar_rango_estadia
+from app.services.indice_reservas import indice_reservas
+from app.services.calendario import calendario
+from app.services.contadores import contadores_reservas
+from app.services.vistas_reportes import refresco_vistas
+from app.services.cache_reportes import cache_reportes
+from app.services.versiones import versiones_tablas
+from app.services.periodos import CHECK_VIOLATION, error_estadia_cerrada, periodos_cerrados
+from app.crud.transiciones import TRANSICIONES, transicionar_reservas
+from app.crud.ocupacion import registrar_noches
+from app.crud.ari import registrar_cambio_habitacion
 from fastapi import HTTPException
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+MENSAJE_CONFLICTO = "Ya existe una reserva para esa habitación en el rango de fechas."
+EXCLUSION_VIOLATION = "23P01"  # SQLSTATE de PostgreSQL para exclusion_violation
+
 
 async def crear_reserva(db: AsyncSession, reserva: ReservaCreate):
-    # 1. Verificar fechas
-    if reserva.fecha_inicio >= reserva.fecha_fin:
-        raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior a la fecha de fin.")
-
-    # 2. Verificar disponibilidad de la habitación
-    hab_result = await db.execute(select(Habitacion).where(Habitacion.id == reserva.habitacion_id))
-    habitacion = hab_result.scalar_one_or_none()
-    if not habitacion:
-        raise HTTPException(status_code=404, detail="Habitación no encontrada.")
-    if habitacion.estado != "disponible":
-        raise HTTPException(status_code=400, detail="La habitación no está disponible.")
+    # 1. Verificar fechas: cada noche es una fila de noches_ocupadas en esta misma transacción
+    try:
+        verificar_rango_estadia(reserva.fecha_inicio, reserva.fecha_fin)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    # 3. Verificar conflictos de fechas
-    result = await db.execute(
-        select(Reserva).where(
-            Reserva.habitacion_id == reserva.habitacion_id,
-            Reserva.estado == "reservada",
-            or_(
-                and_(Reserva.fecha_inicio <= reserva.fecha_inicio, Reserva.fecha_fin > reserva.fecha_inicio),
-                and_(Reserva.fecha_inicio < reserva.fecha_fin, Reserva.fecha_fin >= reserva.fecha_fin),
-                and_(Reserva.fecha_inicio >= reserva.fecha_inicio, Reserva.fecha_fin <= reserva.fecha_fin),
-            )
+    # 2. Las noches de los períodos contables cerrados ya están en sus instantáneas
+    await periodos_cerrados.asegurar_cargado(db)
+    periodos_cerrados.verificar_estadia_abierta(reserva.fecha_inicio, reserva.fecha_fin)
+
+    # 3. Verificar conflictos de fechas en el índice en memoria y apartar el rango
+    await indice_reservas.asegurar_cargado(db)
+    if not indice_reservas.apartar(reserva.habitacion_id, reserva.fecha_inicio, reserva.fecha_fin):
+        raise HTTPException(status_code=400, detail=MENSAJE_CONFLICTO)
+
+    # 4. Crear reserva en un solo INSERT; la restricción de exclusión confirma que no hay solapamiento
+    try:
+        nueva_reserva = await _insertar_reserva(db, reserva)
+    except Exception:
+        indice_reservas.liberar(reserva.habitacion_id, reserva.fecha_inicio, reserva.fecha_fin)
+        raise
+    indice_reservas.registrar(nueva_reserva.id, reserva.habitacion_id, reserva.fecha_inicio, reserva.fecha_fin)
+    await calendario.asegurar_cargado(db)
+    calendario.marcar(reserva.habitacion_id, reserva.fecha_inicio, reserva.fecha_fin)
+    contadores_reservas.invalidar(reserva.habitacion_id)
+    refresco_vistas.marcar("reservas")
+    versiones_tablas.incrementar("reservas")
+    # Noches de la reserva: de la llegada a la noche anterior a la salida
+    cache_reportes.invalidar("reservas", reserva.fecha_inicio, reserva.fecha_fin - timedelta(days=1))
+    return nueva_reserva
+
+
+async def _insertar_reserva(db: AsyncSession, reserva: ReservaCreate) -> Reserva:
+    """Insertar la reserva en una sola sentencia INSERT ... SELECT.
+
+    Solo se inserta si la habitación existe y no tiene un bloqueo manual; si no
+    devuelve filas se consulta la habitación para elegir el error. La habitación
+    no se modifica ni se bloquea: su ocupación se deriva de las reservas. Las
+    noches ocupadas y el cambio ARI se registran en la misma transacción.
+    """
+    stmt = (
+        insert(Reserva)
+        .from_select(
+            ["cliente_id", "habitacion_id", "fecha_inicio", "fecha_fin", "estado"],
+            select(
+                literal(reserva.cliente_id, Integer),
+                Habitacion.id,
+                literal(reserva.fecha_inicio, Date),
+                literal(reserva.fecha_fin, Date),
+                literal("reservada"),
+            ).where(Habitacion.id == reserva.habitacion_id, Habitacion.estado == "disponible"),
         )
+        .returning(Reserva)
     )
-    conflictos = result.scalars().all()
-    if conflictos:
-        raise HTTPException(status_code=400, detail="Ya existe una reserva para esa habitación en el rango de fechas.")
-
-    # 4. Crear reserva
-    nueva_reserva = Reserva(**reserva.dict())
-    db.add(nueva_reserva)
-    habitacion.estado = "ocupada"
-    await db.commit()
-    await db.refresh(nueva_reserva)
+    try:
+        result = await db.execute(stmt)
+        nueva_reserva = result.scalar_one_or_none()
+        if nueva_reserva is not None:
+            await registrar_noches(db, [nueva_reserva.id])
+            await registrar_cambio_habitacion(
+                db, reserva.habitacion_id, "reserva_creada", reserva.fecha_inicio, reserva.fecha_fin
+            )
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if getattr(exc.orig, "sqlstate", None) == EXCLUSION_VIOLATION:
+            raise HTTPException(status_code=400, detail=MENSAJE_CONFLICTO)
+        # Trigger de noches_ocupadas: el período se cerró antes de confirmar
+        if getattr(exc.orig, "sqlstate", None) == CHECK_VIOLATION:
+            raise error_estadia_cerrada()
+        raise
+
+    if nueva_reserva is None:
+        hab_result = await db.execute(select(Habitacion.id).where(Habitacion.id == reserva.habitacion_id))
+        if hab_result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Habitación no encontrada.")
+        raise HTTPException(status_code=400, detail="La habitación no está disponible.")
     return nueva_reserva
 
-async def obtener_reservas(db: AsyncSession):
-    result = await db.execute(select(Reserva))
-    return result.scalars().all()
+async def obtener_reservas(db: AsyncSession) -> List[ReservaRead]:
+    # Filas Core armadas directo en el esquema de respuesta: sin entidades ORM ni validación por fila
+    campos = list(ReservaRead.model_fields)
+    result = await db.execute(select(*[getattr(Reserva, c) for c in campos]))
+    return [ReservaRead.model_construct(**fila._mapping) for fila in result.all()]
 
-async def cancelar_reserva(db: AsyncSession, reserva_id: int):
-    # Obtener la reserva
-    result = await db.execute(select(Reserva).where(Reserva.id == reserva_id))
-    reserva = result.scalar_one_or_none()
+async def buscar_reservas(
+    db: AsyncSession,
+    cliente_id: Optional[int] = None,
+    habitacion_id: Optional[int] = None,
+    estado: Optional[str] = None,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    cursor: Optional[int] = None,
+    limite: int = 50
+) -> Tuple[List[Reserva], Optional[int]]:
+    """Buscar reservas de la más reciente a la más antigua, paginando por cursor (id).
 
-    if not reserva:
-        raise HTTPException(status_code=404, detail="Reserva no encontrada")
+    Retorna la página y el cursor para pedir la siguiente (None si no hay más).
+    El costo depende del tamaño de la página, no del número de reservas.
+    """
+    query = select(Reserva)
+    if cliente_id is not None:
+        query = query.where(Reserva.cliente_id == cliente_id)
+    if habitacion_id is not None:
+        query = query.where(Reserva.habitacion_id == habitacion_id)
+    if estado:
+        query = query.where(Reserva.estado == estado)
+    if fecha_inicio or fecha_fin:
+        # Reservas con alguna noche dentro del rango (extremos nulos = sin límite)
+        rango = func.daterange(literal(fecha_inicio, Date), literal(fecha_fin, Date), "[)")
+        query = query.where(Reserva.periodo.overlaps(rango))
+    if cursor is not None:
+        query = query.where(Reserva.id < cursor)
 
-    if reserva.estado == "cancelada":
-        raise HTTPException(status_code=400, detail="La reserva ya está cancelada")
+    result = await db.execute(query.order_by(Reserva.id.desc()).limit(limite + 1))
+    reservas = result.scalars().all()
+    siguiente = reservas[limite - 1].id if len(reservas) > limite else None
+    return reservas[:limite], siguiente
 
-    # Cancelar la reserva
-    reserva.estado = "cancelada"
-    await db.commit()
+async def cancelar_reserva(db: AsyncSession, reserva_id: int):
+    actualizadas, _ = await transicionar_reservas(db, [reserva_id], "cancelada")
+    if actualizadas:
+        return actualizadas[0]
 
-    # Verificar si hay otras reservas activas para la misma habitación
-    result = await db.execute(
-        select(Reserva).where(
-            Reserva.habitacion_id == reserva.habitacion_id,
-            Reserva.estado == "reservada"
-        )
-    )
-    reservas_activas = result.scalars().all()
-
-    # Si no hay más reservas activas, marcar la habitación como disponible
-    if not reservas_activas:
-        hab_result = await db.execute(select(Habitacion).where(Habitacion.id == reserva.habitacion_id))
-        habitacion = hab_result.scalar_one_or_none()
-        if habitacion:
-            habitacion.estado = "disponible"
-            await db.commit()
-
-    await db.refresh(reserva)
-    return reserva
\ No newline at end of file
+    # No se pudo cancelar: averiguar por qué
+    result = await db.execute(select(Reserva.estado).where(Reserva.id == reserva_id))
+    estado = result.scalar_one_or_none()
+    if estado is None:
+        raise HTTPException(status_code=404, detail="Reserva no encontrada")
+    if estado == "cancelada":
+        raise HTTPException(status_code=400, detail="La reserva ya está cancelada")
+    if estado in TRANSICIONES["cancelada"]:
+        # Estado válido: se rechazó porque tiene noches en un período cerrado
+        raise error_estadia_cerrada()
+    raise HTTPException(status_code=400, detail=f"No se puede cancelar una reserva en estado '{estado}'")
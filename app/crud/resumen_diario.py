@@ -0,0 +1,25 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.resumen_diario import ResumenDiario
+
+
+async def acumular_ingreso(db: AsyncSession, fecha: date, monto) -> None:
+    """Sumar un ingreso al resumen de su día (sin confirmar la transacción)"""
+    await _acumular(db, fecha, total_ingresos=Decimal(str(monto)), cantidad_ingresos=1)
+
+
+async def acumular_egreso(db: AsyncSession, fecha: date, monto) -> None:
+    """Sumar un egreso al resumen de su día (sin confirmar la transacción)"""
+    await _acumular(db, fecha, total_egresos=Decimal(str(monto)), cantidad_egresos=1)
+
+
+async def _acumular(db: AsyncSession, fecha: date, **incrementos) -> None:
+    # Upsert: la primera escritura del día crea la fila, las siguientes suman
+    stmt = insert(ResumenDiario).values(fecha=fecha, **incrementos)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ResumenDiario.fecha],
+        set_={columna: getattr(ResumenDiario, columna) + valor for columna, valor in incrementos.items()}
+    )
+    await db.execute(stmt)
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from typing import List, Tuple
+from sqlalchemy import exists, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.periodo_cerrado import PeriodoCerrado
+from app.models.reserva import Reserva, ESTADOS_ACTIVOS, ESTADOS_OCUPACION
+from app.services.indice_reservas import indice_reservas
+from app.services.calendario import calendario
+from app.services.contadores import contadores_reservas
+from app.services.vistas_reportes import refresco_vistas
+from app.services.cache_reportes import cache_reportes
+from app.services.versiones import versiones_tablas
+from app.services.periodos import CHECK_VIOLATION, error_estadia_cerrada
+from app.crud.ocupacion import actualizar_noches
+from app.crud.ari import registrar_cambios_reservas
+
+# Estado destino -> estados de origen permitidos
+TRANSICIONES = {
+    "en_curso": ("reservada",),        # check-in
+    "completada": ("en_curso",),       # check-out
+    "no_presentada": ("reservada",),   # no-show
+    "cancelada": ("reservada",),       # cancelación
+}
+
+
+async def transicionar_reservas(
+    db: AsyncSession,
+    reserva_ids: List[int],
+    estado: str
+) -> Tuple[List[Reserva], List[int]]:
+    """Aplicar una transición de estado a un lote de reservas en una sola transacción.
+
+    Retorna las reservas actualizadas y los ids rechazados (inexistentes o cuyo
+    estado actual no permite la transición, o cuyas noches se borrarían y
+    alguna está en un período cerrado). Si algo falla no se aplica nada
+    del lote. El lote no pasa por las colas de las habitaciones: sus filas se
+    bloquean en orden de id al empezar, así que espera a las reservas y
+    cancelaciones en curso sobre ellas (y a otros lotes) sin interbloqueos.
+    """
+    try:
+        await db.execute(
+            select(Reserva.id).where(Reserva.id.in_(reserva_ids)).order_by(Reserva.id).with_for_update()
+        )
+        condiciones = [Reserva.id.in_(reserva_ids), Reserva.estado.in_(TRANSICIONES[estado])]
+        if estado not in ESTADOS_OCUPACION:
+            # Sus noches se borran: no se admite si alguna está en un período cerrado (queda rechazada)
+            condiciones.append(~exists().where(
+                PeriodoCerrado.fecha_inicio < Reserva.fecha_fin, PeriodoCerrado.fecha_fin >= Reserva.fecha_inicio
+            ))
+        result = await db.execute(
+            update(Reserva)
+            .where(*condiciones)
+            .values(estado=estado)
+            .returning(Reserva)
+            .execution_options(synchronize_session=False)
+        )
+        actualizadas = result.scalars().all()
+        await actualizar_noches(db, [r.id for r in actualizadas], estado)
+        if estado not in ESTADOS_ACTIVOS:
+            # Las noches quedan libres: cambia la disponibilidad publicada en los canales
+            await registrar_cambios_reservas(db, [r.id for r in actualizadas], f"reserva_{estado}")
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        # Trigger de noches_ocupadas: un cierre confirmado mientras se esperaba el bloqueo
+        if getattr(exc.orig, "sqlstate", None) == CHECK_VIOLATION:
+            raise error_estadia_cerrada()
+        raise
+    except Exception:
+        await db.rollback()
+        raise
+    if actualizadas:
+        refresco_vistas.marcar("reservas")
+        versiones_tablas.incrementar("reservas")
+    for reserva in actualizadas:
+        cache_reportes.invalidar("reservas", reserva.fecha_inicio, reserva.fecha_fin - timedelta(days=1))
+
+    for habitacion_id in {r.habitacion_id for r in actualizadas}:
+        contadores_reservas.invalidar(habitacion_id)
+    if estado not in ESTADOS_ACTIVOS:
+        await indice_reservas.asegurar_cargado(db)
+        await calendario.asegurar_cargado(db)
+        for reserva in actualizadas:
+            indice_reservas.quitar(reserva.id)
+            calendario.liberar(reserva.habitacion_id, reserva.fecha_inicio, reserva.fecha_fin)
+
+    ids_actualizados = {r.id for r in actualizadas}
+    rechazadas = [reserva_id for reserva_id in dict.fromkeys(reserva_ids) if reserva_id not in ids_actualizados]
+    return actualizadas, rechazadas
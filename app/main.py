@@ -1,16 +1,62 @@
+from pathlib import Path
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from fastapi import FastAPI
-from app.database import engine, Base
-from app.routers import habitacion, cliente, reserva, ingresos, egresos,usuario,cuenta,parametro,reportes , facturas, pagos
+from app.database import engine, AsyncSessionLocal
+from app.routers import habitacion, cliente, reserva, ingresos, egresos,usuario,cuenta,parametro,reportes , facturas, pagos, periodos
+from app.services.indice_reservas import indice_reservas
+from app.services.calendario import calendario
+from app.services.periodos import periodos_cerrados
+from app.services.vistas_reportes import refresco_vistas
+from app.services.trabajos_reportes import cola_reportes
+from app.services.versiones import reservar_proceso
 
 
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
 app = FastAPI(title="Sistema de Reservas de Hoteles")
 
-# (Opcional) Evento startup para crear tablas automáticamente
+
+def _verificar_migraciones(conn) -> None:
+    """Detener el arranque si la base de datos no está en la última migración.
+
+    El esquema lo crean solo las migraciones (`alembic upgrade head`): con
+    create_all las tablas nuevas aparecían vacías y las migraciones que las
+    crean y rellenan fallaban después.
+    """
+    actuales = set(MigrationContext.configure(conn).get_current_heads())
+    esperadas = set(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+    if actuales != esperadas:
+        raise RuntimeError(
+            f"La base de datos está en la migración {sorted(actuales) or 'ninguna'} y se espera "
+            f"{sorted(esperadas)}; ejecute `alembic upgrade head` antes de iniciar la aplicación."
+        )
+
 @app.on_event("startup")
 async def on_startup():
-    # Crea las tablas que declares en tus modelos (si no existen)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    async with engine.connect() as conn:
+        await conn.run_sync(_verificar_migraciones)
+    # Un único proceso por base de datos: el estado en memoria no se comparte
+    app.state.conexion_proceso = await reservar_proceso(engine)
+
+    # Precargar el índice y el calendario en memoria de reservas activas
+    async with AsyncSessionLocal() as session:
+        await indice_reservas.cargar(session)
+        await calendario.cargar(session)
+        await periodos_cerrados.cargar(session)
+
+    # Refrescar las vistas de reportes al iniciar y luego cuando cambien sus tablas
+    refresco_vistas.marcar_todas()
+    refresco_vistas.iniciar(AsyncSessionLocal)
+    # Limpieza de los resultados vencidos de los trabajos de exportación
+    cola_reportes.iniciar()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await refresco_vistas.detener()
+    await cola_reportes.detener()
+    await app.state.conexion_proceso.close()
 
 @app.get("/",tags=["Bienvenida"])
 async def root():
@@ -26,4 +72,5 @@ app.include_router(ingresos.router)
 app.include_router(egresos.router)
 app.include_router(reportes.router)
 app.include_router(facturas.router)
-app.include_router(pagos.router)
\ No newline at end of file
+app.include_router(pagos.router)
+app.include_router(periodos.router)
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, BigInteger, Date, String, TIMESTAMP, func
+from app.database import Base
+
+class CambioARI(Base):
+    """Registro de cambios de disponibilidad y tarifas (ARI) por tipo de habitación.
+
+    Cada fila marca como modificadas las noches [fecha_inicio, fecha_fin) de un
+    tipo; un extremo nulo significa sin límite (por ejemplo, una habitación
+    nueva cambia todas las noches). `seq` es creciente y sirve de cursor al feed:
+    las escrituras se serializan (crud/ari.py) para que se confirmen en orden de seq.
+    """
+    __tablename__ = "cambios_ari"
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    tipo = Column(String(50), nullable=False)
+    fecha_inicio = Column(Date)
+    fecha_fin = Column(Date)
+    motivo = Column(String(30), nullable=False)
+    registrado = Column(TIMESTAMP, server_default=func.now())
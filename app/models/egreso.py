@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, Text, Numeric, Date
+from sqlalchemy import Column, Index, text, Integer, Text, Numeric, Date
 from app.database import Base
 from datetime import date
 
 class Egreso(Base):
     __tablename__ = "egresos"
+    # Últimos movimientos del dashboard: lectura del índice en orden con LIMIT (sin fecha al final)
+    __table_args__ = (Index("ix_egresos_fecha_desc_id", text("fecha DESC NULLS LAST"), text("id DESC")),)
 
     id = Column(Integer, primary_key=True, index=True)
     descripcion = Column(Text, nullable=False)
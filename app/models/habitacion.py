@@ -9,6 +9,8 @@ class Habitacion(Base):
     numero = Column(String(10), unique=True, nullable=False)
     tipo = Column(String(50), nullable=False)
     precio_noche = Column(Numeric(10, 2), nullable=False)
-    estado = Column(String(20), default="disponible")  # 'disponible', 'ocupada', etc.
+    # Estado operativo: 'disponible' o un bloqueo manual ('mantenimiento', ...).
+    # La ocupación ('ocupada') se deriva de las reservas y no se guarda aquí.
+    estado = Column(String(20), default="disponible")
 
     reservas = relationship("Reserva", back_populates="habitacion")
\ No newline at end of file
@@ -1,13 +1,15 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, Text, Date
+from sqlalchemy import Column, Index, text, Integer, ForeignKey, Numeric, Text, Date
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import date
 
 class Ingreso(Base):
     __tablename__ = "ingresos"
+    # Últimos movimientos del dashboard: lectura del índice en orden con LIMIT (sin fecha al final)
+    __table_args__ = (Index("ix_ingresos_fecha_desc_id", text("fecha DESC NULLS LAST"), text("id DESC")),)
 
     id = Column(Integer, primary_key=True, index=True)
-    reserva_id = Column(Integer, ForeignKey("reservas.id"))
+    reserva_id = Column(Integer, ForeignKey("reservas.id"), index=True)
     monto = Column(Numeric(10, 2), nullable=False)
     descripcion = Column(Text)
     fecha = Column(Date, default=date.today)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date, String, Index
+from app.database import Base
+
+class NocheOcupada(Base):
+    """Tabla de hechos: una fila por cada noche ocupada de una habitación.
+
+    Se mantiene junto con las reservas (crear, check-in, check-out, cancelar)
+    para que las estadísticas de ocupación sean recorridos por rango de fecha.
+    Las noches de un período cerrado no se agregan ni se borran (trigger de la
+    migración 0014): su ocupación está en la instantánea del cierre.
+    """
+    __tablename__ = "noches_ocupadas"
+
+    reserva_id = Column(Integer, ForeignKey("reservas.id", ondelete="CASCADE"), primary_key=True)
+    fecha = Column(Date, primary_key=True)
+    habitacion_id = Column(Integer, ForeignKey("habitaciones.id"), nullable=False)
+    estado = Column(String(20), nullable=False)
+
+    __table_args__ = (
+        Index("ix_noches_ocupadas_fecha_habitacion", fecha, habitacion_id),
+    )
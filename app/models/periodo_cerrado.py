@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, Date, String, LargeBinary, ForeignKey, TIMESTAMP, UniqueConstraint, func
+from app.database import Base
+
+class PeriodoCerrado(Base):
+    """Mes contable cerrado: no admite movimientos nuevos y sus reportes se leen de instantáneas.
+
+    Los meses se cierran en orden, así que los períodos cerrados forman un
+    único rango continuo de fechas.
+    """
+    __tablename__ = "periodos_cerrados"
+    __table_args__ = (UniqueConstraint("anio", "mes", name="uq_periodos_cerrados_anio_mes"),)
+
+    id = Column(Integer, primary_key=True)
+    anio = Column(Integer, nullable=False)
+    mes = Column(Integer, nullable=False)
+    fecha_inicio = Column(Date, nullable=False)
+    fecha_fin = Column(Date, nullable=False)
+    cerrado_en = Column(TIMESTAMP, nullable=False, server_default=func.now())
+
+
+class InstantaneaReporte(Base):
+    """Filas de un reporte de un período cerrado, como JSON comprimido con zlib"""
+    __tablename__ = "instantaneas_reportes"
+
+    periodo_id = Column(Integer, ForeignKey("periodos_cerrados.id", ondelete="CASCADE"), primary_key=True)
+    reporte = Column(String(30), primary_key=True)
+    filas = Column(Integer, nullable=False)
+    contenido = Column(LargeBinary, nullable=False)
@@ -3,6 +3,8 @@ from app.database import Base
 
 class VistaLibroDiario(Base):
     __tablename__ = "vistadellibro_diario"
+    # Vista materializada definida en la migración 0007; autogenerate no la compara
+    __table_args__ = {"info": {"es_vista": True}}
     
     # SQLAlchemy necesita una clave primaria, usamos una combinación de campos
     # Como las vistas no tienen PK real, creamos una artificial
@@ -10,6 +12,7 @@ class VistaLibroDiario(Base):
     tipo = Column(String(20), primary_key=True)
     descripcion = Column(Text, primary_key=True)
     monto = Column(Numeric(10, 2), nullable=False)
+    movimiento_id = Column(Integer)  # id en ingresos o egresos según `tipo`
 
     class Config:
         managed = False  # Indica que SQLAlchemy no debe gestionar esta tabla
@@ -17,6 +20,8 @@ class VistaLibroDiario(Base):
 
 class VistaRegistroHuespedes(Base):
     __tablename__ = "vistadelregistro_huespedes"
+    # Vista materializada definida en la migración 0007; autogenerate no la compara
+    __table_args__ = {"info": {"es_vista": True}}
     
     cliente = Column(String(100), primary_key=True)
     documento_identidad = Column(String(20), primary_key=True)
@@ -27,6 +32,7 @@ class VistaRegistroHuespedes(Base):
     habitacion = Column(String(10))
     tipo_habitacion = Column(String(50))
     estado_reserva = Column(String(20))
+    reserva_id = Column(Integer)
 
     class Config:
         managed = False
@@ -34,10 +40,13 @@ class VistaRegistroHuespedes(Base):
 
 class VistaRegistroOcupacion(Base):
     __tablename__ = "vistadelregistro_ocupacion"
+    # Vista materializada definida en la migración 0007; autogenerate no la compara
+    __table_args__ = {"info": {"es_vista": True}}
     
     habitacion = Column(String(10), primary_key=True)
     tipo = Column(String(50))
     fecha_inicio = Column(Date, primary_key=True)
     fecha_fin = Column(Date)
     estado_reserva = Column(String(20))
-    cliente = Column(String(100))
\ No newline at end of file
+    cliente = Column(String(100))
+    reserva_id = Column(Integer)
\ No newline at end of file
@@ -1,7 +1,13 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, String, TIMESTAMP, func
+from sqlalchemy import Column, Integer, ForeignKey, Date, String, TIMESTAMP, Computed, Index, func, text
+from sqlalchemy.dialects.postgresql import DATERANGE, ExcludeConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+# Estados que ocupan la habitación; el resto (cancelada, completada, no_presentada) la liberan
+ESTADOS_ACTIVOS = ("reservada", "en_curso")
+# Estados cuyas noches cuentan para la ocupación (tabla noches_ocupadas)
+ESTADOS_OCUPACION = ESTADOS_ACTIVOS + ("completada",)
+
 class Reserva(Base):
     __tablename__ = "reservas"
 
@@ -12,6 +18,24 @@ class Reserva(Base):
     fecha_fin = Column(Date, nullable=False)
     estado = Column(String(20), default="reservada")
     fecha_reserva = Column(TIMESTAMP, server_default=func.now())
+    # Noches de la reserva como rango semiabierto [fecha_inicio, fecha_fin)
+    periodo = Column(DATERANGE, Computed("daterange(fecha_inicio, fecha_fin, '[)')", persisted=True))
 
     habitacion = relationship("Habitacion", back_populates="reservas")
-    cliente = relationship("Cliente", back_populates="reservas")
\ No newline at end of file
+    cliente = relationship("Cliente", back_populates="reservas")
+
+    __table_args__ = (
+        # Dos reservas activas de la misma habitación no pueden compartir noches
+        ExcludeConstraint(
+            (habitacion_id, "="),
+            (periodo, "&&"),
+            name="reservas_sin_solapamiento",
+            using="gist",
+            where=text("estado IN ('reservada', 'en_curso')"),
+        ),
+        # Índices para la búsqueda paginada por cursor (filtro + orden por id)
+        Index("ix_reservas_cliente_id_id", cliente_id, id),
+        Index("ix_reservas_habitacion_id_id", habitacion_id, id),
+        Index("ix_reservas_estado_id", estado, id),
+        Index("ix_reservas_periodo", periodo, postgresql_using="gist"),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, Numeric, Date
+from app.database import Base
+
+class ResumenDiario(Base):
+    """Totales de ingresos y egresos por día, acumulados al registrar cada movimiento"""
+    __tablename__ = "resumen_diario"
+
+    fecha = Column(Date, primary_key=True)
+    total_ingresos = Column(Numeric(14, 2), nullable=False, default=0)
+    total_egresos = Column(Numeric(14, 2), nullable=False, default=0)
+    cantidad_ingresos = Column(Integer, nullable=False, default=0)
+    cantidad_egresos = Column(Integer, nullable=False, default=0)
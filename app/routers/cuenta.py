@@ -5,8 +5,10 @@ from app.crud import cuenta as crud_cuenta
 from app.database import get_async_session
 from typing import List, Optional, Literal
 from sqlalchemy import func, select
+from app.services.versiones import CATALOGO, etag_condicional
 
-router = APIRouter(tags=["Cuentas"])
+# El plan de cuentas cambia poco: ETag por versión de la tabla y caché corta en el cliente
+router = APIRouter(tags=["Cuentas"], dependencies=[Depends(etag_condicional("cuentas", cache_control=CATALOGO))])
 
 @router.post("/cuentas/", response_model=Cuenta, tags=["Cuentas"])
 async def crear_cuenta(cuenta: CuentaCreate, db: AsyncSession = Depends(get_async_session)):
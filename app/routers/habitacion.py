@@ -1,24 +1,117 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.habitacion import HabitacionCreate, HabitacionOut
+from app.schemas.habitacion import HabitacionCreate, HabitacionOut, MatrizDisponibilidad, CambiosARI
+from app.schemas.reserva import verificar_rango_estadia
 from app.crud import habitacion as crud_habitacion
+from app.crud import ari as crud_ari
 from app.database import get_async_session
+from app.services.versiones import SIN_CACHE, etag_condicional
 
-from typing import List
+from typing import List, Optional
+from datetime import date
+from urllib.parse import quote
 
 router = APIRouter()
 
+# La ocupación se deriva de las reservas y de la fecha: se revalida siempre (304 si nada cambió)
+CONDICIONAL_HABITACIONES = Depends(etag_condicional("habitaciones", "reservas", cache_control=SIN_CACHE, por_dia=True))
+
 @router.post("/habitaciones/", response_model=HabitacionOut, tags=["Habitaciones"])
 async def crear_habitacion(habitacion: HabitacionCreate, db: AsyncSession = Depends(get_async_session)):
     return await crud_habitacion.crear_habitacion(db, habitacion)
 
-@router.get("/habitaciones/", response_model=List[HabitacionOut], tags=["Habitaciones"])
-async def listar_habitaciones(db: AsyncSession = Depends(get_async_session)):
-    return await crud_habitacion.obtener_habitaciones(db)
+@router.get(
+    "/habitaciones/",
+    response_model=List[HabitacionOut],
+    tags=["Habitaciones"],
+    dependencies=[CONDICIONAL_HABITACIONES]
+)
+async def listar_habitaciones(
+    fecha: Optional[date] = Query(None, description="Fecha para calcular la ocupación (hoy por defecto)"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    return await crud_habitacion.obtener_habitaciones(db, fecha)
+
+@router.get(
+    "/habitaciones/disponibles",
+    response_model=List[HabitacionOut],
+    tags=["Habitaciones"],
+    dependencies=[CONDICIONAL_HABITACIONES]
+)
+async def listar_habitaciones_disponibles(
+    fecha_inicio: date = Query(..., description="Primera noche de la estadía"),
+    fecha_fin: date = Query(..., description="Fecha de salida (noche no incluida)"),
+    tipo: Optional[str] = Query(None, description="Tipo de habitación"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Habitaciones libres en todo el rango de fechas indicado"""
+    try:
+        verificar_rango_estadia(fecha_inicio, fecha_fin)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return await crud_habitacion.obtener_habitaciones_disponibles(db, fecha_inicio, fecha_fin, tipo)
+
+@router.get(
+    "/habitaciones/disponibilidad/matriz",
+    response_model=MatrizDisponibilidad,
+    tags=["Habitaciones"],
+    responses={200: {"content": {"application/octet-stream": {}}}}
+)
+async def matriz_disponibilidad(
+    fecha_inicio: Optional[date] = Query(None, description="Primera noche de la matriz (hoy por defecto)"),
+    dias: int = Query(365, ge=1, le=731, description="Número de noches"),
+    formato: str = Query("json", pattern="^(json|binario)$", description="Formato: json o binario"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Habitaciones libres por tipo y noche, para publicar en los canales de distribución.
+
+    En formato binario el cuerpo es la matriz int32 little-endian por filas; la
+    forma, la fecha de inicio, los tipos y el seq van en las cabeceras X-Matriz-*.
+    """
+    fecha_inicio = fecha_inicio or date.today()
+    seq, tipos, disponibles = await crud_habitacion.obtener_matriz_disponibilidad(db, fecha_inicio, dias)
+    if formato == "binario":
+        return Response(
+            content=disponibles.astype("<i4").tobytes(),
+            media_type="application/octet-stream",
+            headers={
+                "X-Matriz-Forma": f"{len(tipos)},{dias}",
+                "X-Matriz-Fecha-Inicio": fecha_inicio.isoformat(),
+                "X-Matriz-Tipos": ",".join(quote(tipo) for tipo in tipos),
+                "X-Matriz-Seq": str(seq),
+            }
+        )
+    return MatrizDisponibilidad(
+        fecha_inicio=fecha_inicio,
+        dias=dias,
+        tipos=tipos,
+        disponibles=disponibles.tolist(),
+        seq=seq
+    )
+
+@router.get("/habitaciones/disponibilidad/cambios", response_model=CambiosARI, tags=["Habitaciones"])
+async def cambios_disponibilidad(
+    desde_seq: int = Query(..., ge=0, description="seq de la matriz o hasta_seq de la consulta anterior"),
+    fecha_inicio: Optional[date] = Query(None, description="Primera noche de la ventana (hoy por defecto)"),
+    dias: int = Query(365, ge=1, le=731, description="Número de noches de la ventana"),
+    limite: int = Query(5000, ge=1, le=50000, description="Cambios máximos a procesar por consulta"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Celdas (tipo, fecha) cuya disponibilidad o tarifa cambió desde `desde_seq`"""
+    return await crud_ari.obtener_cambios(db, desde_seq, fecha_inicio or date.today(), dias, limite)
 
-@router.get("/habitaciones/{habitacion_id}", response_model=HabitacionOut, tags=["Habitaciones"])
-async def obtener_habitacion(habitacion_id: int, db: AsyncSession = Depends(get_async_session)):
-    habitacion = await crud_habitacion.obtener_habitacion_por_id(db, habitacion_id)
+@router.get(
+    "/habitaciones/{habitacion_id}",
+    response_model=HabitacionOut,
+    tags=["Habitaciones"],
+    dependencies=[CONDICIONAL_HABITACIONES]
+)
+async def obtener_habitacion(
+    habitacion_id: int,
+    fecha: Optional[date] = Query(None, description="Fecha para calcular la ocupación (hoy por defecto)"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    habitacion = await crud_habitacion.obtener_habitacion_por_id(db, habitacion_id, fecha)
     if not habitacion:
         raise HTTPException(status_code=404, detail="Habitación no encontrada")
     return habitacion
@@ -4,8 +4,10 @@ from typing import List
 from app.database import get_async_session
 from app.schemas.parametro import Parametro as ParametroSchema, ParametroCreate, ParametroUpdate
 from app.crud import parametro as crud_parametro
+from app.services.versiones import CATALOGO, etag_condicional
 
-router = APIRouter()
+# Los parámetros cambian poco: ETag por versión de la tabla y caché corta en el cliente
+router = APIRouter(dependencies=[Depends(etag_condicional("parametros", cache_control=CATALOGO))])
 
 @router.get("/parametros", response_model=List[ParametroSchema], tags=["Parametros"])
 async def listar_parametros(
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Path
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.database import get_async_session
+from app.schemas.periodo import PeriodoCerrado as PeriodoCerradoSchema
+from app.crud import periodos as crud_periodos
+
+router = APIRouter(prefix="/periodos", tags=["Periodos"])
+
+
+@router.get("/cerrados", response_model=List[PeriodoCerradoSchema])
+async def listar_periodos_cerrados(db: AsyncSession = Depends(get_async_session)):
+    """Meses contables cerrados, del más antiguo al más reciente"""
+    return await crud_periodos.listar_periodos_cerrados(db)
+
+
+@router.post("/{anio}/{mes}/cierre", response_model=PeriodoCerradoSchema, status_code=201)
+async def cerrar_periodo(
+    anio: int = Path(..., ge=2000, le=2100, description="Año del período"),
+    mes: int = Path(..., ge=1, le=12, description="Mes del período"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Cerrar un mes contable ya terminado. Guarda instantáneas comprimidas del
+    libro diario, del resumen diario y de la ocupación diaria del mes; desde
+    entonces esos reportes se leen de ellas y el mes no admite nuevos
+    ingresos ni egresos. Los meses se cierran en orden.
+    """
+    return await crud_periodos.cerrar_periodo(db, anio, mes)
@@ -1,80 +1,230 @@
-from fastapi import APIRouter, Depends, Query
+import asyncio
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_async_session
+from app.database import AsyncSessionLocal, get_async_session
 from app.schemas.reportes import (
     LibroDiarioSchema,
     RegistroHuespedesSchema,
     RegistroOcupacionSchema,
     ResumenFinanciero,
-    EstadisticasOcupacion
+    EstadisticasOcupacion,
+    OcupacionDiaria,
+    PuntoSerie,
+    KPIsHotel,
+    Dashboard,
+    SolicitudTrabajoReporte,
+    EstadoTrabajoReporte
 )
 from app.crud import reportes as crud_reportes
-from typing import List, Optional
-from datetime import date
+from app.crud import kpis as crud_kpis
+from app.services.cache_reportes import cache_reportes, SIN_LIMITES
+from app.services.exportacion import (
+    FORMATOS_COLUMNARES,
+    TIPOS_CONTENIDO,
+    columnar_disponible,
+    exportar_arrow,
+    exportar_csv,
+    exportar_json,
+    exportar_ndjson,
+    exportar_parquet
+)
+from app.services.vistas_reportes import (
+    refresco_vistas,
+    VISTA_LIBRO_DIARIO,
+    VISTA_REGISTRO_HUESPEDES,
+    VISTA_REGISTRO_OCUPACION,
+    VISTAS
+)
+from app.services.versiones import SIN_CACHE, etag_condicional
+from app.services.periodos import periodos_cerrados
+from app.services.trabajos_reportes import cola_reportes, TERMINADO, Trabajo
+from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta
 
 router = APIRouter(prefix="/reportes", tags=["Reportes"])
 
+MAX_DIAS_SERIE = 3660  # Días máximos de una serie diaria (unos 10 años)
+
+# Tablas (y vistas, que cambian al refrescarse) de las que dependen los reportes
+TABLAS_REPORTES = ("ingresos", "egresos", "reservas", "clientes", "habitaciones") + VISTAS
+
+
+def _periodo_cerrado(request: Request) -> bool:
+    """Si el rango pedido (fecha_inicio y fecha_fin) está dentro de los períodos contables cerrados"""
+    try:
+        desde = date.fromisoformat(request.query_params["fecha_inicio"])
+        hasta = date.fromisoformat(request.query_params["fecha_fin"])
+    except (KeyError, ValueError):
+        return False
+    return periodos_cerrados.contiene(desde, hasta)
+
+
+# Se revalidan siempre: las reservas (y por lo tanto la ocupación y los KPIs)
+# de fechas pasadas pueden cambiar en cualquier momento
+CONDICIONAL_REPORTES = Depends(etag_condicional(*TABLAS_REPORTES, cache_control=SIN_CACHE, por_dia=True))
+# Reportes que solo leen ingresos y egresos: dentro de un período cerrado no
+# se admiten movimientos, así que el cliente los reutiliza una hora sin
+# preguntar; fuera de él se revalidan siempre
+CONDICIONAL_CONTABLES = Depends(
+    etag_condicional(*TABLAS_REPORTES, cache_control=SIN_CACHE, por_dia=True, cerrado=_periodo_cerrado)
+)
+
+
+def _indicar_frescura(response: Response, *vistas: str) -> None:
+    """Agregar cabeceras con el último refresco y el desfase (segundos) de las vistas usadas"""
+    actualizado, desfase = refresco_vistas.estado(vistas)
+    response.headers["X-Reporte-Desfase"] = f"{desfase:.1f}"
+    if actualizado is not None:
+        response.headers["X-Reporte-Actualizado"] = actualizado.isoformat(timespec="seconds")
+
+
+async def _subreporte(tiempos: Dict[str, float], nombre: str, consulta, **kwargs):
+    """Ejecutar una consulta de reporte en su propia sesión (conexión del pool) y medir su duración"""
+    inicio = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            return await consulta(db, **kwargs)
+    finally:
+        tiempos[nombre] = (time.perf_counter() - inicio) * 1000
+
+
+async def _cacheado(response: Response, clave, dependencias, calcular):
+    """Servir el reporte desde la caché de resultados o calcularlo; indica el resultado en X-Cache"""
+    valor, acierto = await cache_reportes.obtener_o_calcular(clave, dependencias, calcular)
+    response.headers["X-Cache"] = "HIT" if acierto else "MISS"
+    return valor
+
 
-@router.get("/libro-diario", response_model=List[LibroDiarioSchema])
+def _exportar(formato: str, nombre: str, columnas, tipos, iterar, encabezado: dict, vista: str, **filtros):
+    """Respuesta en streaming del reporte en `formato` (json, csv, ndjson, arrow o parquet).
+
+    La consulta usa su propia sesión, abierta mientras se envía el cuerpo, y se
+    lee por lotes con un cursor del servidor: la memoria no depende de la
+    cantidad de filas. Arrow y Parquet se arman por columnas a partir de las
+    filas de la consulta, con tipos decimal y fecha.
+    """
+    formato = formato.lower()
+    if formato not in TIPOS_CONTENIDO:
+        raise HTTPException(
+            status_code=400, detail="Formato no soportado. Use json, csv, ndjson, arrow o parquet."
+        )
+    if formato in FORMATOS_COLUMNARES and not columnar_disponible():
+        raise HTTPException(status_code=501, detail=f"La exportación {formato} requiere pyarrow.")
+
+    async def contenido():
+        async with AsyncSessionLocal() as db:
+            lotes = iterar(db, **filtros)
+            if formato == "csv":
+                partes = exportar_csv(columnas, lotes)
+            elif formato == "ndjson":
+                partes = exportar_ndjson(columnas, lotes)
+            elif formato == "arrow":
+                partes = exportar_arrow(columnas, tipos, lotes)
+            elif formato == "parquet":
+                partes = exportar_parquet(columnas, tipos, lotes)
+            else:
+                partes = exportar_json(columnas, lotes, encabezado)
+            async for parte in partes:
+                yield parte
+
+    headers = {}
+    if formato != "json":
+        headers["Content-Disposition"] = f'attachment; filename="{nombre}.{formato}"'
+    respuesta = StreamingResponse(contenido(), media_type=TIPOS_CONTENIDO[formato], headers=headers)
+    _indicar_frescura(respuesta, vista)
+    return respuesta
+
+
+def _server_timing(tiempos: Dict[str, float]) -> str:
+    """Valor de la cabecera Server-Timing (duraciones en milisegundos)"""
+    return ", ".join(f"{nombre};dur={duracion:.1f}" for nombre, duracion in tiempos.items())
+
+
+@router.get("/libro-diario", response_model=List[LibroDiarioSchema], dependencies=[CONDICIONAL_CONTABLES])
 async def obtener_libro_diario(
+    response: Response,
     fecha_inicio: Optional[date] = Query(None, description="Fecha de inicio del período"),
     fecha_fin: Optional[date] = Query(None, description="Fecha de fin del período"),
     tipo: Optional[str] = Query(None, description="Tipo de movimiento: 'Ingreso' o 'Egreso'"),
+    limite: Optional[int] = Query(None, ge=1, le=10000, description="Máximo de registros a devolver"),
+    desplazamiento: int = Query(0, ge=0, description="Registros a saltar (paginación)"),
+    orden: str = Query("desc", pattern="^(asc|desc)$", description="Orden por fecha: asc o desc"),
     db: AsyncSession = Depends(get_async_session)
 ):
     """
     Obtener el libro diario con todos los movimientos de ingresos y egresos.
-    Permite filtrar por fechas y tipo de movimiento.
+    Permite filtrar por fechas y tipo de movimiento, y paginar con limite/desplazamiento.
     """
+    _indicar_frescura(response, VISTA_LIBRO_DIARIO)
     return await crud_reportes.obtener_libro_diario(
-        db, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin, tipo=tipo
+        db, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin, tipo=tipo,
+        limite=limite, desplazamiento=desplazamiento, orden=orden
     )
 
 
-@router.get("/registro-huespedes", response_model=List[RegistroHuespedesSchema])
+@router.get("/registro-huespedes", response_model=List[RegistroHuespedesSchema], dependencies=[CONDICIONAL_REPORTES])
 async def obtener_registro_huespedes(
+    response: Response,
     fecha_inicio: Optional[date] = Query(None, description="Fecha de inicio de la reserva"),
     fecha_fin: Optional[date] = Query(None, description="Fecha de fin de la reserva"),
     documento_identidad: Optional[str] = Query(None, description="Documento de identidad del huésped"),
     nombre_cliente: Optional[str] = Query(None, description="Nombre del cliente (búsqueda parcial)"),
+    limite: Optional[int] = Query(None, ge=1, le=10000, description="Máximo de registros a devolver"),
+    desplazamiento: int = Query(0, ge=0, description="Registros a saltar (paginación)"),
+    orden: str = Query("desc", pattern="^(asc|desc)$", description="Orden por fecha: asc o desc"),
     db: AsyncSession = Depends(get_async_session)
 ):
     """
     Obtener el registro completo de huéspedes con sus reservas.
     Permite filtrar por fechas, documento de identidad o nombre del cliente.
     """
+    _indicar_frescura(response, VISTA_REGISTRO_HUESPEDES)
     return await crud_reportes.obtener_registro_huespedes(
         db, 
         fecha_inicio=fecha_inicio, 
         fecha_fin=fecha_fin,
         documento_identidad=documento_identidad,
-        nombre_cliente=nombre_cliente
+        nombre_cliente=nombre_cliente,
+        limite=limite,
+        desplazamiento=desplazamiento,
+        orden=orden
     )
 
 
-@router.get("/registro-ocupacion", response_model=List[RegistroOcupacionSchema])
+@router.get("/registro-ocupacion", response_model=List[RegistroOcupacionSchema], dependencies=[CONDICIONAL_REPORTES])
 async def obtener_registro_ocupacion(
+    response: Response,
     fecha_inicio: Optional[date] = Query(None, description="Fecha de inicio del período"),
     fecha_fin: Optional[date] = Query(None, description="Fecha de fin del período"),
     numero_habitacion: Optional[str] = Query(None, description="Número de habitación específica"),
     tipo_habitacion: Optional[str] = Query(None, description="Tipo de habitación"),
+    limite: Optional[int] = Query(None, ge=1, le=10000, description="Máximo de registros a devolver"),
+    desplazamiento: int = Query(0, ge=0, description="Registros a saltar (paginación)"),
+    orden: str = Query("desc", pattern="^(asc|desc)$", description="Orden por fecha: asc o desc"),
     db: AsyncSession = Depends(get_async_session)
 ):
     """
     Obtener el registro de ocupación de habitaciones.
     Muestra qué habitaciones han estado ocupadas y por quién.
     """
+    _indicar_frescura(response, VISTA_REGISTRO_OCUPACION)
     return await crud_reportes.obtener_registro_ocupacion(
         db,
         fecha_inicio=fecha_inicio,
         fecha_fin=fecha_fin,
         numero_habitacion=numero_habitacion,
-        tipo_habitacion=tipo_habitacion
+        tipo_habitacion=tipo_habitacion,
+        limite=limite,
+        desplazamiento=desplazamiento,
+        orden=orden
     )
 
 
-@router.get("/resumen-financiero", response_model=ResumenFinanciero)
+@router.get("/resumen-financiero", response_model=ResumenFinanciero, dependencies=[CONDICIONAL_CONTABLES])
 async def obtener_resumen_financiero(
+    response: Response,
     fecha_inicio: Optional[date] = Query(None, description="Fecha de inicio del período"),
     fecha_fin: Optional[date] = Query(None, description="Fecha de fin del período"),
     db: AsyncSession = Depends(get_async_session)
@@ -83,13 +233,18 @@ async def obtener_resumen_financiero(
     Obtener un resumen financiero con totales de ingresos, egresos y saldo.
     Útil para tener una vista general de la situación financiera del hotel.
     """
-    return await crud_reportes.obtener_resumen_financiero(
-        db, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin
+    periodo = (fecha_inicio, fecha_fin)
+    return await _cacheado(
+        response,
+        cache_reportes.clave("resumen-financiero", fecha_inicio=fecha_inicio, fecha_fin=fecha_fin),
+        {"ingresos": periodo, "egresos": periodo},
+        lambda: crud_reportes.obtener_resumen_financiero(db, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
     )
 
 
-@router.get("/estadisticas-ocupacion", response_model=EstadisticasOcupacion)
+@router.get("/estadisticas-ocupacion", response_model=EstadisticasOcupacion, dependencies=[CONDICIONAL_REPORTES])
 async def obtener_estadisticas_ocupacion(
+    response: Response,
     fecha_inicio: Optional[date] = Query(None, description="Fecha de inicio del período"),
     fecha_fin: Optional[date] = Query(None, description="Fecha de fin del período"),
     db: AsyncSession = Depends(get_async_session)
@@ -98,70 +253,286 @@ async def obtener_estadisticas_ocupacion(
     Obtener estadísticas de ocupación de habitaciones.
     Incluye total de reservas, habitaciones ocupadas, disponibles y porcentaje de ocupación.
     """
-    return await crud_reportes.obtener_estadisticas_ocupacion(
+    return await _cacheado(
+        response,
+        cache_reportes.clave("estadisticas-ocupacion", fecha_inicio=fecha_inicio, fecha_fin=fecha_fin),
+        {"reservas": (fecha_inicio, fecha_fin), "habitaciones": SIN_LIMITES},
+        lambda: crud_reportes.obtener_estadisticas_ocupacion(db, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
+    )
+
+
+@router.get("/ocupacion-diaria", response_model=List[OcupacionDiaria], dependencies=[CONDICIONAL_REPORTES])
+async def obtener_ocupacion_diaria(
+    fecha_inicio: date = Query(..., description="Primer día de la serie"),
+    fecha_fin: date = Query(..., description="Último día de la serie"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Obtener la serie diaria de ocupación: habitaciones ocupadas y porcentaje por día.
+    Los días sin ocupación aparecen con 0.
+    """
+    if fecha_inicio > fecha_fin:
+        raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior o igual a la fecha de fin.")
+    if (fecha_fin - fecha_inicio).days + 1 > MAX_DIAS_SERIE:
+        raise HTTPException(status_code=400, detail=f"El período no puede superar {MAX_DIAS_SERIE} días.")
+    return await crud_reportes.obtener_ocupacion_diaria(
         db, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin
     )
 
 
+@router.get("/series", response_model=List[PuntoSerie], dependencies=[CONDICIONAL_CONTABLES])
+async def obtener_series(
+    granularidad: str = Query(..., pattern="^(dia|semana|mes|anio)$", description="dia, semana, mes o anio"),
+    fecha_inicio: date = Query(..., description="Fecha de inicio del período"),
+    fecha_fin: date = Query(..., description="Fecha de fin del período"),
+    tipo: Optional[str] = Query(None, pattern="^(Ingreso|Egreso)$", description="Tipo de movimiento: 'Ingreso' o 'Egreso'"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Obtener totales de ingresos, egresos y saldo agrupados por día, semana, mes o año.
+    Los períodos sin movimientos aparecen con totales en 0.
+    """
+    if fecha_inicio > fecha_fin:
+        raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior o igual a la fecha de fin.")
+    if granularidad == "dia" and (fecha_fin - fecha_inicio).days + 1 > MAX_DIAS_SERIE:
+        raise HTTPException(status_code=400, detail=f"El período no puede superar {MAX_DIAS_SERIE} días.")
+    return await crud_reportes.obtener_serie_movimientos(
+        db, granularidad, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin, tipo=tipo
+    )
+
+
+@router.get("/kpis", response_model=KPIsHotel, dependencies=[CONDICIONAL_REPORTES])
+async def obtener_kpis(
+    fecha_inicio: date = Query(..., description="Fecha de inicio del período"),
+    fecha_fin: date = Query(..., description="Fecha de fin del período (incluida)"),
+    tipo_habitacion: Optional[str] = Query(None, description="Tipo de habitación"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Obtener los indicadores del hotel para un período: ocupación, ADR, RevPAR,
+    estadía promedio y distribución de la anticipación de las reservas.
+    """
+    if fecha_inicio > fecha_fin:
+        raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior o igual a la fecha de fin.")
+    return await crud_kpis.obtener_kpis(db, fecha_inicio, fecha_fin, tipo_habitacion)
+
+
+@router.get("/kpis/mensual", response_model=List[KPIsHotel], dependencies=[CONDICIONAL_REPORTES])
+async def obtener_kpis_mensuales(
+    anio: int = Query(..., ge=2000, le=2100, description="Año del informe"),
+    tipo_habitacion: Optional[str] = Query(None, description="Tipo de habitación"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Obtener los indicadores de cada mes del año (informe mensual de gestión).
+    """
+    return await crud_kpis.obtener_kpis_mensuales(db, anio, tipo_habitacion)
+
+
 # Endpoints adicionales para exportación de reportes
 @router.get("/libro-diario/exportar")
 async def exportar_libro_diario(
     fecha_inicio: Optional[date] = Query(None),
     fecha_fin: Optional[date] = Query(None),
     tipo: Optional[str] = Query(None),
-    formato: str = Query("json", description="Formato de exportación: json, csv"),
-    db: AsyncSession = Depends(get_async_session)
+    formato: str = Query("json", description="Formato de exportación: json, csv, ndjson, arrow, parquet")
 ):
     """
-    Exportar el libro diario en diferentes formatos.
-    Por ahora solo soporta JSON, pero se puede extender para CSV o Excel.
+    Exportar el libro diario en JSON, CSV, NDJSON (un objeto por línea),
+    Arrow IPC o Parquet. La respuesta se envía en streaming a medida que se leen las filas.
     """
-    datos = await crud_reportes.obtener_libro_diario(
-        db, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin, tipo=tipo
+    return _exportar(
+        formato, "libro_diario", crud_reportes.COLUMNAS_LIBRO_DIARIO, crud_reportes.TIPOS_LIBRO_DIARIO,
+        crud_reportes.iterar_libro_diario,
+        {"formato": "json", "periodo": f"{fecha_inicio or 'inicio'} - {fecha_fin or 'fin'}"},
+        VISTA_LIBRO_DIARIO,
+        fecha_inicio=fecha_inicio, fecha_fin=fecha_fin, tipo=tipo
     )
-    
-    if formato.lower() == "csv":
-        # Aquí se podría implementar la conversión a CSV
-        # Por ahora retornamos un mensaje indicativo
-        return {"mensaje": "Exportación a CSV no implementada aún", "datos": datos}
+
+
+@router.get("/registro-huespedes/exportar")
+async def exportar_registro_huespedes(
+    fecha_inicio: Optional[date] = Query(None),
+    fecha_fin: Optional[date] = Query(None),
+    documento_identidad: Optional[str] = Query(None),
+    nombre_cliente: Optional[str] = Query(None),
+    formato: str = Query("json", description="Formato de exportación: json, csv, ndjson, arrow, parquet")
+):
+    """
+    Exportar el registro de huéspedes en JSON, CSV, NDJSON, Arrow IPC o Parquet, en streaming.
+    """
+    return _exportar(
+        formato, "registro_huespedes", crud_reportes.COLUMNAS_REGISTRO_HUESPEDES, crud_reportes.TIPOS_REGISTRO_HUESPEDES,
+        crud_reportes.iterar_registro_huespedes,
+        {"formato": "json", "periodo": f"{fecha_inicio or 'inicio'} - {fecha_fin or 'fin'}"},
+        VISTA_REGISTRO_HUESPEDES,
+        fecha_inicio=fecha_inicio, fecha_fin=fecha_fin,
+        documento_identidad=documento_identidad, nombre_cliente=nombre_cliente
+    )
+
+
+@router.get("/registro-ocupacion/exportar")
+async def exportar_registro_ocupacion(
+    fecha_inicio: Optional[date] = Query(None),
+    fecha_fin: Optional[date] = Query(None),
+    numero_habitacion: Optional[str] = Query(None),
+    tipo_habitacion: Optional[str] = Query(None),
+    formato: str = Query("json", description="Formato de exportación: json, csv, ndjson, arrow, parquet")
+):
+    """
+    Exportar el registro de ocupación en JSON, CSV, NDJSON, Arrow IPC o Parquet, en streaming.
+    """
+    return _exportar(
+        formato, "registro_ocupacion", crud_reportes.COLUMNAS_REGISTRO_OCUPACION, crud_reportes.TIPOS_REGISTRO_OCUPACION,
+        crud_reportes.iterar_registro_ocupacion,
+        {"formato": "json", "periodo": f"{fecha_inicio or 'inicio'} - {fecha_fin or 'fin'}"},
+        VISTA_REGISTRO_OCUPACION,
+        fecha_inicio=fecha_inicio, fecha_fin=fecha_fin,
+        numero_habitacion=numero_habitacion, tipo_habitacion=tipo_habitacion
+    )
+
+
+async def _armar_dashboard(response: Response, fecha_inicio: date, fecha_fin: date):
+    """Consultar los reportes del dashboard a la vez, cada uno en su propia sesión"""
+    tiempos: Dict[str, float] = {}
+    inicio = time.perf_counter()
+    resumen_financiero, estadisticas_ocupacion, ultimos_movimientos = await asyncio.gather(
+        _subreporte(
+            tiempos, "resumen", crud_reportes.obtener_resumen_financiero,
+            fecha_inicio=fecha_inicio, fecha_fin=fecha_fin
+        ),
+        _subreporte(
+            tiempos, "ocupacion", crud_reportes.obtener_estadisticas_ocupacion,
+            fecha_inicio=fecha_inicio, fecha_fin=fecha_fin
+        ),
+        # Últimos movimientos (últimos 10)
+        _subreporte(tiempos, "movimientos", crud_reportes.obtener_ultimos_movimientos, limite=10),
+    )
+    tiempos["total"] = (time.perf_counter() - inicio) * 1000
+    response.headers["Server-Timing"] = _server_timing(tiempos)
     
     return {
-        "formato": formato,
-        "total_registros": len(datos),
-        "periodo": f"{fecha_inicio or 'inicio'} - {fecha_fin or 'fin'}",
-        "datos": datos
+        "periodo": "Últimos 30 días",
+        "resumen_financiero": resumen_financiero,
+        "estadisticas_ocupacion": estadisticas_ocupacion,
+        "ultimos_movimientos": ultimos_movimientos,
+        "fecha_actualizacion": datetime.now()
     }
 
 
-@router.get("/dashboard")
-async def obtener_dashboard(
-    db: AsyncSession = Depends(get_async_session)
-):
+@router.get("/dashboard", response_model=Dashboard)
+async def obtener_dashboard(response: Response):
     """
     Endpoint para obtener datos del dashboard principal.
     Combina varios reportes en una sola respuesta para mostrar métricas clave.
+    Los reportes son independientes: se consultan a la vez, cada uno en su
+    propia conexión, y la duración de cada uno se informa en Server-Timing.
     """
     # Obtener datos de los últimos 30 días
-    from datetime import datetime, timedelta
     fecha_fin = date.today()
     fecha_inicio = fecha_fin - timedelta(days=30)
     
-    resumen_financiero = await crud_reportes.obtener_resumen_financiero(
-        db, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin
+    # Los últimos movimientos pueden ser de cualquier fecha
+    dependencias = {
+        "ingresos": SIN_LIMITES,
+        "egresos": SIN_LIMITES,
+        "reservas": (fecha_inicio, fecha_fin),
+        "habitaciones": SIN_LIMITES,
+    }
+    return await _cacheado(
+        response,
+        cache_reportes.clave("dashboard", fecha_inicio=fecha_inicio, fecha_fin=fecha_fin),
+        dependencias,
+        lambda: _armar_dashboard(response, fecha_inicio, fecha_fin)
     )
-    
-    estadisticas_ocupacion = await crud_reportes.obtener_estadisticas_ocupacion(
-        db, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin
+
+
+@router.get("/cache")
+async def obtener_estadisticas_cache():
+    """
+    Estadísticas de la caché de resultados de reportes: entradas, aciertos,
+    fallos y expulsiones por el límite de tamaño.
+    """
+    return cache_reportes.estadisticas()
+
+
+# Reporte -> (columnas, lectura por lotes, conteo, filtros propios además de las fechas)
+REPORTES_TRABAJOS = {
+    "libro_diario": (
+        crud_reportes.COLUMNAS_LIBRO_DIARIO, crud_reportes.iterar_libro_diario,
+        crud_reportes.contar_libro_diario, ("tipo",)
+    ),
+    "registro_huespedes": (
+        crud_reportes.COLUMNAS_REGISTRO_HUESPEDES, crud_reportes.iterar_registro_huespedes,
+        crud_reportes.contar_registro_huespedes, ("documento_identidad", "nombre_cliente")
+    ),
+    "registro_ocupacion": (
+        crud_reportes.COLUMNAS_REGISTRO_OCUPACION, crud_reportes.iterar_registro_ocupacion,
+        crud_reportes.contar_registro_ocupacion, ("numero_habitacion", "tipo_habitacion")
+    ),
+}
+FILTROS_TRABAJOS = {"tipo", "documento_identidad", "nombre_cliente", "numero_habitacion", "tipo_habitacion"}
+
+
+def _estado_trabajo(request: Request, trabajo: Trabajo) -> EstadoTrabajoReporte:
+    estado = EstadoTrabajoReporte.model_validate(trabajo)
+    if trabajo.estado == TERMINADO:
+        estado.url_descarga = str(request.url_for("descargar_trabajo_reporte", trabajo_id=trabajo.id))
+    return estado
+
+
+def _trabajo_o_404(trabajo_id: str) -> Trabajo:
+    trabajo = cola_reportes.obtener(trabajo_id)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado o vencido")
+    return trabajo
+
+
+@router.post("/trabajos", response_model=EstadoTrabajoReporte, status_code=202)
+async def crear_trabajo_reporte(solicitud: SolicitudTrabajoReporte, request: Request, response: Response):
+    """
+    Encolar la exportación de un reporte grande. Responde enseguida con el id
+    del trabajo; el avance se consulta en GET /reportes/trabajos/{id} y el
+    archivo se descarga, una vez terminado, desde /reportes/trabajos/{id}/descarga.
+    """
+    columnas, iterar, contar, propios = REPORTES_TRABAJOS[solicitud.reporte]
+    ajenos = [f for f in FILTROS_TRABAJOS - set(propios) if getattr(solicitud, f) is not None]
+    if ajenos:
+        raise HTTPException(
+            status_code=400, detail=f"Filtros no aplicables al reporte {solicitud.reporte}: {', '.join(sorted(ajenos))}"
+        )
+    filtros = solicitud.model_dump(include={"fecha_inicio", "fecha_fin", *propios})
+    encabezado = {
+        "formato": "json",
+        "periodo": f"{solicitud.fecha_inicio or 'inicio'} - {solicitud.fecha_fin or 'fin'}",
+    }
+    trabajo = cola_reportes.encolar(
+        solicitud.reporte, solicitud.formato, columnas, iterar, contar, filtros, encabezado, AsyncSessionLocal
     )
-    
-    # Obtener últimos movimientos (últimos 10)
-    ultimos_movimientos = await crud_reportes.obtener_libro_diario(db)
-    ultimos_movimientos = ultimos_movimientos[:10]  # Solo los últimos 10
-    
-    return {
-        "periodo": "Últimos 30 días",
-        "resumen_financiero": resumen_financiero,
-        "estadisticas_ocupacion": estadisticas_ocupacion,
-        "ultimos_movimientos": ultimos_movimientos,
-        "fecha_actualizacion": datetime.now()
-    }
\ No newline at end of file
+    response.headers["Location"] = str(request.url_for("obtener_trabajo_reporte", trabajo_id=trabajo.id))
+    return _estado_trabajo(request, trabajo)
+
+
+@router.get("/trabajos/{trabajo_id}", response_model=EstadoTrabajoReporte)
+async def obtener_trabajo_reporte(trabajo_id: str, request: Request):
+    """Estado y avance de un trabajo de exportación"""
+    return _estado_trabajo(request, _trabajo_o_404(trabajo_id))
+
+
+@router.get("/trabajos/{trabajo_id}/descarga")
+async def descargar_trabajo_reporte(trabajo_id: str):
+    """Archivo generado por un trabajo terminado (se conserva hasta `expira`)"""
+    trabajo = _trabajo_o_404(trabajo_id)
+    if trabajo.estado != TERMINADO:
+        detalle = f"El trabajo está {trabajo.estado}"
+        if trabajo.error:
+            detalle += f": {trabajo.error}"
+        raise HTTPException(status_code=409, detail=detalle)
+    return FileResponse(trabajo.archivo, media_type=TIPOS_CONTENIDO[trabajo.formato], filename=trabajo.nombre_archivo)
+
+
+@router.delete("/trabajos/{trabajo_id}", status_code=204)
+async def cancelar_trabajo_reporte(trabajo_id: str):
+    """Cancelar un trabajo en curso o borrar el resultado de uno terminado"""
+    if not await cola_reportes.cancelar(trabajo_id):
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado o vencido")
@@ -1,23 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from app.database import get_async_session
-from app.schemas.reserva import ReservaCreate, ReservaRead
+from typing import List, Optional
+from datetime import date
+from app.database import get_async_session, AsyncSessionLocal
+from app.schemas.reserva import ReservaCreate, ReservaRead, EstadoCola, TransicionReservas, ResultadoTransicion, PaginaReservas
 from app.crud import reserva as crud_reserva
+from app.crud import transiciones as crud_transiciones
+from app.services.despachador import despachador_reservas
+from app.services.indice_reservas import indice_reservas
 
 router = APIRouter()
 
+# Las operaciones encoladas (de una sola habitación) abren su propia sesión: la
+# de la solicitud se cierra si el cliente se desconecta mientras la operación
+# sigue en curso. Los lotes de transiciones no se encolan (ver transicionar_reservas).
+
 @router.post("/reservas/", response_model=ReservaRead, tags=["Reservas"])
-async def crear_reserva(reserva: ReservaCreate, db: AsyncSession = Depends(get_async_session)):
-    return await crud_reserva.crear_reserva(db, reserva)
+async def crear_reserva(reserva: ReservaCreate):
+    return await despachador_reservas.ejecutar_con_sesion(
+        reserva.habitacion_id, AsyncSessionLocal, lambda db: crud_reserva.crear_reserva(db, reserva)
+    )
 
 @router.get("/reservas/", response_model=List[ReservaRead], tags=["Reservas"])
 async def listar_reservas(db: AsyncSession = Depends(get_async_session)):
     return await crud_reserva.obtener_reservas(db)
 
+@router.get("/reservas/buscar", response_model=PaginaReservas, tags=["Reservas"])
+async def buscar_reservas(
+    cliente_id: Optional[int] = Query(None, description="Id del cliente"),
+    habitacion_id: Optional[int] = Query(None, description="Id de la habitación"),
+    estado: Optional[str] = Query(None, description="Estado de la reserva"),
+    fecha_inicio: Optional[date] = Query(None, description="Reservas con noches desde esta fecha"),
+    fecha_fin: Optional[date] = Query(None, description="Reservas con noches antes de esta fecha"),
+    cursor: Optional[int] = Query(None, description="Valor de siguiente_cursor de la página anterior"),
+    limite: int = Query(50, ge=1, le=500, description="Número máximo de reservas por página"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Buscar reservas con filtros, paginando por cursor"""
+    items, siguiente = await crud_reserva.buscar_reservas(
+        db,
+        cliente_id=cliente_id,
+        habitacion_id=habitacion_id,
+        estado=estado,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        cursor=cursor,
+        limite=limite
+    )
+    return {"items": items, "siguiente_cursor": siguiente}
+
+@router.get("/reservas/colas", response_model=List[EstadoCola], tags=["Reservas"])
+async def estado_colas():
+    """Profundidad y tiempos de espera de la cola de cada habitación"""
+    return [
+        EstadoCola(
+            habitacion_id=habitacion_id,
+            profundidad=e.profundidad,
+            procesadas=e.procesadas,
+            espera_promedio_ms=round(e.espera_promedio * 1000, 3),
+            espera_maxima_ms=round(e.espera_maxima * 1000, 3),
+        )
+        for habitacion_id, e in despachador_reservas.estadisticas()
+    ]
+
+@router.post("/reservas/transiciones", response_model=ResultadoTransicion, tags=["Reservas"])
+async def transicionar_reservas(datos: TransicionReservas, db: AsyncSession = Depends(get_async_session)):
+    """Check-in, check-out, no-show o cancelación de un lote de reservas en una sola transacción"""
+    actualizadas, rechazadas = await crud_transiciones.transicionar_reservas(db, datos.ids, datos.estado)
+    return ResultadoTransicion(actualizadas=actualizadas, rechazadas=rechazadas)
+
 @router.put("/reservas/{reserva_id}/cancelar", response_model=ReservaRead, tags=["Reservas"])
-async def cancelar_reserva(reserva_id: int, db: AsyncSession = Depends(get_async_session)):
-    reserva = await crud_reserva.cancelar_reserva(db, reserva_id)
+async def cancelar_reserva(reserva_id: int):
+    # Las reservas activas están en el índice; si no aparece se cancela sin pasar por la cola
+    habitacion_id = indice_reservas.habitacion_de(reserva_id)
+    reserva = await despachador_reservas.ejecutar_con_sesion(
+        habitacion_id, AsyncSessionLocal, lambda db: crud_reserva.cancelar_reserva(db, reserva_id)
+    )
     if not reserva:
         raise HTTPException(status_code=404, detail="Reserva no encontrada")
     return reserva
\ No newline at end of file
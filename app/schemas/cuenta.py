@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Literal, Optional
 
 class CuentaBase(BaseModel):
@@ -20,5 +20,4 @@ class CuentaUpdate(BaseModel):
 class Cuenta(CuentaBase):
     id: int
     
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
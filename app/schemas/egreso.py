@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
 
 class EgresoBase(BaseModel):
@@ -12,5 +12,4 @@ class EgresoRead(EgresoBase):
     id: int
     fecha: date
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
 from typing import List, Optional
 from .pago import PagoOut
@@ -16,5 +16,4 @@ class FacturaOut(FacturaBase):
     id: int
     pagos: List[PagoOut] = []
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
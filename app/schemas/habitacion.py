@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from datetime import date
+from typing import List, Optional
 
 class HabitacionBase(BaseModel):
     numero: str
@@ -12,6 +14,30 @@ class HabitacionCreate(HabitacionBase):
 
 class HabitacionOut(HabitacionBase):
     id: int
+    reservas_activas: int = 0
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MatrizDisponibilidad(BaseModel):
+    fecha_inicio: date
+    dias: int
+    tipos: List[str]
+    # Una fila por tipo (mismo orden que `tipos`) y una columna por noche
+    disponibles: List[List[int]]
+    # Último cambio ARI incluido; punto de partida para /habitaciones/disponibilidad/cambios
+    seq: int = 0
+
+
+class CeldaARI(BaseModel):
+    tipo: str
+    fecha: date
+    disponibles: int
+    precio_noche: Optional[float] = None
+
+
+class CambiosARI(BaseModel):
+    desde_seq: int
+    hasta_seq: int
+    hay_mas: bool
+    celdas: List[CeldaARI]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
 
 class IngresoBase(BaseModel):
@@ -13,5 +13,4 @@ class IngresoRead(IngresoBase):
     id: int
     fecha: date
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
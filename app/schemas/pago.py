@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
 
 class PagoBase(BaseModel):
@@ -13,5 +13,4 @@ class PagoCreate(PagoBase):
 class PagoOut(PagoBase):
     id: int
 
-    class Config:
-       orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
 class ParametroBase(BaseModel):
@@ -18,5 +18,4 @@ class ParametroUpdate(BaseModel):
 class Parametro(ParametroBase):
     id: int
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import date, datetime
+
+
+class PeriodoCerrado(BaseModel):
+    id: int
+    anio: int
+    mes: int
+    fecha_inicio: date
+    fecha_fin: date
+    cerrado_en: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,19 +1,15 @@
-from pydantic import BaseModel
-from datetime import date
-from typing import Optional
-from decimal import Decimal
+from pydantic import BaseModel, ConfigDict
+from datetime import date, datetime
+from typing import List, Literal, Optional
+from app.schemas.tipos import Dinero
 
 class LibroDiarioSchema(BaseModel):
     fecha: date
     tipo: str
     descripcion: Optional[str] = None
-    monto: Decimal
+    monto: Dinero
 
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            Decimal: float
-        }
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RegistroHuespedesSchema(BaseModel):
@@ -27,8 +23,7 @@ class RegistroHuespedesSchema(BaseModel):
     tipo_habitacion: str
     estado_reserva: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RegistroOcupacionSchema(BaseModel):
@@ -39,8 +34,7 @@ class RegistroOcupacionSchema(BaseModel):
     estado_reserva: str
     cliente: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Esquemas para filtros de reportes
@@ -61,20 +55,85 @@ class FiltroHabitacion(BaseModel):
 
 # Esquemas de respuesta para reportes con totales
 class ResumenFinanciero(BaseModel):
-    total_ingresos: Decimal
-    total_egresos: Decimal
-    saldo: Decimal
+    total_ingresos: Dinero
+    total_egresos: Dinero
+    saldo: Dinero
     periodo: str
 
-    class Config:
-        json_encoders = {
-            Decimal: float
-        }
-
 
 class EstadisticasOcupacion(BaseModel):
     total_reservas: int
     habitaciones_ocupadas: int
     habitaciones_disponibles: int
+    noches_ocupadas: int
+    noches_disponibles: int
+    porcentaje_ocupacion: float
+    periodo: str
+
+
+class PuntoSerie(BaseModel):
+    periodo: date
+    ingresos: Dinero
+    egresos: Dinero
+    saldo: Dinero
+    cantidad: int
+
+
+class TramoAnticipacion(BaseModel):
+    tramo: str  # Días entre la reserva y la llegada, por ejemplo '8-14'
+    reservas: int
+
+
+class KPIsHotel(BaseModel):
+    periodo: str
+    tipo_habitacion: Optional[str] = None
+    habitaciones: int
+    noches_disponibles: int
+    noches_vendidas: int
+    ocupacion: float
+    ingresos_habitaciones: Dinero
+    adr: Dinero  # Tarifa media diaria: ingresos / noches vendidas
+    revpar: Dinero  # Ingreso por habitación disponible: ingresos / noches disponibles
+    llegadas: int
+    estadia_promedio: float
+    anticipacion: List[TramoAnticipacion]
+
+
+class OcupacionDiaria(BaseModel):
+    fecha: date
+    habitaciones_ocupadas: int
     porcentaje_ocupacion: float
-    periodo: str
\ No newline at end of file
+
+
+class Dashboard(BaseModel):
+    periodo: str
+    resumen_financiero: ResumenFinanciero
+    estadisticas_ocupacion: EstadisticasOcupacion
+    ultimos_movimientos: List[LibroDiarioSchema]
+    fecha_actualizacion: datetime
+
+
+# Trabajos de exportación en segundo plano
+class SolicitudTrabajoReporte(FiltroFechas, FiltroHuesped, FiltroHabitacion):
+    reporte: Literal["libro_diario", "registro_huespedes", "registro_ocupacion"]
+    formato: Literal["csv", "ndjson", "json"] = "csv"
+    tipo: Optional[str] = None  # Tipo de movimiento del libro diario
+
+
+class EstadoTrabajoReporte(BaseModel):
+    id: str
+    reporte: str
+    formato: str
+    estado: str
+    progreso: float
+    filas_procesadas: int
+    total_filas: Optional[int] = None
+    creado: datetime
+    iniciado: Optional[datetime] = None
+    terminado: Optional[datetime] = None
+    expira: Optional[datetime] = None
+    tamano_bytes: int
+    error: Optional[str] = None
+    url_descarga: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
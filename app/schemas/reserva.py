@@ -1,5 +1,27 @@
-from pydantic import BaseModel
-from datetime import date, datetime
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from datetime import date, datetime, timedelta
+from typing import List, Literal, Optional
+
+MAX_NOCHES_ESTADIA = 365  # Noches máximas de una reserva o de una búsqueda de disponibilidad
+DIAS_PASADO = 366         # Reservas con llegada hasta un año atrás (carga de estadías ya ocurridas)
+DIAS_FUTURO = 731         # Reservas con salida hasta dos años adelante, igual que la matriz de disponibilidad
+
+
+def verificar_rango_estadia(fecha_inicio: date, fecha_fin: date) -> None:
+    """ValueError si el rango [fecha_inicio, fecha_fin) no es una estadía válida.
+
+    Acota el largo y las fechas: el calendario y noches_ocupadas crecen con
+    cada noche del rango, para todas las habitaciones.
+    """
+    if fecha_inicio >= fecha_fin:
+        raise ValueError("La fecha de inicio debe ser anterior a la fecha de fin.")
+    if (fecha_fin - fecha_inicio).days > MAX_NOCHES_ESTADIA:
+        raise ValueError(f"La estadía no puede superar {MAX_NOCHES_ESTADIA} noches.")
+    hoy = date.today()
+    if fecha_inicio < hoy - timedelta(days=DIAS_PASADO) or fecha_fin > hoy + timedelta(days=DIAS_FUTURO):
+        raise ValueError(
+            f"Las fechas deben estar entre {hoy - timedelta(days=DIAS_PASADO)} y {hoy + timedelta(days=DIAS_FUTURO)}."
+        )
 
 class ReservaBase(BaseModel):
     cliente_id: int
@@ -8,12 +30,39 @@ class ReservaBase(BaseModel):
     fecha_fin: date
 
 class ReservaCreate(ReservaBase):
-    pass
+    @model_validator(mode="after")
+    def validar_fechas(self):
+        verificar_rango_estadia(self.fecha_inicio, self.fecha_fin)
+        return self
 
 class ReservaRead(ReservaBase):
     id: int
     estado: str
     fecha_reserva: datetime
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PaginaReservas(BaseModel):
+    items: List[ReservaRead]
+    siguiente_cursor: Optional[int] = None
+
+
+class EstadoCola(BaseModel):
+    habitacion_id: int
+    profundidad: int
+    procesadas: int
+    espera_promedio_ms: float
+    espera_maxima_ms: float
+
+
+class TransicionReservas(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=5000, description="Ids de las reservas")
+    estado: Literal["en_curso", "completada", "no_presentada", "cancelada"] = Field(
+        ..., description="Estado destino: en_curso (check-in), completada (check-out), no_presentada o cancelada"
+    )
+
+
+class ResultadoTransicion(BaseModel):
+    actualizadas: List[ReservaRead]
+    rechazadas: List[int]
@@ -0,0 +1,8 @@
+from decimal import Decimal
+from typing import Annotated
+
+from pydantic import PlainSerializer
+
+# Importes: Decimal en Python (sin errores de redondeo) y número en JSON.
+# Reemplaza a json_encoders = {Decimal: float}, obsoleto en Pydantic v2.
+Dinero = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
@@ -0,0 +1,113 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+TTL_REPORTES = 30.0  # Segundos que un resultado de reporte se sirve desde la caché
+MAX_ENTRADAS = 256   # Entradas máximas; al superarlo se descarta la usada hace más tiempo
+
+# Rango de fechas [desde, hasta] (ambos incluidos); None es un extremo abierto
+Rango = Tuple[Optional[date], Optional[date]]
+SIN_LIMITES: Rango = (None, None)
+
+
+@dataclass
+class EntradaCache:
+    valor: Any
+    expira: float
+    dependencias: Dict[str, Rango]  # tabla -> fechas del reporte que dependen de ella
+
+
+def _se_solapan(a: Rango, b: Rango) -> bool:
+    return (a[0] is None or b[1] is None or a[0] <= b[1]) and (b[0] is None or a[1] is None or b[0] <= a[1])
+
+
+class CacheReportes:
+    """Caché en memoria de resultados de reportes, con vencimiento y límite LRU.
+
+    La clave es el reporte más sus filtros normalizados. Cada entrada declara de
+    qué tablas y de qué fechas depende; una escritura invalida solo las entradas
+    de esa tabla cuyo rango incluye las fechas escritas. Otra implementación con
+    los mismos métodos (por ejemplo, compartida entre procesos) puede
+    reemplazar a `cache_reportes`.
+    """
+
+    def __init__(self, ttl: float = TTL_REPORTES, max_entradas: int = MAX_ENTRADAS):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[Hashable, EntradaCache]" = OrderedDict()
+        self._invalidaciones = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    @staticmethod
+    def clave(reporte: str, **filtros) -> Hashable:
+        """Clave del reporte con los filtros ordenados y sin los vacíos"""
+        return (reporte, tuple(sorted((k, v) for k, v in filtros.items() if v is not None)))
+
+    def obtener(self, clave: Hashable) -> Tuple[bool, Any]:
+        """(encontrado, valor) de una entrada vigente; las vencidas se descartan"""
+        entrada = self._entradas.get(clave)
+        if entrada is not None and entrada.expira > time.monotonic():
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return True, entrada.valor
+        if entrada is not None:
+            del self._entradas[clave]
+        self.fallos += 1
+        return False, None
+
+    def guardar(self, clave: Hashable, valor: Any, dependencias: Dict[str, Rango]) -> None:
+        self._entradas[clave] = EntradaCache(valor, time.monotonic() + self.ttl, dependencias)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+            self.expulsiones += 1
+
+    async def obtener_o_calcular(
+        self,
+        clave: Hashable,
+        dependencias: Dict[str, Rango],
+        calcular: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Valor en caché o recién calculado, y si fue un acierto"""
+        encontrado, valor = self.obtener(clave)
+        if encontrado:
+            return valor, True
+        invalidaciones = self._invalidaciones
+        valor = await calcular()
+        # Si hubo una escritura mientras se calculaba, el valor puede no incluirla: no se guarda.
+        # Vale solo si `calcular` empezó después de leer el contador: las consultas
+        # compartidas (un_solo_vuelo) llevan en su clave la generación de escrituras por eso.
+        if invalidaciones == self._invalidaciones:
+            self.guardar(clave, valor, dependencias)
+        return valor, False
+
+    def invalidar(self, tabla: str, desde: Optional[date] = None, hasta: Optional[date] = None) -> None:
+        """Descartar las entradas que dependen de `tabla` en fechas que se solapan con [desde, hasta]"""
+        self._invalidaciones += 1
+        rango = (desde, hasta)
+        for clave in [
+            clave for clave, entrada in self._entradas.items()
+            if tabla in entrada.dependencias and _se_solapan(entrada.dependencias[tabla], rango)
+        ]:
+            del self._entradas[clave]
+
+    def limpiar(self) -> None:
+        """Vaciar la caché y reiniciar los contadores"""
+        self._entradas.clear()
+        self.aciertos = self.fallos = self.expulsiones = 0
+
+    def estadisticas(self) -> Dict[str, int]:
+        return {
+            "entradas": len(self._entradas),
+            "max_entradas": self.max_entradas,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "expulsiones": self.expulsiones,
+        }
+
+
+cache_reportes = CacheReportes()
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.habitacion import Habitacion
+from app.models.reserva import Reserva, ESTADOS_ACTIVOS
+
+BLOQUE_NOCHES = 64  # Crecimiento del calendario en múltiplos de 8 noches (bytes completos)
+
+
+class CalendarioHabitaciones:
+    """Calendario de ocupación con un bitset por habitación y un bit por noche.
+
+    Los bits se guardan empaquetados en una matriz uint8 de forma
+    (habitaciones, noches / 8). La columna 0 corresponde a la noche `origen`;
+    las noches fuera del rango almacenado se consideran libres.
+    """
+
+    def __init__(self):
+        self._fila: Dict[int, int] = {}
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._tipos = np.zeros(0, dtype=object)
+        self._bits = np.zeros((0, 0), dtype=np.uint8)
+        self._origen = date.today()
+        self._lock_carga: Optional[asyncio.Lock] = None
+        self.cargado = False
+
+    @property
+    def noches(self) -> int:
+        return self._bits.shape[1] * 8
+
+    async def asegurar_cargado(self, db: AsyncSession) -> None:
+        """Cargar el calendario desde la base de datos si aún no se ha hecho"""
+        if self.cargado:
+            return
+        if self._lock_carga is None:
+            self._lock_carga = asyncio.Lock()
+        async with self._lock_carga:
+            if not self.cargado:
+                await self.cargar(db)
+
+    async def cargar(self, db: AsyncSession) -> None:
+        """Reconstruir el calendario con las habitaciones y reservas activas"""
+        habitaciones = (await db.execute(select(Habitacion.id, Habitacion.tipo))).all()
+        reservas = (await db.execute(
+            select(Reserva.habitacion_id, Reserva.fecha_inicio, Reserva.fecha_fin)
+            .where(Reserva.estado.in_(ESTADOS_ACTIVOS))
+        )).all()
+        self.reconstruir(habitaciones, reservas)
+
+    def reconstruir(
+        self,
+        habitaciones: Iterable[Tuple[int, str]],
+        reservas: Iterable[Tuple[int, date, date]],
+    ) -> None:
+        """Reemplazar el calendario por las habitaciones (id, tipo) y reservas (habitacion_id, inicio, fin)"""
+        habitaciones = list(habitaciones)
+        self._fila = {habitacion_id: fila for fila, (habitacion_id, _) in enumerate(habitaciones)}
+        self._ids = np.array([h[0] for h in habitaciones], dtype=np.int64)
+        self._tipos = np.array([h[1] for h in habitaciones], dtype=object)
+        self._bits = np.zeros((len(habitaciones), 0), dtype=np.uint8)
+        self._origen = date.today()
+        for habitacion_id, fecha_inicio, fecha_fin in reservas:
+            self.marcar(habitacion_id, fecha_inicio, fecha_fin)
+        self.cargado = True
+
+    def agregar_habitacion(self, habitacion_id: int, tipo: str) -> None:
+        """Registrar una habitación nueva con todas sus noches libres"""
+        if habitacion_id in self._fila:
+            return
+        self._fila[habitacion_id] = len(self._ids)
+        self._ids = np.append(self._ids, habitacion_id)
+        self._tipos = np.append(self._tipos, np.array([tipo], dtype=object))
+        self._bits = np.vstack([self._bits, np.zeros((1, self._bits.shape[1]), dtype=np.uint8)])
+
+    def marcar(self, habitacion_id: int, fecha_inicio: date, fecha_fin: date) -> None:
+        """Marcar como ocupadas las noches [fecha_inicio, fecha_fin)"""
+        self._escribir(habitacion_id, fecha_inicio, fecha_fin, 1)
+
+    def liberar(self, habitacion_id: int, fecha_inicio: date, fecha_fin: date) -> None:
+        """Marcar como libres las noches [fecha_inicio, fecha_fin)"""
+        self._escribir(habitacion_id, fecha_inicio, fecha_fin, 0)
+
+    def disponibles(self, fecha_inicio: date, fecha_fin: date, tipo: Optional[str] = None) -> List[int]:
+        """Ids de las habitaciones sin ninguna noche ocupada en [fecha_inicio, fecha_fin)"""
+        candidatas = np.ones(len(self._ids), dtype=bool)
+        if tipo:
+            candidatas &= self._tipos == tipo
+
+        # Solo importa la parte de la ventana que cae dentro del rango almacenado
+        inicio = max((fecha_inicio - self._origen).days, 0)
+        fin = min((fecha_fin - self._origen).days, self.noches)
+        if inicio < fin:
+            bytes_ventana = self._bits[:, inicio // 8:(fin + 7) // 8]
+            desplazamiento = inicio - (inicio // 8) * 8
+            ventana = np.unpackbits(bytes_ventana, axis=1)[:, desplazamiento:desplazamiento + (fin - inicio)]
+            candidatas &= ~ventana.any(axis=1)
+        return self._ids[candidatas].tolist()
+
+    def ocupadas_en(self, fecha: date) -> List[int]:
+        """Ids de las habitaciones con la noche `fecha` ocupada"""
+        columna = (fecha - self._origen).days
+        if not 0 <= columna < self.noches:
+            return []
+        bit = (self._bits[:, columna // 8] >> (7 - columna % 8)) & 1
+        return self._ids[bit.astype(bool)].tolist()
+
+    def _escribir(self, habitacion_id: int, fecha_inicio: date, fecha_fin: date, valor: int) -> None:
+        fila = self._fila.get(habitacion_id)
+        if fila is None or fecha_inicio >= fecha_fin:
+            return
+        if valor:
+            self._asegurar_rango(fecha_inicio, fecha_fin)
+        inicio = max((fecha_inicio - self._origen).days, 0)
+        fin = min((fecha_fin - self._origen).days, self.noches)
+        if inicio >= fin:
+            return
+        b0, b1 = inicio // 8, (fin + 7) // 8
+        bits = np.unpackbits(self._bits[fila, b0:b1])
+        bits[inicio - b0 * 8:fin - b0 * 8] = valor
+        self._bits[fila, b0:b1] = np.packbits(bits)
+
+    def _asegurar_rango(self, fecha_inicio: date, fecha_fin: date) -> None:
+        """Ampliar la matriz para cubrir [fecha_inicio, fecha_fin), conservando la alineación a bytes"""
+        antes = (self._origen - fecha_inicio).days
+        if antes > 0:
+            bloques = -(-antes // BLOQUE_NOCHES)
+            relleno = np.zeros((self._bits.shape[0], bloques * BLOQUE_NOCHES // 8), dtype=np.uint8)
+            self._bits = np.hstack([relleno, self._bits])
+            self._origen = date.fromordinal(self._origen.toordinal() - bloques * BLOQUE_NOCHES)
+        despues = (fecha_fin - self._origen).days - self.noches
+        if despues > 0:
+            bloques = -(-despues // BLOQUE_NOCHES)
+            relleno = np.zeros((self._bits.shape[0], bloques * BLOQUE_NOCHES // 8), dtype=np.uint8)
+            self._bits = np.hstack([self._bits, relleno])
+
+
+calendario = CalendarioHabitaciones()
@@ -0,0 +1,46 @@
+from typing import Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.reserva import Reserva, ESTADOS_ACTIVOS
+
+
+class ContadoresReservasActivas:
+    """Caché de la cantidad de reservas activas por habitación.
+
+    Cada escritura de reservas invalida la entrada de su habitación; en la
+    siguiente lectura se recalculan todas las entradas invalidadas con una sola
+    consulta agrupada.
+    """
+
+    def __init__(self):
+        self._conteos: Dict[int, int] = {}
+        self._versiones: Dict[int, int] = {}
+
+    def invalidar(self, habitacion_id: int) -> None:
+        """Descartar el conteo de una habitación tras una escritura de reservas"""
+        self._conteos.pop(habitacion_id, None)
+        self._versiones[habitacion_id] = self._versiones.get(habitacion_id, 0) + 1
+
+    async def obtener(self, db: AsyncSession, habitacion_ids: List[int]) -> Dict[int, int]:
+        """Conteo de reservas activas para cada habitación pedida"""
+        resultado = {h: self._conteos[h] for h in habitacion_ids if h in self._conteos}
+        faltantes = [h for h in habitacion_ids if h not in resultado]
+        if faltantes:
+            versiones = {h: self._versiones.get(h, 0) for h in faltantes}
+            result = await db.execute(
+                select(Reserva.habitacion_id, func.count())
+                .where(Reserva.habitacion_id.in_(faltantes), Reserva.estado.in_(ESTADOS_ACTIVOS))
+                .group_by(Reserva.habitacion_id)
+            )
+            conteos = dict(result.all())
+            for habitacion_id in faltantes:
+                resultado[habitacion_id] = conteos.get(habitacion_id, 0)
+                # Si hubo una escritura mientras se consultaba, el valor no se guarda
+                if self._versiones.get(habitacion_id, 0) == versiones[habitacion_id]:
+                    self._conteos[habitacion_id] = resultado[habitacion_id]
+        return resultado
+
+
+contadores_reservas = ContadoresReservasActivas()
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+Operacion = Callable[[], Awaitable[Any]]
+OperacionConSesion = Callable[[Any], Awaitable[Any]]
+
+
+@dataclass
+class EstadisticasCarril:
+    """Métricas acumuladas de la cola de una habitación"""
+    profundidad: int = 0
+    procesadas: int = 0
+    espera_total: float = 0.0
+    espera_maxima: float = 0.0
+
+    def registrar_espera(self, espera: float) -> None:
+        self.procesadas += 1
+        self.espera_total += espera
+        self.espera_maxima = max(self.espera_maxima, espera)
+
+    @property
+    def espera_promedio(self) -> float:
+        return self.espera_total / self.procesadas if self.procesadas else 0.0
+
+
+class _Carril:
+    def __init__(self):
+        self.cola: Deque[Tuple[Operacion, asyncio.Future, float]] = deque()
+        self.consumidor: Optional[asyncio.Task] = None
+
+
+class DespachadorReservas:
+    """Serializa las operaciones de reserva por habitación.
+
+    Cada habitación tiene su propia cola con un único consumidor: las operaciones
+    sobre la misma habitación se ejecutan una tras otra en orden de llegada (sin
+    esperas por bloqueos en la base de datos) y las de habitaciones distintas
+    corren en paralelo. El consumidor termina cuando su cola se vacía, así que
+    solo hay tareas para las habitaciones con trabajo pendiente.
+
+    Las operaciones corren en el consumidor, no en la solicitud: si el cliente
+    se desconecta antes de que empiece, su operación se descarta; si ya empezó,
+    termina igual y solo se descarta el resultado.
+    """
+
+    def __init__(self):
+        self._carriles: Dict[int, _Carril] = {}
+        self._estadisticas: Dict[int, EstadisticasCarril] = {}
+
+    async def ejecutar(self, habitacion_id: Optional[int], operacion: Operacion) -> Any:
+        """Encolar la operación en el carril de la habitación y esperar su resultado"""
+        if habitacion_id is None:
+            return await operacion()
+
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        carril = self._carriles.get(habitacion_id)
+        if carril is None:
+            carril = self._carriles[habitacion_id] = _Carril()
+        carril.cola.append((operacion, futuro, time.perf_counter()))
+        self._estadisticas_de(habitacion_id).profundidad += 1
+        if carril.consumidor is None:
+            carril.consumidor = loop.create_task(self._consumir(habitacion_id, carril))
+        return await futuro
+
+    async def ejecutar_con_sesion(
+        self,
+        habitacion_id: Optional[int],
+        fabrica_sesiones: Callable[[], Any],
+        operacion: OperacionConSesion
+    ) -> Any:
+        """Como `ejecutar`, pero la operación recibe una sesión propia abierta en el consumidor.
+
+        La sesión de la solicitud se cierra cuando el cliente se desconecta,
+        aunque la operación siga en curso: las operaciones encoladas no deben usarla.
+        """
+        async def en_sesion_propia():
+            async with fabrica_sesiones() as db:
+                return await operacion(db)
+
+        return await self.ejecutar(habitacion_id, en_sesion_propia)
+
+    async def _consumir(self, habitacion_id: int, carril: _Carril) -> None:
+        estadisticas = self._estadisticas_de(habitacion_id)
+        try:
+            # Se vacía la cola completa: las operaciones que llegan mientras se
+            # procesa una se atienden a continuación, en el mismo consumidor
+            while carril.cola:
+                operacion, futuro, encolado = carril.cola.popleft()
+                estadisticas.registrar_espera(time.perf_counter() - encolado)
+                try:
+                    if futuro.cancelled():
+                        continue
+                    try:
+                        resultado = await operacion()
+                    except Exception as exc:
+                        if not futuro.done():
+                            futuro.set_exception(exc)
+                    except BaseException as exc:
+                        # CancelledError u otra BaseException: se resuelve el futuro y se propaga
+                        if not futuro.done():
+                            if isinstance(exc, asyncio.CancelledError):
+                                futuro.cancel()
+                            else:
+                                futuro.set_exception(exc)
+                        raise
+                    else:
+                        if not futuro.done():
+                            futuro.set_result(resultado)
+                finally:
+                    estadisticas.profundidad -= 1
+        finally:
+            carril.consumidor = None
+            if carril.cola:
+                self._atender_pendientes(habitacion_id, carril)
+            if not carril.cola and self._carriles.get(habitacion_id) is carril:
+                del self._carriles[habitacion_id]
+
+    def _atender_pendientes(self, habitacion_id: int, carril: _Carril) -> None:
+        """Operaciones que quedan en la cola cuando el consumidor termina por una BaseException.
+
+        Si el consumidor fue cancelado (por ejemplo al apagar la aplicación) se
+        cancelan; si la excepción vino de una operación, un consumidor nuevo las
+        atiende. Así ningún futuro queda sin resolver hasta la próxima solicitud.
+        """
+        tarea = asyncio.current_task()
+        if tarea is not None and tarea.cancelling():
+            estadisticas = self._estadisticas_de(habitacion_id)
+            while carril.cola:
+                _, futuro, _ = carril.cola.popleft()
+                estadisticas.profundidad -= 1
+                futuro.cancel()
+        else:
+            carril.consumidor = asyncio.get_running_loop().create_task(self._consumir(habitacion_id, carril))
+
+    def _estadisticas_de(self, habitacion_id: int) -> EstadisticasCarril:
+        estadisticas = self._estadisticas.get(habitacion_id)
+        if estadisticas is None:
+            estadisticas = self._estadisticas[habitacion_id] = EstadisticasCarril()
+        return estadisticas
+
+    def estadisticas(self) -> List[Tuple[int, EstadisticasCarril]]:
+        """Métricas por habitación, de la más congestionada a la menos"""
+        return sorted(
+            self._estadisticas.items(),
+            key=lambda item: (item[1].profundidad, item[1].espera_promedio),
+            reverse=True,
+        )
+
+
+despachador_reservas = DespachadorReservas()
@@ -0,0 +1,68 @@
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def matriz_disponibilidad(
+    habitaciones_por_tipo: Dict[str, int],
+    reservas: Iterable[Tuple[str, date, date]],
+    fecha_inicio: date,
+    dias: int,
+) -> Tuple[List[str], np.ndarray]:
+    """Habitaciones libres por tipo y noche en [fecha_inicio, fecha_inicio + dias).
+
+    `reservas` son tuplas (tipo, fecha_inicio, fecha_fin). Cada reserva suma 1
+    en su primera noche y resta 1 en su salida sobre un arreglo de diferencias;
+    la suma acumulada por fila da las habitaciones ocupadas de cada noche, así
+    que el costo es una pasada por las reservas más una por la matriz.
+    Retorna los tipos (orden de las filas) y una matriz int32 (tipos, dias).
+    """
+    tipos = sorted(habitaciones_por_tipo)
+    fila = {tipo: i for i, tipo in enumerate(tipos)}
+    totales = np.array([habitaciones_por_tipo[t] for t in tipos], dtype=np.int32)
+
+    ancho = dias + 1
+    diferencias = np.zeros(len(tipos) * ancho, dtype=np.int64)
+    reservas = [r for r in reservas if r[0] in fila]
+    if reservas:
+        origen = fecha_inicio.toordinal()
+        n = len(reservas)
+        filas = np.fromiter((fila[r[0]] for r in reservas), dtype=np.int64, count=n)
+        inicios = np.fromiter((r[1].toordinal() for r in reservas), dtype=np.int64, count=n) - origen
+        fines = np.fromiter((r[2].toordinal() for r in reservas), dtype=np.int64, count=n) - origen
+        # Recortar a la ventana; las reservas que quedan vacías no aportan
+        np.clip(inicios, 0, dias, out=inicios)
+        np.clip(fines, 0, dias, out=fines)
+        dentro = inicios < fines
+        base = filas[dentro] * ancho
+        # bincount sobre la matriz aplanada acumula las entradas y salidas de cada celda
+        diferencias += np.bincount(base + inicios[dentro], minlength=diferencias.size)
+        diferencias -= np.bincount(base + fines[dentro], minlength=diferencias.size)
+
+    ocupadas = np.cumsum(diferencias.reshape(len(tipos), ancho)[:, :dias], axis=1).astype(np.int32)
+    return tipos, totales[:, None] - ocupadas
+
+
+def noches_cambiadas(
+    cambios: Iterable[Tuple[str, Optional[date], Optional[date]]],
+    fecha_inicio: date,
+    dias: int,
+) -> Dict[str, np.ndarray]:
+    """Máscara por tipo de las noches de la ventana tocadas por algún cambio.
+
+    `cambios` son tuplas (tipo, fecha_inicio, fecha_fin) del registro ARI; un
+    extremo None abarca hasta el borde de la ventana. Los tipos sin noches
+    dentro de la ventana no aparecen en el resultado.
+    """
+    mascaras: Dict[str, np.ndarray] = {}
+    for tipo, cambio_inicio, cambio_fin in cambios:
+        inicio = max((cambio_inicio - fecha_inicio).days, 0) if cambio_inicio else 0
+        fin = min((cambio_fin - fecha_inicio).days, dias) if cambio_fin else dias
+        if inicio >= fin:
+            continue
+        mascara = mascaras.get(tipo)
+        if mascara is None:
+            mascara = mascaras[tipo] = np.zeros(dias, dtype=bool)
+        mascara[inicio:fin] = True
+    return mascaras
@@ -0,0 +1,203 @@
+import csv
+import importlib.util
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, Iterable, Sequence
+
+TAMANO_LOTE = 5000  # Filas que se leen del cursor del servidor y se envían por vez
+
+TIPOS_CONTENIDO = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+FORMATOS_COLUMNARES = ("arrow", "parquet")
+COMPRESION_COLUMNAR = "zstd"
+
+
+def _valor_json(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+# Un solo codificador: json.dumps con opciones crea uno nuevo en cada llamada
+_codificar = json.JSONEncoder(default=_valor_json, ensure_ascii=False).encode
+
+
+def _objetos(columnas: Sequence[str], lote: Iterable[Sequence]) -> Iterable[str]:
+    return (_codificar(dict(zip(columnas, fila))) for fila in lote)
+
+
+def lote_csv(lote: Iterable[Sequence]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(lote)
+    return buffer.getvalue().encode()
+
+
+def lote_ndjson(columnas: Sequence[str], lote: Sequence[Sequence]) -> bytes:
+    return ("\n".join(_objetos(columnas, lote)) + "\n").encode() if lote else b""
+
+
+def lote_json(columnas: Sequence[str], lote: Sequence[Sequence]) -> bytes:
+    """Objetos del lote separados por comas, sin corchetes"""
+    return ", ".join(_objetos(columnas, lote)).encode()
+
+
+# Formatos de texto: cada lote se convierte por separado (y puede hacerlo otro proceso)
+FORMATEADORES_LOTE = {
+    "csv": lambda columnas, lote: lote_csv(lote),
+    "ndjson": lote_ndjson,
+    "json": lote_json,
+}
+
+
+def formatear_lote(formato: str, columnas: Sequence[str], lote: Sequence[Sequence]) -> bytes:
+    """Convertir un lote de filas en `formato` (csv, ndjson o json); función de módulo para poder
+    ejecutarse en un ProcessPoolExecutor"""
+    return FORMATEADORES_LOTE[formato](columnas, lote)
+
+
+def encabezado_json(encabezado: Dict[str, Any]) -> bytes:
+    """Inicio del objeto JSON {**encabezado, "datos": [ ... hasta la lista de datos"""
+    inicio = _codificar(encabezado)[:-1]
+    return (inicio + (", " if encabezado else "") + '"datos": [').encode()
+
+
+def pie_json(total: int) -> bytes:
+    return f'], "total_registros": {total}}}'.encode()
+
+
+async def exportar_csv(columnas: Sequence[str], lotes: AsyncIterator[Sequence[Sequence]]) -> AsyncIterator[bytes]:
+    """CSV con encabezado; cada lote de filas se convierte y se envía por separado"""
+    # El encabezado sale antes de que la consulta devuelva la primera fila
+    yield lote_csv([columnas])
+    async for lote in lotes:
+        yield lote_csv(lote)
+
+
+async def exportar_ndjson(columnas: Sequence[str], lotes: AsyncIterator[Sequence[Sequence]]) -> AsyncIterator[bytes]:
+    """Un objeto JSON por línea"""
+    async for lote in lotes:
+        if lote:
+            yield lote_ndjson(columnas, lote)
+
+
+async def exportar_json(
+    columnas: Sequence[str],
+    lotes: AsyncIterator[Sequence[Sequence]],
+    encabezado: Dict[str, Any]
+) -> AsyncIterator[bytes]:
+    """Objeto JSON {**encabezado, "datos": [...], "total_registros": n} emitido por partes.
+
+    El total va al final porque se conoce recién al terminar de leer.
+    """
+    yield encabezado_json(encabezado)
+    total = 0
+    async for lote in lotes:
+        if lote:
+            yield (b", " if total else b"") + lote_json(columnas, lote)
+            total += len(lote)
+    yield pie_json(total)
+
+
+def columnar_disponible() -> bool:
+    """pyarrow es opcional: solo lo necesitan las exportaciones arrow y parquet"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _tipo_arrow(pa, tipo_sql):
+    """Tipo Arrow equivalente a un tipo de columna de SQLAlchemy"""
+    from sqlalchemy import Date, DateTime, Integer, Numeric
+
+    if isinstance(tipo_sql, Numeric):
+        return pa.decimal128(tipo_sql.precision or 38, tipo_sql.scale or 0)
+    if isinstance(tipo_sql, DateTime):
+        return pa.timestamp("us")
+    if isinstance(tipo_sql, Date):
+        return pa.date32()
+    if isinstance(tipo_sql, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+def _esquema_arrow(pa, columnas: Sequence[str], tipos_sql: Sequence):
+    return pa.schema([pa.field(c, _tipo_arrow(pa, t)) for c, t in zip(columnas, tipos_sql)])
+
+
+def _lote_arrow(pa, esquema, lote: Sequence[Sequence]):
+    """RecordBatch de un lote de filas: cada columna se convierte de una vez, sin objetos por fila"""
+    columnas = list(zip(*lote))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(valores, type=campo.type) for valores, campo in zip(columnas, esquema)], schema=esquema
+    )
+
+
+class _Sumidero(io.RawIOBase):
+    """Archivo de solo escritura que acumula lo escrito hasta que se retira"""
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self._posicion
+
+    def retirar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+async def exportar_arrow(
+    columnas: Sequence[str],
+    tipos_sql: Sequence,
+    lotes: AsyncIterator[Sequence[Sequence]]
+) -> AsyncIterator[bytes]:
+    """Formato de streaming IPC de Arrow, un RecordBatch comprimido por lote"""
+    import pyarrow as pa
+
+    esquema = _esquema_arrow(pa, columnas, tipos_sql)
+    sumidero = _Sumidero()
+    opciones = pa.ipc.IpcWriteOptions(compression=COMPRESION_COLUMNAR)
+    with pa.ipc.new_stream(sumidero, esquema, options=opciones) as escritor:
+        yield sumidero.retirar()
+        async for lote in lotes:
+            if lote:
+                escritor.write_batch(_lote_arrow(pa, esquema, lote))
+                yield sumidero.retirar()
+    yield sumidero.retirar()
+
+
+async def exportar_parquet(
+    columnas: Sequence[str],
+    tipos_sql: Sequence,
+    lotes: AsyncIterator[Sequence[Sequence]]
+) -> AsyncIterator[bytes]:
+    """Parquet comprimido, un row group por lote; el pie del archivo se envía al final"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = _esquema_arrow(pa, columnas, tipos_sql)
+    sumidero = _Sumidero()
+    with pq.ParquetWriter(sumidero, esquema, compression=COMPRESION_COLUMNAR) as escritor:
+        async for lote in lotes:
+            if lote:
+                escritor.write_batch(_lote_arrow(pa, esquema, lote))
+                yield sumidero.retirar()
+    yield sumidero.retirar()
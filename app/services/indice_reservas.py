@@ -0,0 +1,109 @@
+import asyncio
+from bisect import bisect_left, insort
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.reserva import Reserva, ESTADOS_ACTIVOS
+
+
+class IndiceReservas:
+    """Índice en memoria de los intervalos de reservas activas por habitación.
+
+    Cada habitación guarda una lista ordenada de intervalos semiabiertos
+    [fecha_inicio, fecha_fin). Como las reservas activas de una misma habitación
+    no se solapan, para detectar un conflicto basta con revisar el intervalo
+    anterior y el siguiente a la posición de búsqueda (O(log n)).
+    """
+
+    def __init__(self):
+        self._intervalos: Dict[int, List[Tuple[date, date]]] = {}
+        self._reservas: Dict[int, Tuple[int, date, date]] = {}
+        self._lock_carga: Optional[asyncio.Lock] = None
+        self.cargado = False
+
+    async def asegurar_cargado(self, db: AsyncSession) -> None:
+        """Cargar el índice desde la base de datos si aún no se ha hecho"""
+        if self.cargado:
+            return
+        if self._lock_carga is None:
+            self._lock_carga = asyncio.Lock()
+        async with self._lock_carga:
+            if not self.cargado:
+                await self.cargar(db)
+
+    async def cargar(self, db: AsyncSession) -> None:
+        """Reconstruir el índice con las reservas activas de la base de datos"""
+        result = await db.execute(
+            select(Reserva.id, Reserva.habitacion_id, Reserva.fecha_inicio, Reserva.fecha_fin)
+            .where(Reserva.estado.in_(ESTADOS_ACTIVOS))
+        )
+        self.reconstruir(result.all())
+
+    def reconstruir(self, filas: Iterable[Tuple[int, int, date, date]]) -> None:
+        """Reemplazar el contenido del índice por las filas (id, habitacion_id, inicio, fin)"""
+        intervalos: Dict[int, List[Tuple[date, date]]] = {}
+        reservas: Dict[int, Tuple[int, date, date]] = {}
+        for reserva_id, habitacion_id, fecha_inicio, fecha_fin in filas:
+            intervalos.setdefault(habitacion_id, []).append((fecha_inicio, fecha_fin))
+            reservas[reserva_id] = (habitacion_id, fecha_inicio, fecha_fin)
+        for lista in intervalos.values():
+            lista.sort()
+        self._intervalos = intervalos
+        self._reservas = reservas
+        self.cargado = True
+
+    def hay_conflicto(self, habitacion_id: int, fecha_inicio: date, fecha_fin: date) -> bool:
+        """Indicar si [fecha_inicio, fecha_fin) se solapa con una reserva activa"""
+        intervalos = self._intervalos.get(habitacion_id)
+        if not intervalos:
+            return False
+        pos = bisect_left(intervalos, (fecha_inicio,))
+        # Siguiente intervalo: empieza en o después de fecha_inicio
+        if pos < len(intervalos) and intervalos[pos][0] < fecha_fin:
+            return True
+        # Intervalo anterior: empieza antes de fecha_inicio
+        if pos > 0 and intervalos[pos - 1][1] > fecha_inicio:
+            return True
+        return False
+
+    def apartar(self, habitacion_id: int, fecha_inicio: date, fecha_fin: date) -> bool:
+        """Verificar e insertar el intervalo en un solo paso; False si hay conflicto.
+
+        No hay puntos de espera entre la verificación y la inserción, así que dos
+        corrutinas del mismo proceso no pueden apartar el mismo rango a la vez.
+        """
+        if self.hay_conflicto(habitacion_id, fecha_inicio, fecha_fin):
+            return False
+        insort(self._intervalos.setdefault(habitacion_id, []), (fecha_inicio, fecha_fin))
+        return True
+
+    def liberar(self, habitacion_id: int, fecha_inicio: date, fecha_fin: date) -> None:
+        """Quitar un intervalo apartado (por ejemplo, si la escritura en BD falla)"""
+        intervalos = self._intervalos.get(habitacion_id)
+        if not intervalos:
+            return
+        pos = bisect_left(intervalos, (fecha_inicio, fecha_fin))
+        if pos < len(intervalos) and intervalos[pos] == (fecha_inicio, fecha_fin):
+            del intervalos[pos]
+        if not intervalos:
+            del self._intervalos[habitacion_id]
+
+    def registrar(self, reserva_id: int, habitacion_id: int, fecha_inicio: date, fecha_fin: date) -> None:
+        """Asociar el id de la reserva ya confirmada a su intervalo apartado"""
+        self._reservas[reserva_id] = (habitacion_id, fecha_inicio, fecha_fin)
+
+    def habitacion_de(self, reserva_id: int) -> Optional[int]:
+        """Habitación de una reserva activa, o None si no está en el índice"""
+        datos = self._reservas.get(reserva_id)
+        return datos[0] if datos else None
+
+    def quitar(self, reserva_id: int) -> None:
+        """Eliminar del índice una reserva que deja de estar activa"""
+        datos = self._reservas.pop(reserva_id, None)
+        if datos:
+            self.liberar(*datos)
+
+
+indice_reservas = IndiceReservas()
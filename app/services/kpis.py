@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List
+
+import numpy as np
+
+# Límites inferiores (días) de los tramos del histograma de anticipación de reserva
+LIMITES_ANTICIPACION = (0, 1, 8, 15, 31, 61, 91, 181)
+
+
+def etiquetas_anticipacion() -> List[str]:
+    """Etiquetas de los tramos: '0', '1-7', ..., '181+'"""
+    etiquetas = []
+    for inferior, superior in zip(LIMITES_ANTICIPACION, LIMITES_ANTICIPACION[1:] + (None,)):
+        if superior is None:
+            etiquetas.append(f"{inferior}+")
+        elif superior - inferior == 1:
+            etiquetas.append(str(inferior))
+        else:
+            etiquetas.append(f"{inferior}-{superior - 1}")
+    return etiquetas
+
+
+@dataclass
+class ReservasKPI:
+    """Reservas de un rango como arreglos paralelos (fechas en ordinal)"""
+    inicio: np.ndarray
+    fin: np.ndarray
+    anticipacion: np.ndarray
+    # Ingresos cobrados de la reserva o, si no hay, precio_noche * noches. Arreglo
+    # de Decimal (dtype object) para sumar igual que el numeric de la consulta SQL
+    importe: np.ndarray
+
+    @classmethod
+    def desde_filas(cls, filas) -> "ReservasKPI":
+        """Construir a partir de filas (fecha_inicio, fecha_fin, anticipacion, importe)"""
+        filas = list(filas)
+        n = len(filas)
+        return cls(
+            inicio=np.fromiter((f[0].toordinal() for f in filas), dtype=np.int64, count=n),
+            fin=np.fromiter((f[1].toordinal() for f in filas), dtype=np.int64, count=n),
+            anticipacion=np.fromiter((f[2] for f in filas), dtype=np.int64, count=n),
+            importe=np.array([Decimal(str(f[3])) for f in filas], dtype=object).reshape(n),
+        )
+
+
+def calcular_kpis(reservas: ReservasKPI, habitaciones: int, fecha_inicio: date, fecha_fin: date) -> Dict:
+    """KPIs del período [fecha_inicio, fecha_fin] (ambos incluidos) sobre reservas ya cargadas.
+
+    Mismas definiciones que la consulta SQL de app/crud/kpis.py: el importe de
+    cada reserva se prorratea por las noches que caen dentro del período; la
+    estadía promedio y la anticipación se miden sobre las llegadas del período.
+    """
+    inicio = fecha_inicio.toordinal()
+    fin = fecha_fin.toordinal() + 1
+    noches = reservas.fin - reservas.inicio
+    noches_periodo = np.clip(np.minimum(reservas.fin, fin) - np.maximum(reservas.inicio, inicio), 0, None)
+    con_noches = noches_periodo > 0
+    # Prorrateo en Decimal: en float64 el total podía diferir en centavos del de la consulta SQL
+    prorrateo = (
+        reservas.importe[con_noches]
+        * noches_periodo[con_noches].astype(object)
+        / noches[con_noches].astype(object)
+    )
+    ingresos = sum(prorrateo, Decimal(0))
+
+    llegadas = (reservas.inicio >= inicio) & (reservas.inicio < fin)
+    anticipacion = np.histogram(
+        reservas.anticipacion[llegadas],
+        bins=np.array(LIMITES_ANTICIPACION + (np.iinfo(np.int64).max,), dtype=np.float64),
+    )[0]
+    return {
+        "noches_vendidas": int(noches_periodo.sum()),
+        "ingresos_habitaciones": ingresos,
+        "llegadas": int(llegadas.sum()),
+        "estadia_promedio": float(noches[llegadas].mean()) if llegadas.any() else 0.0,
+        "anticipacion": anticipacion.astype(int).tolist(),
+        "noches_disponibles": habitaciones * (fin - inicio),
+    }
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import zlib
+from collections import OrderedDict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.periodo_cerrado import PeriodoCerrado, InstantaneaReporte
+
+MAX_INSTANTANEAS_EN_MEMORIA = 64  # Instantáneas descomprimidas que se conservan (son inmutables)
+NIVEL_COMPRESION = 9
+
+# Reporte -> conversión de cada columna al leer la instantánea. La primera
+# columna es siempre la fecha de la fila, por la que se filtra.
+INSTANTANEA_LIBRO_DIARIO = "libro_diario"          # fecha, tipo, descripcion, monto, movimiento_id
+INSTANTANEA_RESUMEN_DIARIO = "resumen_diario"      # fecha, ingresos, egresos, cantidad_ingresos, cantidad_egresos
+INSTANTANEA_OCUPACION_DIARIA = "ocupacion_diaria"  # fecha, habitaciones_ocupadas, total_habitaciones
+COLUMNAS_INSTANTANEAS: Dict[str, Tuple[Callable[[Any], Any], ...]] = {
+    INSTANTANEA_LIBRO_DIARIO: (date.fromisoformat, str, str, Decimal, int),
+    INSTANTANEA_RESUMEN_DIARIO: (date.fromisoformat, Decimal, Decimal, int, int),
+    INSTANTANEA_OCUPACION_DIARIA: (date.fromisoformat, int, int),
+}
+
+# SQLSTATE con el que el trigger de la base rechaza un movimiento de un período cerrado
+CHECK_VIOLATION = "23514"
+
+# Tramo de fechas [desde, hasta] (None es un extremo abierto) y si está cerrado
+Tramo = Tuple[Optional[date], Optional[date], bool]
+
+
+def _valor_json(valor: Any) -> Any:
+    # Decimal como texto para no perder precisión; se reconstruye al leer
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+_codificar = json.JSONEncoder(default=_valor_json, separators=(",", ":"), ensure_ascii=False).encode
+
+
+def comprimir(filas: Iterable[Sequence]) -> bytes:
+    return zlib.compress(_codificar([list(fila) for fila in filas]).encode(), NIVEL_COMPRESION)
+
+
+def descomprimir(reporte: str, contenido: bytes) -> List[tuple]:
+    conversiones = COLUMNAS_INSTANTANEAS[reporte]
+    return [
+        tuple(None if valor is None else convertir(valor) for convertir, valor in zip(conversiones, fila))
+        for fila in json.loads(zlib.decompress(contenido))
+    ]
+
+
+def _interseccion(a: Tuple[Optional[date], Optional[date]], b: Tuple[Optional[date], Optional[date]]):
+    desde = max((d for d in (a[0], b[0]) if d is not None), default=None)
+    hasta = min((h for h in (a[1], b[1]) if h is not None), default=None)
+    if desde is not None and hasta is not None and desde > hasta:
+        return None
+    return desde, hasta
+
+
+def error_periodo_cerrado(fecha: date) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"El período contable de {fecha:%Y-%m} está cerrado; registre el movimiento en un período abierto."
+    )
+
+
+def error_estadia_cerrada(fecha: Optional[date] = None) -> HTTPException:
+    periodo = "un período contable cerrado" if fecha is None else f"el período contable cerrado de {fecha:%Y-%m}"
+    return HTTPException(
+        status_code=400,
+        detail=f"La reserva tiene noches en {periodo}; su ocupación ya no puede cambiar."
+    )
+
+
+class PeriodosCerrados:
+    """Períodos cerrados en memoria y lectura de sus instantáneas.
+
+    Un reporte sobre un rango de fechas se divide en tramos: el tramo cerrado
+    se lee de las instantáneas (descomprimidas una vez y conservadas, porque no
+    cambian) y los tramos abiertos se consultan en vivo. Los cierres hechos por
+    este proceso se registran al confirmarse; los de otros procesos se ven al
+    volver a cargar.
+    """
+
+    def __init__(self):
+        self._periodos: List[Tuple[int, date, date]] = []  # (id, inicio, fin) en orden
+        self._cerrando: Set[Tuple[date, date]] = set()  # Cierres en curso en este proceso
+        self._instantaneas: "OrderedDict[Tuple[int, str], List[tuple]]" = OrderedDict()
+        self._lock_carga: Optional[asyncio.Lock] = None
+        self.cargado = False
+
+    async def asegurar_cargado(self, db: AsyncSession) -> None:
+        """Cargar los períodos cerrados desde la base de datos si aún no se ha hecho"""
+        if self.cargado:
+            return
+        if self._lock_carga is None:
+            self._lock_carga = asyncio.Lock()
+        async with self._lock_carga:
+            if not self.cargado:
+                await self.cargar(db)
+
+    async def cargar(self, db: AsyncSession) -> None:
+        result = await db.execute(
+            select(PeriodoCerrado.id, PeriodoCerrado.fecha_inicio, PeriodoCerrado.fecha_fin)
+            .order_by(PeriodoCerrado.fecha_inicio)
+        )
+        self.reconstruir(result.all())
+
+    def reconstruir(self, periodos: Iterable[Tuple[int, date, date]]) -> None:
+        self._periodos = sorted((tuple(p) for p in periodos), key=lambda p: p[1])
+        self._instantaneas.clear()
+        self.cargado = True
+
+    def registrar(self, periodo_id: int, fecha_inicio: date, fecha_fin: date) -> None:
+        """Agregar un período recién cerrado (después de confirmar el cierre)"""
+        self._periodos.append((periodo_id, fecha_inicio, fecha_fin))
+        self._periodos.sort(key=lambda p: p[1])
+
+    @property
+    def ultimo_cierre(self) -> Optional[date]:
+        """Último día cerrado, o None si no hay períodos cerrados"""
+        return self._periodos[-1][2] if self._periodos else None
+
+    def contiene(self, desde: Optional[date], hasta: Optional[date]) -> bool:
+        """Si todo [desde, hasta] está dentro de los períodos cerrados (sus datos ya no cambian)"""
+        if desde is None or hasta is None or not self._periodos:
+            return False
+        return self._periodos[0][1] <= desde <= hasta <= self._periodos[-1][2]
+
+    def iniciar_cierre(self, fecha_inicio: date, fecha_fin: date) -> None:
+        """Rechazar desde ya los movimientos del período que se está cerrando"""
+        self._cerrando.add((fecha_inicio, fecha_fin))
+
+    def terminar_cierre(self, fecha_inicio: date, fecha_fin: date) -> None:
+        self._cerrando.discard((fecha_inicio, fecha_fin))
+
+    def esta_cerrada(self, fecha: date) -> bool:
+        return self.primer_dia_cerrado(fecha, fecha) is not None
+
+    def primer_dia_cerrado(self, desde: date, hasta: date) -> Optional[date]:
+        """Primer día de [desde, hasta] en un período cerrado o en cierre, o None si no hay"""
+        rangos = [(inicio, fin) for _, inicio, fin in self._periodos] + list(self._cerrando)
+        return min((max(desde, inicio) for inicio, fin in rangos if inicio <= hasta and desde <= fin), default=None)
+
+    def verificar_abierto(self, fecha: date) -> None:
+        """HTTP 400 si `fecha` pertenece a un período cerrado o en cierre que este proceso conoce.
+
+        Es solo un aviso anticipado: quien lo garantiza es el trigger de
+        ingresos y egresos (migración 0012), en la transacción que escribe.
+        """
+        if self.esta_cerrada(fecha):
+            raise error_periodo_cerrado(fecha)
+
+    def verificar_estadia_abierta(self, fecha_inicio: date, fecha_fin: date) -> None:
+        """HTTP 400 si alguna noche de la estadía [fecha_inicio, fecha_fin) está en un período cerrado.
+
+        Como en verificar_abierto, la garantía la da el trigger de
+        noches_ocupadas (migración 0014).
+        """
+        if fecha_fin <= fecha_inicio:
+            return
+        dia = self.primer_dia_cerrado(fecha_inicio, fecha_fin - timedelta(days=1))
+        if dia is not None:
+            raise error_estadia_cerrada(dia)
+
+    def dividir(self, desde: Optional[date], hasta: Optional[date]) -> List[Tramo]:
+        """Tramos de [desde, hasta] en orden de fecha: antes, dentro y después del rango cerrado"""
+        if not self._periodos:
+            return [(desde, hasta, False)]
+        inicio, fin = self._periodos[0][1], self._periodos[-1][2]
+        tramos = []
+        for rango, cerrado in (
+            ((None, inicio - timedelta(days=1)), False),
+            ((inicio, fin), True),
+            ((fin + timedelta(days=1), None), False),
+        ):
+            parte = _interseccion((desde, hasta), rango)
+            if parte is not None:
+                tramos.append((parte[0], parte[1], cerrado))
+        return tramos
+
+    async def filas(self, db: AsyncSession, reporte: str, desde: date, hasta: date) -> List[tuple]:
+        """Filas de la instantánea `reporte` con fecha en [desde, hasta], en el orden en que se guardaron"""
+        periodos = [p for p in self._periodos if p[1] <= hasta and p[2] >= desde]
+        contenidos: Dict[int, List[tuple]] = {}
+        for periodo_id, _, _ in periodos:
+            if (periodo_id, reporte) in self._instantaneas:
+                self._instantaneas.move_to_end((periodo_id, reporte))
+                contenidos[periodo_id] = self._instantaneas[(periodo_id, reporte)]
+        faltantes = [p[0] for p in periodos if p[0] not in contenidos]
+        if faltantes:
+            result = await db.execute(
+                select(InstantaneaReporte.periodo_id, InstantaneaReporte.contenido)
+                .where(InstantaneaReporte.periodo_id.in_(faltantes), InstantaneaReporte.reporte == reporte)
+            )
+            for periodo_id, contenido in result.all():
+                contenidos[periodo_id] = descomprimir(reporte, contenido)
+                self._guardar((periodo_id, reporte), contenidos[periodo_id])
+        filas = []
+        for periodo_id, inicio, fin in periodos:
+            contenido = contenidos.get(periodo_id, [])
+            if desde <= inicio and fin <= hasta:
+                filas.extend(contenido)
+            else:
+                filas.extend(fila for fila in contenido if desde <= fila[0] <= hasta)
+        return filas
+
+    def _guardar(self, clave: Tuple[int, str], filas: List[tuple]) -> None:
+        self._instantaneas[clave] = filas
+        while len(self._instantaneas) > MAX_INSTANTANEAS_EN_MEMORIA:
+            self._instantaneas.popitem(last=False)
+
+
+periodos_cerrados = PeriodosCerrados()
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from fastapi import HTTPException
+
+from app.services.exportacion import encabezado_json, formatear_lote, lote_csv, pie_json
+
+logger = logging.getLogger(__name__)
+
+MAX_TRABAJOS_SIMULTANEOS = 2  # Trabajos que leen de la base a la vez (una conexión del pool cada uno)
+MAX_TRABAJOS_PENDIENTES = 50  # Trabajos sin terminar admitidos; con más se responde 429
+PROCESOS_FORMATO = 2          # Procesos que convierten los lotes a texto, fuera del loop de la API
+VIGENCIA_RESULTADOS = 3600.0  # Segundos que se conserva un trabajo terminado y su archivo
+INTERVALO_LIMPIEZA = 60.0     # Segundos entre revisiones de resultados vencidos
+DIRECTORIO_RESULTADOS = Path(
+    os.getenv("REPORTES_TRABAJOS_DIR", os.path.join(tempfile.gettempdir(), "reportes_trabajos"))
+)
+
+PENDIENTE = "pendiente"
+EN_PROCESO = "en_proceso"
+TERMINADO = "terminado"
+ERROR = "error"
+CANCELADO = "cancelado"
+
+
+@dataclass
+class Trabajo:
+    id: str
+    reporte: str
+    formato: str
+    estado: str = PENDIENTE
+    filas_procesadas: int = 0
+    total_filas: Optional[int] = None
+    creado: datetime = field(default_factory=datetime.now)
+    iniciado: Optional[datetime] = None
+    terminado: Optional[datetime] = None
+    expira: Optional[datetime] = None
+    tamano_bytes: int = 0
+    error: Optional[str] = None
+    archivo: Optional[Path] = None
+    tarea: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def progreso(self) -> float:
+        """Porcentaje de filas escritas (el total se cuenta al empezar y la vista puede cambiar)"""
+        if self.estado == TERMINADO:
+            return 100.0
+        if not self.total_filas:
+            return 0.0
+        return round(min(99.9, self.filas_procesadas / self.total_filas * 100), 1)
+
+    @property
+    def nombre_archivo(self) -> str:
+        return f"{self.reporte}_{self.id}.{self.formato}"
+
+
+class ColaTrabajos:
+    """Cola en memoria de exportaciones de reportes que se ejecutan en segundo plano.
+
+    Cada trabajo es una tarea asyncio que espera un lugar en el semáforo
+    (`simultaneos` a la vez), abre su propia sesión y lee el reporte por lotes
+    con un cursor del servidor. Cada lote se convierte a texto en un
+    ProcessPoolExecutor mientras se lee el siguiente, y el archivo se escribe
+    desde un hilo: el loop que atiende la API no hace el trabajo pesado. El
+    resultado queda en disco hasta que vence. Los trabajos viven en el
+    proceso que los recibió, igual que las demás cachés de la aplicación.
+    """
+
+    def __init__(
+        self,
+        directorio: Path = DIRECTORIO_RESULTADOS,
+        simultaneos: int = MAX_TRABAJOS_SIMULTANEOS,
+        max_pendientes: int = MAX_TRABAJOS_PENDIENTES,
+        procesos: int = PROCESOS_FORMATO,
+        vigencia: float = VIGENCIA_RESULTADOS,
+        ejecutor: Optional[Executor] = None
+    ):
+        self.directorio = Path(directorio)
+        self.max_pendientes = max_pendientes
+        self.procesos = procesos
+        self.vigencia = vigencia
+        self._semaforo = asyncio.Semaphore(simultaneos)
+        self._ejecutor = ejecutor
+        self._trabajos: Dict[str, Trabajo] = {}
+        self._tarea_limpieza: Optional[asyncio.Task] = None
+
+    def _ejecutor_formato(self) -> Executor:
+        if self._ejecutor is None:
+            # spawn: los procesos no heredan el loop, los hilos ni las conexiones del proceso de la API
+            self._ejecutor = ProcessPoolExecutor(self.procesos, mp_context=multiprocessing.get_context("spawn"))
+        return self._ejecutor
+
+    def encolar(
+        self,
+        reporte: str,
+        formato: str,
+        columnas: Sequence[str],
+        iterar: Callable,
+        contar: Callable,
+        filtros: Dict[str, Any],
+        encabezado: Dict[str, Any],
+        fabrica_sesiones
+    ) -> Trabajo:
+        """Registrar un trabajo y lanzarlo; empieza cuando haya lugar en el semáforo"""
+        self.purgar_vencidos()
+        en_curso = sum(1 for t in self._trabajos.values() if t.estado in (PENDIENTE, EN_PROCESO))
+        if en_curso >= self.max_pendientes:
+            raise HTTPException(
+                status_code=429,
+                detail="Hay demasiados trabajos de reportes en curso; intente más tarde.",
+                headers={"Retry-After": str(int(INTERVALO_LIMPIEZA))}
+            )
+        trabajo = Trabajo(id=uuid.uuid4().hex, reporte=reporte, formato=formato)
+        self._trabajos[trabajo.id] = trabajo
+        trabajo.tarea = asyncio.get_running_loop().create_task(
+            self._ejecutar(trabajo, columnas, iterar, contar, filtros, encabezado, fabrica_sesiones)
+        )
+        return trabajo
+
+    def obtener(self, trabajo_id: str) -> Optional[Trabajo]:
+        self.purgar_vencidos()
+        return self._trabajos.get(trabajo_id)
+
+    async def cancelar(self, trabajo_id: str) -> bool:
+        """Detener el trabajo si está en curso y borrar su resultado"""
+        trabajo = self._trabajos.pop(trabajo_id, None)
+        if trabajo is None:
+            return False
+        if trabajo.tarea is not None and not trabajo.tarea.done():
+            trabajo.tarea.cancel()
+            try:
+                await trabajo.tarea
+            except asyncio.CancelledError:
+                pass
+        self._borrar_archivo(trabajo)
+        return True
+
+    async def _ejecutar(self, trabajo: Trabajo, columnas, iterar, contar, filtros, encabezado, fabrica_sesiones):
+        async with self._semaforo:
+            trabajo.estado = EN_PROCESO
+            trabajo.iniciado = datetime.now()
+            parcial = self.directorio / f"{trabajo.nombre_archivo}.parcial"
+            try:
+                self.directorio.mkdir(parents=True, exist_ok=True)
+                async with fabrica_sesiones() as db:
+                    trabajo.total_filas = await contar(db, **filtros)
+                    with open(parcial, "wb") as archivo:
+                        await self._escribir(trabajo, archivo, columnas, iterar(db, **filtros), encabezado)
+                destino = self.directorio / trabajo.nombre_archivo
+                os.replace(parcial, destino)
+            except asyncio.CancelledError:
+                parcial.unlink(missing_ok=True)
+                trabajo.estado = CANCELADO
+                raise
+            except Exception as exc:
+                logger.exception("Falló el trabajo de reporte %s", trabajo.id)
+                parcial.unlink(missing_ok=True)
+                trabajo.estado = ERROR
+                trabajo.error = str(exc) or type(exc).__name__
+            else:
+                trabajo.archivo = destino
+                trabajo.tamano_bytes = destino.stat().st_size
+                trabajo.estado = TERMINADO
+            trabajo.terminado = datetime.now()
+            trabajo.expira = trabajo.terminado + timedelta(seconds=self.vigencia)
+
+    async def _escribir(self, trabajo: Trabajo, archivo, columnas, lotes, encabezado) -> None:
+        """Formatear cada lote en el pool de procesos mientras se lee el siguiente, y escribirlo en orden"""
+        loop = asyncio.get_running_loop()
+        ejecutor = self._ejecutor_formato()
+        if trabajo.formato == "csv":
+            await asyncio.to_thread(archivo.write, lote_csv([columnas]))
+        elif trabajo.formato == "json":
+            await asyncio.to_thread(archivo.write, encabezado_json(encabezado))
+
+        anterior = None  # (futuro, filas) del lote que se está formateando
+        async for lote in lotes:
+            if not lote:
+                continue
+            # Tuplas simples: las filas de SQLAlchemy no hace falta que viajen al otro proceso
+            futuro = loop.run_in_executor(ejecutor, formatear_lote, trabajo.formato, columnas, [tuple(f) for f in lote])
+            if anterior is not None:
+                await self._volcar(trabajo, archivo, *anterior)
+            anterior = (futuro, len(lote))
+        if anterior is not None:
+            await self._volcar(trabajo, archivo, *anterior)
+
+        if trabajo.formato == "json":
+            await asyncio.to_thread(archivo.write, pie_json(trabajo.filas_procesadas))
+
+    async def _volcar(self, trabajo: Trabajo, archivo, futuro, filas: int) -> None:
+        datos = await futuro
+        if trabajo.formato == "json" and trabajo.filas_procesadas:
+            datos = b", " + datos
+        await asyncio.to_thread(archivo.write, datos)
+        trabajo.filas_procesadas += filas
+
+    def _borrar_archivo(self, trabajo: Trabajo) -> None:
+        if trabajo.archivo is not None:
+            trabajo.archivo.unlink(missing_ok=True)
+
+    def purgar_vencidos(self) -> None:
+        """Olvidar los trabajos vencidos y borrar sus archivos"""
+        ahora = datetime.now()
+        for trabajo in [t for t in self._trabajos.values() if t.expira is not None and t.expira <= ahora]:
+            self._borrar_archivo(trabajo)
+            del self._trabajos[trabajo.id]
+
+    def _borrar_huerfanos(self) -> None:
+        """Borrar archivos vencidos de ejecuciones anteriores del proceso (ya no hay trabajo que los nombre)"""
+        if not self.directorio.is_dir():
+            return
+        limite = time.time() - self.vigencia
+        for ruta in self.directorio.iterdir():
+            if ruta.is_file() and ruta.stat().st_mtime < limite:
+                ruta.unlink(missing_ok=True)
+
+    def iniciar(self) -> None:
+        """Lanzar la limpieza periódica de resultados vencidos en el loop actual"""
+        self._borrar_huerfanos()
+        if self._tarea_limpieza is None or self._tarea_limpieza.done():
+            self._tarea_limpieza = asyncio.get_running_loop().create_task(self._ciclo_limpieza())
+
+    async def detener(self) -> None:
+        """Cancelar la limpieza y los trabajos en curso y cerrar el pool de procesos"""
+        tareas = [t.tarea for t in self._trabajos.values() if t.tarea is not None and not t.tarea.done()]
+        if self._tarea_limpieza is not None:
+            tareas.append(self._tarea_limpieza)
+            self._tarea_limpieza = None
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(*tareas, return_exceptions=True)
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False, cancel_futures=True)
+            self._ejecutor = None
+
+    async def _ciclo_limpieza(self) -> None:
+        while True:
+            await asyncio.sleep(INTERVALO_LIMPIEZA)
+            try:
+                self.purgar_vencidos()
+            except Exception:
+                logger.exception("No se pudieron borrar los resultados vencidos de reportes")
+
+
+cola_reportes = ColaTrabajos()
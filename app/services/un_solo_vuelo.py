@@ -0,0 +1,79 @@
+import asyncio
+import functools
+import inspect
+from typing import Callable, Dict, Hashable, Optional
+
+from app.services.versiones import versiones_tablas
+
+
+class UnSoloVuelo:
+    """Coalescencia de llamadas idénticas concurrentes ("single flight").
+
+    La primera llamada con una clave ejecuta la consulta; las que llegan
+    mientras está en curso esperan su resultado (o su excepción) en lugar de
+    repetirla. No guarda nada: al terminar, la siguiente llamada vuelve a
+    consultar. Si la llamada que ejecuta se cancela, quien esperaba la
+    reintenta por su cuenta.
+
+    Con `generacion` (un contador que avanza con cada escritura) la clave
+    incluye la generación al llegar: una llamada posterior a una escritura
+    no se une a una consulta empezada antes, que podría no verla.
+    """
+
+    def __init__(self, generacion: Optional[Callable[[], Hashable]] = None):
+        self._generacion = generacion
+        self._en_vuelo: Dict[Hashable, asyncio.Future] = {}
+        self.ejecutadas = 0
+        self.compartidas = 0
+
+    async def ejecutar(self, clave: Hashable, funcion, *args, **kwargs):
+        clave_vuelo = clave if self._generacion is None else (self._generacion(), clave)
+        futuro = self._en_vuelo.get(clave_vuelo)
+        if futuro is not None:
+            self.compartidas += 1
+            try:
+                # shield: cancelar a quien espera no cancela la consulta compartida
+                return await asyncio.shield(futuro)
+            except asyncio.CancelledError:
+                if futuro.cancelled():
+                    return await self.ejecutar(clave, funcion, *args, **kwargs)
+                raise
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._en_vuelo[clave_vuelo] = futuro
+        self.ejecutadas += 1
+        try:
+            resultado = await funcion(*args, **kwargs)
+        except asyncio.CancelledError:
+            futuro.cancel()
+            raise
+        except Exception as exc:
+            futuro.set_exception(exc)
+            futuro.exception()  # Marcarla como leída aunque nadie más esperara
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            if self._en_vuelo.get(clave_vuelo) is futuro:
+                del self._en_vuelo[clave_vuelo]
+
+
+# Cada escritura confirmada incrementa las versiones de las tablas que tocó
+vuelos_reportes = UnSoloVuelo(generacion=lambda: versiones_tablas.generacion)
+
+
+def un_solo_vuelo(funcion):
+    """Decorar una consulta `funcion(db, ...)` para que las llamadas concurrentes
+    con los mismos argumentos (sin contar la sesión) compartan una sola ejecución"""
+    firma = inspect.signature(funcion)
+    nombre = f"{funcion.__module__}.{funcion.__qualname__}"
+
+    @functools.wraps(funcion)
+    async def envoltura(db, *args, **kwargs):
+        argumentos = firma.bind(db, *args, **kwargs)
+        argumentos.apply_defaults()
+        clave = (nombre,) + tuple(list(argumentos.arguments.values())[1:])
+        return await vuelos_reportes.ejecutar(clave, funcion, db, *args, **kwargs)
+
+    return envoltura
@@ -0,0 +1,130 @@
+import hashlib
+import uuid
+from datetime import date
+from typing import Callable, Dict, Iterable, Optional
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# Políticas de Cache-Control. Con no-cache el cliente guarda la respuesta pero
+# la revalida siempre (If-None-Match): si nada cambió recibe un 304 sin cuerpo.
+SIN_CACHE = "private, no-cache"
+CATALOGO = "private, max-age=60"
+PERIODO_CERRADO = "private, max-age=3600"
+
+# Bloqueo de sesión que toma el proceso que sirve la aplicación ("HOTEL")
+CLAVE_PROCESO_UNICO = 0x484F54454C
+
+
+class VersionesTablas:
+    """Versión en memoria de cada tabla, para derivar ETags sin consultar la base.
+
+    Cada escritura confirmada incrementa la versión de las tablas que tocó; el
+    ETag de una respuesta resume las versiones de las tablas de las que depende
+    y cambia en cuanto alguna de ellas cambia. Los contadores vuelven a cero al
+    reiniciar el proceso: el token de instancia, distinto en cada arranque,
+    evita que un ETag anterior vuelva a coincidir.
+
+    Las versiones solo ven las escrituras de este proceso, así que la
+    aplicación se sirve con un único proceso (sin --workers ni réplicas):
+    reservar_proceso detiene el arranque de un segundo proceso.
+    """
+
+    def __init__(self):
+        self.instancia = uuid.uuid4().hex[:12]
+        self._versiones: Dict[str, int] = {}
+        self._escrituras = 0
+
+    def incrementar(self, *tablas: str) -> None:
+        self._escrituras += 1
+        for tabla in tablas:
+            self._versiones[tabla] = self._versiones.get(tabla, 0) + 1
+
+    @property
+    def generacion(self) -> int:
+        """Escrituras confirmadas hasta ahora (en cualquier tabla): cambia con cada una"""
+        return self._escrituras
+
+    def version(self, tabla: str) -> int:
+        return self._versiones.get(tabla, 0)
+
+    def etag(self, tablas: Iterable[str], *extra) -> str:
+        """ETag fuerte de las versiones actuales de `tablas` más los datos de `extra`"""
+        partes = [self.instancia]
+        partes += [f"{tabla}={self.version(tabla)}" for tabla in tablas]
+        partes += [str(valor) for valor in extra]
+        return '"' + hashlib.blake2b("|".join(partes).encode(), digest_size=12).hexdigest() + '"'
+
+
+versiones_tablas = VersionesTablas()
+
+
+async def reservar_proceso(motor: AsyncEngine) -> AsyncConnection:
+    """Tomar el bloqueo de proceso único o detener el arranque si otro proceso ya lo tiene.
+
+    Las versiones de las tablas (y el resto del estado en memoria: caché de
+    reportes, índice de reservas, períodos cerrados) suponen que todas las
+    escrituras pasan por este proceso; con dos procesos uno respondería 304 a
+    un ETag que el otro ya invalidó. El bloqueo es de sesión: dura mientras la
+    conexión devuelta siga abierta y se libera al cerrarla o al terminar el proceso.
+    """
+    conexion = await motor.connect()
+    # Sin transacción abierta: la conexión queda inactiva hasta el cierre
+    conexion = await conexion.execution_options(isolation_level="AUTOCOMMIT")
+    result = await conexion.execute(
+        text("SELECT pg_try_advisory_lock(:clave)"), {"clave": CLAVE_PROCESO_UNICO}
+    )
+    if not result.scalar():
+        await conexion.close()
+        raise RuntimeError(
+            "Otro proceso de la aplicación ya usa esta base de datos. La aplicación guarda "
+            "estado en memoria (ETags, caché de reportes) y se sirve con un único proceso: "
+            "inicie uvicorn sin --workers y sin réplicas."
+        )
+    return conexion
+
+
+def _coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110): se ignora el prefijo W/"""
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def etag_condicional(
+    *tablas: str,
+    cache_control: str = SIN_CACHE,
+    por_dia: bool = False,
+    cerrado: Optional[Callable[[Request], bool]] = None
+):
+    """Dependencia para GET condicional sobre datos de `tablas`.
+
+    Calcula el ETag con las versiones en memoria, la ruta y la query; si
+    coincide con If-None-Match responde 304 antes de abrir la sesión y de
+    ejecutar el CRUD. Si no, agrega ETag y Cache-Control a la respuesta.
+    `por_dia` incluye la fecha de hoy en el ETag (datos que dependen del día,
+    como la ocupación actual). Si `cerrado(request)` es verdadero la consulta
+    es de un período ya terminado: no depende del día y se sirve con
+    PERIODO_CERRADO. Las solicitudes con otros métodos no se modifican.
+    """
+    async def dependencia(request: Request, response: Response):
+        if request.method not in ("GET", "HEAD"):
+            return
+        control = cache_control
+        extra = [request.url.path, request.url.query]
+        if cerrado is not None and cerrado(request):
+            control = PERIODO_CERRADO
+        elif por_dia:
+            extra.append(date.today().isoformat())
+        etag = versiones_tablas.etag(tablas, *extra)
+        if _coincide(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": control})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = control
+
+    return dependencia
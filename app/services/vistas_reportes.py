@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.services.versiones import versiones_tablas
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_REFRESCO = 5.0  # Segundos entre revisiones de vistas pendientes
+
+# Vistas materializadas de reportes y las tablas de las que dependen
+VISTA_LIBRO_DIARIO = "vistadellibro_diario"
+VISTA_REGISTRO_HUESPEDES = "vistadelregistro_huespedes"
+VISTA_REGISTRO_OCUPACION = "vistadelregistro_ocupacion"
+VISTAS = (VISTA_LIBRO_DIARIO, VISTA_REGISTRO_HUESPEDES, VISTA_REGISTRO_OCUPACION)
+
+VISTAS_POR_TABLA = {
+    "ingresos": (VISTA_LIBRO_DIARIO,),
+    "egresos": (VISTA_LIBRO_DIARIO,),
+    "reservas": (VISTA_REGISTRO_HUESPEDES, VISTA_REGISTRO_OCUPACION),
+    "clientes": (VISTA_REGISTRO_HUESPEDES, VISTA_REGISTRO_OCUPACION),
+    "habitaciones": (VISTA_REGISTRO_HUESPEDES, VISTA_REGISTRO_OCUPACION),
+}
+
+
+class RefrescoVistas:
+    """Refresco en segundo plano de las vistas materializadas de reportes.
+
+    Las escrituras marcan como pendientes las vistas que dependen de la tabla
+    modificada; una tarea revisa cada `intervalo` segundos y ejecuta
+    REFRESH MATERIALIZED VIEW CONCURRENTLY solo sobre esas vistas, sin
+    bloquear las lecturas. Los reportes informan cuánto pueden estar atrasados.
+    """
+
+    def __init__(self, intervalo: float = INTERVALO_REFRESCO):
+        self.intervalo = intervalo
+        # vista -> instante (monotónico) del primer cambio aún no incluido
+        self._pendientes: Dict[str, float] = {}
+        self._refrescando: Dict[str, float] = {}
+        self._refrescadas: Dict[str, datetime] = {}
+        self._tarea: Optional[asyncio.Task] = None
+
+    def marcar(self, *tablas: str) -> None:
+        """Marcar como pendientes las vistas que dependen de las tablas modificadas"""
+        ahora = time.monotonic()
+        for tabla in tablas:
+            for vista in VISTAS_POR_TABLA.get(tabla, ()):
+                self._pendientes.setdefault(vista, ahora)
+
+    def marcar_todas(self) -> None:
+        """Marcar todas las vistas como pendientes (por ejemplo, al iniciar el proceso)"""
+        ahora = time.monotonic()
+        for vista in VISTAS:
+            self._pendientes.setdefault(vista, ahora)
+
+    def estado(self, vistas: Iterable[str]) -> Tuple[Optional[datetime], float]:
+        """Último refresco completo y desfase máximo en segundos de las vistas indicadas"""
+        ahora = time.monotonic()
+        vistas = list(vistas)
+        refrescos = [self._refrescadas.get(vista) for vista in vistas]
+        # Si alguna vista no se ha refrescado en este proceso no hay fecha que informar
+        actualizado = None if None in refrescos else min(refrescos, default=None)
+        desfase = 0.0
+        for vista in vistas:
+            desde = min(
+                (t for t in (self._pendientes.get(vista), self._refrescando.get(vista)) if t is not None),
+                default=None,
+            )
+            if desde is not None:
+                desfase = max(desfase, ahora - desde)
+        return actualizado, desfase
+
+    async def refrescar_pendientes(self, fabrica_sesiones) -> None:
+        """Refrescar las vistas pendientes, cada una en su propia transacción"""
+        for vista in list(self._pendientes):
+            # Se quita antes de refrescar: un cambio que llegue durante el
+            # refresco vuelve a marcarla y se incluye en la siguiente pasada
+            self._refrescando[vista] = self._pendientes.pop(vista)
+            try:
+                async with fabrica_sesiones() as db:
+                    await db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {vista}"))
+                    await db.commit()
+            except Exception:
+                self._pendientes[vista] = min(self._refrescando[vista], self._pendientes.get(vista, float("inf")))
+                raise
+            else:
+                self._refrescadas[vista] = datetime.now()
+                # Cambia el contenido de la vista: los ETags de los reportes que la leen ya no valen
+                versiones_tablas.incrementar(vista)
+            finally:
+                del self._refrescando[vista]
+
+    def iniciar(self, fabrica_sesiones) -> None:
+        """Lanzar la tarea de refresco en el loop actual"""
+        if self._tarea is None or self._tarea.done():
+            self._tarea = asyncio.get_running_loop().create_task(self._ciclo(fabrica_sesiones))
+
+    async def detener(self) -> None:
+        """Cancelar la tarea de refresco y esperar a que termine"""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    async def _ciclo(self, fabrica_sesiones) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo)
+            if not self._pendientes:
+                continue
+            try:
+                await self.refrescar_pendientes(fabrica_sesiones)
+            except Exception:
+                logger.exception("No se pudieron refrescar las vistas de reportes")
+
+
+refresco_vistas = RefrescoVistas()
@@ -0,0 +1,114 @@
+import itertools
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.cache_reportes import cache_reportes
+from app.services.periodos import periodos_cerrados
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache_reportes():
+    """Cada test empieza con la caché de reportes vacía"""
+    cache_reportes.limpiar()
+    yield
+    cache_reportes.limpiar()
+
+
+@pytest.fixture(autouse=True)
+def sin_periodos_cerrados():
+    """Cada test empieza sin períodos cerrados (y sin consultarlos en la base)"""
+    periodos_cerrados.reconstruir([])
+    yield
+    periodos_cerrados.reconstruir([])
+
+
+class ResultadoFalso:
+    """Resultado con las filas indicadas y los accesos que usan los CRUD"""
+
+    def __init__(self, filas):
+        self.filas = list(filas)
+
+    def all(self):
+        return self.filas
+
+    def one(self):
+        return self.filas[0]
+
+    def scalar(self):
+        return self.filas[0][0] if self.filas else None
+
+    def scalar_one_or_none(self):
+        return self.scalar()
+
+    def scalars(self):
+        return ResultadoFalso(self.filas)
+
+    async def partitions(self):
+        for lote in self.filas:
+            yield lote
+
+
+class SesionFalsa:
+    """Sesión que devuelve los resultados indicados, en orden, y guarda el SQL de cada sentencia.
+
+    Cada `execute` toma el siguiente resultado (una lista de filas; vacío si no
+    quedan) y agrega a `sentencias` el SQL compilado para PostgreSQL, con los
+    valores en línea salvo que la sentencia reciba sus parámetros aparte (estos
+    quedan en `parametros`). Con `fallar` cada sentencia lanza RuntimeError.
+    Sirve también de fábrica de sesiones: `lambda: db` y `async with db`.
+    """
+
+    def __init__(self, *resultados, fallar=False):
+        self.resultados = list(resultados)
+        self.fallar = fallar
+        self.sentencias = []
+        self.parametros = []
+        self.agregados = []
+        self._ids = itertools.count(1)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def _registrar(self, sentencia, parametros=None):
+        if self.fallar:
+            raise RuntimeError("sin conexión")
+        self.sentencias.append(str(sentencia.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": parametros is None}
+        )))
+        self.parametros.append(parametros)
+        return ResultadoFalso(self.resultados.pop(0) if self.resultados else [])
+
+    async def execute(self, sentencia, parametros=None):
+        return self._registrar(sentencia, parametros)
+
+    async def stream(self, sentencia):
+        """Como execute; cada fila del resultado es un lote de `partitions()`"""
+        self.opciones = sentencia.get_execution_options()
+        return self._registrar(sentencia)
+
+    def add(self, objeto):
+        self.agregados.append(objeto)
+
+    async def flush(self):
+        for objeto in self.agregados:
+            if getattr(objeto, "id", False) is None:
+                objeto.id = next(self._ids)
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def refresh(self, objeto):
+        pass
+
+
+@pytest.fixture
+def sesion_falsa():
+    """Fábrica de SesionFalsa: `sesion_falsa(filas_1, filas_2, ..., fallar=False)`"""
+    return SesionFalsa
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import date
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.cache_reportes import CacheReportes, SIN_LIMITES
+
+client = TestClient(app)
+
+
+def _calcular(valor):
+    async def calcular():
+        return valor
+    return calcular
+
+
+class TestCacheReportes:
+    """Tests para la caché de resultados de reportes"""
+
+    def test_clave_normaliza_filtros(self):
+        """Test para que el orden de los filtros y los vacíos no cambien la clave"""
+        a = CacheReportes.clave("resumen", fecha_fin=date(2024, 1, 31), fecha_inicio=date(2024, 1, 1), tipo=None)
+        b = CacheReportes.clave("resumen", fecha_inicio=date(2024, 1, 1), fecha_fin=date(2024, 1, 31))
+        assert a == b
+
+    def test_acierto_y_vencimiento(self):
+        """Test para servir desde la caché hasta que vence el TTL"""
+        cache = CacheReportes(ttl=60)
+        assert asyncio.run(cache.obtener_o_calcular("k", {}, _calcular(1))) == (1, False)
+        assert asyncio.run(cache.obtener_o_calcular("k", {}, _calcular(2))) == (1, True)
+        with patch("app.services.cache_reportes.time.monotonic", return_value=10 ** 9):
+            assert asyncio.run(cache.obtener_o_calcular("k", {}, _calcular(3))) == (3, False)
+        assert (cache.aciertos, cache.fallos) == (1, 2)
+
+    def test_expulsion_lru(self):
+        """Test para descartar la entrada usada hace más tiempo al superar el límite"""
+        cache = CacheReportes(max_entradas=2)
+        cache.guardar("a", 1, {})
+        cache.guardar("b", 2, {})
+        cache.obtener("a")
+        cache.guardar("c", 3, {})
+        assert cache.obtener("b") == (False, None)
+        assert cache.obtener("a") == (True, 1)
+        assert cache.expulsiones == 1
+
+    def test_invalidacion_por_tabla_y_fechas(self):
+        """Test para invalidar solo las entradas de la tabla cuyo rango incluye la fecha escrita"""
+        cache = CacheReportes()
+        cache.guardar("enero", 1, {"ingresos": (date(2024, 1, 1), date(2024, 1, 31))})
+        cache.guardar("febrero", 2, {"ingresos": (date(2024, 2, 1), date(2024, 2, 29))})
+        cache.guardar("ocupacion", 3, {"reservas": SIN_LIMITES})
+        cache.guardar("todo", 4, {"ingresos": SIN_LIMITES})
+
+        cache.invalidar("ingresos", date(2024, 1, 15), date(2024, 1, 15))
+
+        assert cache.obtener("enero")[0] is False
+        assert cache.obtener("todo")[0] is False
+        assert cache.obtener("febrero") == (True, 2)
+        assert cache.obtener("ocupacion") == (True, 3)
+
+    def test_no_guarda_si_hubo_escritura_durante_el_calculo(self):
+        """Test para no guardar un resultado calculado mientras se invalidaba"""
+        cache = CacheReportes()
+
+        async def calcular():
+            cache.invalidar("ingresos", date(2024, 1, 1), date(2024, 1, 1))
+            return 1
+
+        asyncio.run(cache.obtener_o_calcular("k", {"ingresos": SIN_LIMITES}, calcular))
+        assert cache.obtener("k")[0] is False
+
+
+class TestCacheEndpoints:
+    """Tests para el uso de la caché en las rutas de reportes"""
+
+    @patch('app.crud.reportes.obtener_resumen_financiero')
+    def test_resumen_financiero_cacheado(self, mock_crud):
+        """Test para consultar la base una sola vez con los mismos filtros"""
+        mock_crud.return_value = {
+            "total_ingresos": 100.0, "total_egresos": 40.0, "saldo": 60.0, "periodo": "2024-01-01 - 2024-01-31"
+        }
+        params = {"fecha_inicio": "2024-01-01", "fecha_fin": "2024-01-31"}
+
+        primera = client.get("/reportes/resumen-financiero", params=params)
+        segunda = client.get("/reportes/resumen-financiero", params=params)
+
+        assert primera.headers["X-Cache"] == "MISS" and segunda.headers["X-Cache"] == "HIT"
+        assert segunda.json() == primera.json()
+        mock_crud.assert_called_once()
+
+        estadisticas = client.get("/reportes/cache").json()
+        assert estadisticas["aciertos"] == 1 and estadisticas["fallos"] == 1
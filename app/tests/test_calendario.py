@@ -0,0 +1,68 @@
+import pytest
+from datetime import date, timedelta
+
+from app.services.calendario import CalendarioHabitaciones
+
+
+class TestCalendarioHabitaciones:
+    """Tests para el calendario de ocupación en memoria"""
+
+    @pytest.fixture
+    def calendario(self):
+        calendario = CalendarioHabitaciones()
+        calendario.reconstruir(
+            [(1, "simple"), (2, "doble"), (3, "simple")],
+            [
+                (1, date(2024, 1, 10), date(2024, 1, 12)),
+                (2, date(2024, 1, 11), date(2024, 1, 15)),
+            ],
+        )
+        return calendario
+
+    def test_disponibles_en_rango(self, calendario):
+        """Test para habitaciones libres en un rango con reservas"""
+        assert calendario.disponibles(date(2024, 1, 11), date(2024, 1, 12)) == [3]
+        assert calendario.disponibles(date(2024, 1, 12), date(2024, 1, 15)) == [1, 3]
+        assert calendario.disponibles(date(2024, 1, 15), date(2024, 1, 20)) == [1, 2, 3]
+
+    def test_disponibles_por_tipo(self, calendario):
+        """Test para filtrar por tipo de habitación"""
+        assert calendario.disponibles(date(2024, 1, 12), date(2024, 1, 13), "simple") == [1, 3]
+        assert calendario.disponibles(date(2024, 1, 12), date(2024, 1, 13), "doble") == []
+
+    def test_fechas_fuera_del_calendario(self, calendario):
+        """Test para rangos antes y después de las noches almacenadas"""
+        assert calendario.disponibles(date(2020, 1, 1), date(2020, 1, 5)) == [1, 2, 3]
+        assert calendario.disponibles(date(2090, 1, 1), date(2090, 1, 5)) == [1, 2, 3]
+
+    def test_marcar_y_liberar(self, calendario):
+        """Test para mantener el calendario al crear y cancelar reservas"""
+        calendario.marcar(3, date(2024, 3, 1), date(2024, 3, 4))
+        assert 3 not in calendario.disponibles(date(2024, 3, 3), date(2024, 3, 5))
+        calendario.liberar(3, date(2024, 3, 1), date(2024, 3, 4))
+        assert 3 in calendario.disponibles(date(2024, 3, 3), date(2024, 3, 5))
+
+    def test_agregar_habitacion(self, calendario):
+        """Test para registrar una habitación nueva"""
+        calendario.agregar_habitacion(4, "suite")
+        assert calendario.disponibles(date(2024, 1, 11), date(2024, 1, 12), "suite") == [4]
+
+    def test_ocupadas_en_fecha(self, calendario):
+        """Test para las habitaciones ocupadas en una noche concreta"""
+        assert calendario.ocupadas_en(date(2024, 1, 11)) == [1, 2]
+        assert calendario.ocupadas_en(date(2024, 1, 12)) == [2]
+        assert calendario.ocupadas_en(date(2030, 1, 1)) == []
+
+    def test_mil_habitaciones_un_anio(self):
+        """Test de consistencia con 1000 habitaciones y 365 noches"""
+        calendario = CalendarioHabitaciones()
+        inicio = date(2024, 1, 1)
+        reservas = [(h, inicio + timedelta(days=h % 365), inicio + timedelta(days=h % 365 + 3)) for h in range(1000)]
+        calendario.reconstruir([(h, "simple") for h in range(1000)], reservas)
+        libres = calendario.disponibles(inicio + timedelta(days=100), inicio + timedelta(days=101))
+        ocupadas = {h for h, i, f in reservas if i <= inicio + timedelta(days=100) < f}
+        assert set(libres) == set(range(1000)) - ocupadas
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.contadores import ContadoresReservasActivas
+from app.services.calendario import CalendarioHabitaciones
+from app.crud import habitacion as crud_habitacion
+
+
+def _db_con_conteos(conteos):
+    """Sesión simulada cuya consulta agrupada devuelve los conteos indicados"""
+    result = MagicMock()
+    result.all.return_value = list(conteos.items())
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+class TestContadoresReservasActivas:
+    """Tests para la caché de reservas activas por habitación"""
+
+    def test_consulta_solo_lo_que_falta(self):
+        """Una segunda lectura sale de la caché sin consultar la base de datos"""
+        contadores = ContadoresReservasActivas()
+        db = _db_con_conteos({1: 2})
+        assert asyncio.run(contadores.obtener(db, [1, 2])) == {1: 2, 2: 0}
+        assert asyncio.run(contadores.obtener(db, [1, 2])) == {1: 2, 2: 0}
+        assert db.execute.await_count == 1
+
+    def test_invalidar_recalcula_la_habitacion(self):
+        """Una escritura invalida solo la habitación afectada"""
+        contadores = ContadoresReservasActivas()
+        asyncio.run(contadores.obtener(_db_con_conteos({1: 2, 2: 1}), [1, 2]))
+        contadores.invalidar(2)
+        db = _db_con_conteos({2: 3})
+        assert asyncio.run(contadores.obtener(db, [1, 2])) == {1: 2, 2: 3}
+        assert db.execute.await_count == 1
+
+
+class TestEstadoDerivado:
+    """Tests para el estado de ocupación derivado de las reservas"""
+
+    def test_estado_derivado(self, monkeypatch):
+        """Una habitación con reserva activa esa noche se muestra ocupada; el mantenimiento se respeta"""
+        calendario = CalendarioHabitaciones()
+        calendario.reconstruir(
+            [(1, "simple"), (2, "simple"), (3, "doble")],
+            [(1, date(2024, 5, 1), date(2024, 5, 3)), (3, date(2024, 5, 1), date(2024, 5, 3))],
+        )
+        monkeypatch.setattr(crud_habitacion, "calendario", calendario)
+        monkeypatch.setattr(crud_habitacion, "contadores_reservas", ContadoresReservasActivas())
+        habitaciones = [
+            SimpleNamespace(id=1, numero="101", tipo="simple", precio_noche=50, estado="disponible"),
+            SimpleNamespace(id=2, numero="102", tipo="simple", precio_noche=50, estado="disponible"),
+            SimpleNamespace(id=3, numero="201", tipo="doble", precio_noche=80, estado="mantenimiento"),
+        ]
+        db = _db_con_conteos({1: 1, 3: 1})
+        resultado = asyncio.run(crud_habitacion._con_estado_derivado(db, habitaciones, date(2024, 5, 2)))
+        assert [h.estado for h in resultado] == ["ocupada", "disponible", "mantenimiento"]
+        assert [h.reservas_activas for h in resultado] == [1, 0, 1]
+
+        resultado = asyncio.run(crud_habitacion._con_estado_derivado(db, habitaciones, date(2024, 5, 3)))
+        assert resultado[0].estado == "disponible"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,167 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services.despachador import DespachadorReservas
+
+
+class TestDespachadorReservas:
+    """Tests para la cola serializada por habitación"""
+
+    def test_misma_habitacion_en_orden(self):
+        """Las operaciones sobre la misma habitación se ejecutan una a la vez y en orden"""
+        despachador = DespachadorReservas()
+        eventos = []
+
+        def operacion(n):
+            async def ejecutar():
+                eventos.append(("inicio", n))
+                await asyncio.sleep(0.01)
+                eventos.append(("fin", n))
+                return n
+            return ejecutar
+
+        async def escenario():
+            return await asyncio.gather(*(despachador.ejecutar(1, operacion(n)) for n in range(5)))
+
+        assert asyncio.run(escenario()) == [0, 1, 2, 3, 4]
+        assert eventos == [(e, n) for n in range(5) for e in ("inicio", "fin")]
+
+    def test_habitaciones_distintas_en_paralelo(self):
+        """Las operaciones de habitaciones distintas no se esperan entre sí"""
+        despachador = DespachadorReservas()
+        en_curso = 0
+        maximo = 0
+
+        async def operacion():
+            nonlocal en_curso, maximo
+            en_curso += 1
+            maximo = max(maximo, en_curso)
+            await asyncio.sleep(0.01)
+            en_curso -= 1
+
+        async def escenario():
+            await asyncio.gather(*(despachador.ejecutar(h, operacion) for h in range(4)))
+
+        asyncio.run(escenario())
+        assert maximo == 4
+
+    def test_error_no_detiene_la_cola(self):
+        """Un error se propaga a su solicitud y la cola sigue procesando"""
+        despachador = DespachadorReservas()
+
+        async def falla():
+            raise ValueError("fallo")
+
+        async def ok():
+            return "ok"
+
+        async def escenario():
+            return await asyncio.gather(
+                despachador.ejecutar(1, falla), despachador.ejecutar(1, ok), return_exceptions=True
+            )
+
+        error, resultado = asyncio.run(escenario())
+        assert isinstance(error, ValueError)
+        assert resultado == "ok"
+
+    def test_cancelacion_de_una_operacion_no_deja_la_cola_colgada(self):
+        """Una operación que lanza CancelledError cancela su solicitud y las siguientes se atienden igual"""
+        despachador = DespachadorReservas()
+
+        async def cancelada():
+            raise asyncio.CancelledError()
+
+        async def ok():
+            return "ok"
+
+        async def escenario():
+            primera = asyncio.ensure_future(despachador.ejecutar(1, cancelada))
+            segunda = asyncio.ensure_future(despachador.ejecutar(1, ok))
+            resultado = await asyncio.wait_for(segunda, 1)
+            await asyncio.gather(primera, return_exceptions=True)
+            return primera, resultado
+
+        primera, resultado = asyncio.run(escenario())
+        assert primera.cancelled()
+        assert resultado == "ok"
+
+    def test_consumidor_cancelado_cancela_las_pendientes(self):
+        """Si se cancela el consumidor, las operaciones encoladas se cancelan en lugar de quedar esperando"""
+        despachador = DespachadorReservas()
+
+        async def lenta():
+            await asyncio.sleep(10)
+
+        async def ok():
+            return "ok"
+
+        async def escenario():
+            primera = asyncio.ensure_future(despachador.ejecutar(1, lenta))
+            segunda = asyncio.ensure_future(despachador.ejecutar(1, ok))
+            await asyncio.sleep(0.01)
+            despachador._carriles[1].consumidor.cancel()
+            await asyncio.wait_for(asyncio.gather(primera, segunda, return_exceptions=True), 1)
+            return primera, segunda
+
+        primera, segunda = asyncio.run(escenario())
+        assert primera.cancelled() and segunda.cancelled()
+        assert despachador.estadisticas()[0][1].profundidad == 0
+
+    def test_estadisticas(self):
+        """Las métricas registran operaciones procesadas y la profundidad vuelve a cero"""
+        despachador = DespachadorReservas()
+
+        async def operacion():
+            await asyncio.sleep(0.005)
+
+        async def escenario():
+            await asyncio.gather(*(despachador.ejecutar(7, operacion) for _ in range(3)))
+            await despachador.ejecutar(8, operacion)
+
+        asyncio.run(escenario())
+        estadisticas = dict(despachador.estadisticas())
+        assert estadisticas[7].procesadas == 3
+        assert estadisticas[7].profundidad == 0
+        assert estadisticas[7].espera_maxima >= estadisticas[8].espera_maxima
+
+    def test_sin_habitacion_se_ejecuta_directo(self):
+        """Sin habitación conocida la operación no pasa por ninguna cola"""
+        despachador = DespachadorReservas()
+
+        async def operacion():
+            return 42
+
+        assert asyncio.run(despachador.ejecutar(None, operacion)) == 42
+        assert despachador.estadisticas() == []
+
+    def test_sesion_propia_sobrevive_a_la_desconexion(self):
+        """Si la solicitud se cancela a mitad de la operación, esta termina con su propia sesión abierta"""
+        despachador = DespachadorReservas()
+        eventos = []
+
+        @asynccontextmanager
+        async def fabrica_sesiones():
+            eventos.append("abrir")
+            yield "sesion"
+            eventos.append("cerrar")
+
+        async def operacion(db):
+            await asyncio.sleep(0.02)
+            eventos.append(("fin", db))
+
+        async def escenario():
+            solicitud = asyncio.ensure_future(despachador.ejecutar_con_sesion(1, fabrica_sesiones, operacion))
+            await asyncio.sleep(0.005)
+            solicitud.cancel()
+            await asyncio.sleep(0.05)
+            return solicitud
+
+        solicitud = asyncio.run(escenario())
+        assert solicitud.cancelled()
+        assert eventos == ["abrir", ("fin", "sesion"), "cerrar"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,75 @@
+from datetime import date
+
+from app.services.disponibilidad import matriz_disponibilidad, noches_cambiadas
+
+
+class TestMatrizDisponibilidad:
+    """Tests para la matriz de disponibilidad por tipo y noche"""
+
+    def test_resta_reservas_por_noche(self):
+        """Test para descontar cada reserva solo en sus noches"""
+        tipos, matriz = matriz_disponibilidad(
+            {"simple": 2, "doble": 1},
+            [
+                ("simple", date(2024, 1, 2), date(2024, 1, 4)),
+                ("simple", date(2024, 1, 3), date(2024, 1, 5)),
+                ("doble", date(2024, 1, 1), date(2024, 1, 2)),
+            ],
+            date(2024, 1, 1),
+            5,
+        )
+        assert tipos == ["doble", "simple"]
+        assert matriz.tolist() == [
+            [0, 1, 1, 1, 1],
+            [2, 1, 0, 1, 2],
+        ]
+
+    def test_recorta_reservas_fuera_de_ventana(self):
+        """Test para reservas que empiezan antes o terminan después de la ventana"""
+        _, matriz = matriz_disponibilidad(
+            {"simple": 1},
+            [
+                ("simple", date(2023, 12, 20), date(2024, 1, 2)),
+                ("simple", date(2024, 1, 3), date(2024, 2, 1)),
+                ("simple", date(2024, 3, 1), date(2024, 3, 2)),
+            ],
+            date(2024, 1, 1),
+            4,
+        )
+        assert matriz.tolist() == [[0, 1, 0, 0]]
+
+    def test_ignora_tipos_sin_habitaciones(self):
+        """Test para reservas de habitaciones bloqueadas (tipo sin habitaciones ofrecidas)"""
+        tipos, matriz = matriz_disponibilidad(
+            {"simple": 3},
+            [("suite", date(2024, 1, 1), date(2024, 1, 3))],
+            date(2024, 1, 1),
+            2,
+        )
+        assert tipos == ["simple"]
+        assert matriz.tolist() == [[3, 3]]
+
+
+class TestNochesCambiadas:
+    """Tests para las noches tocadas por el registro de cambios ARI"""
+
+    def test_une_cambios_por_tipo(self):
+        """Test para combinar varios cambios del mismo tipo y recortarlos a la ventana"""
+        mascaras = noches_cambiadas(
+            [
+                ("simple", date(2024, 1, 2), date(2024, 1, 3)),
+                ("simple", date(2023, 12, 1), date(2024, 1, 2)),
+                ("doble", date(2024, 1, 4), None),
+                ("suite", date(2024, 2, 1), date(2024, 2, 5)),
+            ],
+            date(2024, 1, 1),
+            5,
+        )
+        assert sorted(mascaras) == ["doble", "simple"]
+        assert mascaras["simple"].tolist() == [True, True, False, False, False]
+        assert mascaras["doble"].tolist() == [False, False, False, True, True]
+
+    def test_cambio_sin_limites(self):
+        """Test para un cambio que abarca todas las noches (habitación nueva o bloqueo)"""
+        mascaras = noches_cambiadas([("simple", None, None)], date(2024, 1, 1), 3)
+        assert mascaras["simple"].all()
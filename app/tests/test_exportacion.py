@@ -0,0 +1,161 @@
+import asyncio
+import io
+import json
+import os
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.crud import reportes as crud_reportes
+from app.services.exportacion import (
+    TAMANO_LOTE,
+    exportar_arrow,
+    exportar_csv,
+    exportar_json,
+    exportar_ndjson,
+    exportar_parquet
+)
+
+COLUMNAS = ("fecha", "tipo", "descripcion", "monto")
+FILA = (date(2024, 1, 15), "Ingreso", "Pago reserva habitación 101", Decimal("150.00"))
+
+# 5M filas tardan del orden de un minuto; por defecto se usa una muestra
+FILAS_TOPE_MEMORIA = 5_000_000 if os.getenv("RUN_SLOW_TESTS") == "1" else 200_000
+TOPE_MEMORIA_MB = 4
+
+
+async def _lotes(filas: int):
+    lote = [FILA] * TAMANO_LOTE
+    for _ in range(filas // TAMANO_LOTE):
+        # Cada lote es una lista nueva, como las particiones del cursor
+        yield list(lote)
+
+
+async def _consumir(partes) -> int:
+    total = 0
+    async for parte in partes:
+        total += len(parte)
+    return total
+
+
+def _pico_memoria_mb(corrutina) -> float:
+    # Pico de memoria reservada mientras corre la corrutina, no el del proceso
+    # (ru_maxrss nunca baja y lo pueden haber subido tests anteriores)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        asyncio.run(corrutina)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico / (1024 * 1024)
+
+
+class TestExportacion:
+    """Tests para la exportación en streaming de reportes"""
+
+    def test_csv_y_ndjson(self):
+        """Test para el formato de cada línea"""
+        async def lotes():
+            yield [FILA]
+
+        csv_texto = b"".join(asyncio.run(_reunir(exportar_csv(COLUMNAS, lotes())))).decode()
+        assert csv_texto == "fecha,tipo,descripcion,monto\n2024-01-15,Ingreso,Pago reserva habitación 101,150.00\n"
+
+        ndjson = b"".join(asyncio.run(_reunir(exportar_ndjson(COLUMNAS, lotes())))).decode()
+        assert json.loads(ndjson) == {
+            "fecha": "2024-01-15", "tipo": "Ingreso", "descripcion": "Pago reserva habitación 101", "monto": 150.0
+        }
+
+    def test_json_vacio_es_valido(self):
+        """Test para producir un JSON válido sin filas"""
+        async def lotes():
+            return
+            yield
+
+        texto = b"".join(asyncio.run(_reunir(exportar_json(COLUMNAS, lotes(), {"formato": "json"})))).decode()
+        assert json.loads(texto) == {"formato": "json", "datos": [], "total_registros": 0}
+
+    def test_encabezado_antes_de_la_consulta(self):
+        """Test para enviar el primer byte antes de que la consulta devuelva filas"""
+        consultada = asyncio.Event()
+
+        async def lotes():
+            consultada.set()
+            yield [FILA]
+
+        async def escenario():
+            partes = exportar_csv(COLUMNAS, lotes())
+            primera = await partes.__anext__()
+            return primera, consultada.is_set()
+
+        primera, consultada_antes = asyncio.run(escenario())
+        assert primera == b"fecha,tipo,descripcion,monto\n"
+        assert consultada_antes is False
+
+    @pytest.mark.parametrize("exportar", [exportar_csv, exportar_ndjson])
+    def test_memoria_constante(self, exportar):
+        """Test para que el pico de memoria no crezca con la cantidad de filas exportadas"""
+        totales = []
+
+        async def exportar_todo():
+            totales.append(await _consumir(exportar(COLUMNAS, _lotes(FILAS_TOPE_MEMORIA))))
+
+        pico = _pico_memoria_mb(exportar_todo())
+        assert totales[0] > FILAS_TOPE_MEMORIA * 40
+        assert pico < TOPE_MEMORIA_MB
+
+    def test_arrow_con_tipos_y_lotes(self):
+        """Test para exportar en Arrow IPC con columnas decimal y fecha, un RecordBatch por lote"""
+        pa = pytest.importorskip("pyarrow")
+
+        async def lotes():
+            yield [FILA, FILA]
+            yield [(date(2024, 1, 16), "Egreso", None, Decimal("45.50"))]
+
+        datos = b"".join(asyncio.run(_reunir(
+            exportar_arrow(COLUMNAS, crud_reportes.TIPOS_LIBRO_DIARIO, lotes())
+        )))
+        lector = pa.ipc.open_stream(datos)
+        tabla = lector.read_all()
+        assert tabla.schema.field("fecha").type == pa.date32()
+        assert tabla.schema.field("monto").type == pa.decimal128(10, 2)
+        assert tabla.column("monto").to_pylist() == [Decimal("150.00"), Decimal("150.00"), Decimal("45.50")]
+        assert tabla.column("descripcion").to_pylist()[2] is None
+        assert len(tabla.to_batches()) == 2
+
+    def test_parquet_comprimido(self):
+        """Test para exportar en Parquet comprimido, un row group por lote"""
+        pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        async def lotes():
+            yield [FILA] * 3
+            yield [FILA]
+
+        datos = b"".join(asyncio.run(_reunir(
+            exportar_parquet(COLUMNAS, crud_reportes.TIPOS_LIBRO_DIARIO, lotes())
+        )))
+        archivo = pq.ParquetFile(io.BytesIO(datos))
+        assert archivo.metadata.num_rows == 4
+        assert archivo.metadata.num_row_groups == 2
+        assert archivo.metadata.row_group(0).column(0).compression == "ZSTD"
+        assert archivo.read().column("fecha").to_pylist()[0] == date(2024, 1, 15)
+
+    def test_lectura_con_cursor_del_servidor(self, sesion_falsa):
+        """Test para leer el libro diario con stream y yield_per, por lotes"""
+        db = sesion_falsa([[FILA], [FILA, FILA]])
+        lotes = asyncio.run(_reunir(crud_reportes.iterar_libro_diario(db, tipo="Ingreso")))
+        assert [len(lote) for lote in lotes] == [1, 2]
+        assert db.opciones["yield_per"] == TAMANO_LOTE
+        assert db.sentencias[0].startswith(
+            "SELECT vistadellibro_diario.fecha, vistadellibro_diario.tipo, "
+            "vistadellibro_diario.descripcion, vistadellibro_diario.monto \nFROM"
+        )
+
+
+async def _reunir(partes):
+    return [parte async for parte in partes]
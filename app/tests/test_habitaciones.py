@@ -1,7 +1,12 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from datetime import date, timedelta
+from urllib.parse import unquote
+import numpy as np
 from app.main import app
+from app.crud import ari as crud_ari
 
 client = TestClient(app)
 
@@ -63,6 +68,88 @@ class TestHabitacionesEndpoints:
         assert response.status_code == 404
         assert response.json()["detail"] == "Habitación no encontrada"
 
+    @patch("app.crud.habitacion.obtener_habitaciones_disponibles")
+    def test_listar_habitaciones_disponibles(self, mock_disponibles, mock_habitacion):
+        """Test para buscar habitaciones libres en un rango de fechas"""
+        mock_disponibles.return_value = [mock_habitacion]
+        inicio = date.today() + timedelta(days=10)
+        response = client.get("/habitaciones/disponibles", params={
+            "fecha_inicio": str(inicio), "fecha_fin": str(inicio + timedelta(days=2)), "tipo": "simple"
+        })
+        assert response.status_code == 200
+        assert response.json()[0]["id"] == 1
+        mock_disponibles.assert_called_once()
+
+    def test_listar_habitaciones_disponibles_rango_invalido(self):
+        """Test para rango de fechas inválido en la búsqueda de disponibilidad"""
+        response = client.get("/habitaciones/disponibles?fecha_inicio=2024-01-12&fecha_fin=2024-01-10")
+        assert response.status_code == 400
+
+    def test_listar_habitaciones_disponibles_rango_excesivo(self):
+        """Test para rechazar búsquedas de más de un año o fuera del horizonte de reservas"""
+        for fecha_inicio, fecha_fin in (
+            (date.today(), date.today() + timedelta(days=400)),
+            (date(1, 1, 1), date(1, 1, 3)),
+        ):
+            response = client.get("/habitaciones/disponibles", params={
+                "fecha_inicio": str(fecha_inicio), "fecha_fin": str(fecha_fin)
+            })
+            assert response.status_code == 400
+
+    @patch("app.crud.habitacion.obtener_matriz_disponibilidad")
+    def test_matriz_disponibilidad_json(self, mock_matriz):
+        """Test para la matriz de disponibilidad por tipo y noche en JSON"""
+        mock_matriz.return_value = (7, ["doble", "simple"], np.array([[3, 2], [5, 5]], dtype=np.int32))
+        response = client.get("/habitaciones/disponibilidad/matriz?fecha_inicio=2024-01-10&dias=2")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["tipos"] == ["doble", "simple"]
+        assert data["disponibles"] == [[3, 2], [5, 5]]
+        assert data["fecha_inicio"] == "2024-01-10"
+        assert data["seq"] == 7
+
+    @patch("app.crud.habitacion.obtener_matriz_disponibilidad")
+    def test_matriz_disponibilidad_binario(self, mock_matriz):
+        """Test para la matriz de disponibilidad como arreglo binario"""
+        mock_matriz.return_value = (7, ["doble", "suite única"], np.array([[3, 2], [5, 5]], dtype=np.int32))
+        response = client.get("/habitaciones/disponibilidad/matriz?fecha_inicio=2024-01-10&dias=2&formato=binario")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert response.headers["x-matriz-forma"] == "2,2"
+        assert response.headers["x-matriz-seq"] == "7"
+        tipos = [unquote(t) for t in response.headers["x-matriz-tipos"].split(",")]
+        assert tipos == ["doble", "suite única"]
+        matriz = np.frombuffer(response.content, dtype="<i4").reshape(2, 2)
+        assert matriz.tolist() == [[3, 2], [5, 5]]
+
+    def test_matriz_disponibilidad_formato_invalido(self):
+        """Test para un formato de matriz desconocido"""
+        response = client.get("/habitaciones/disponibilidad/matriz?formato=xml")
+        assert response.status_code == 422
+
+    @patch("app.crud.ari.obtener_cambios")
+    def test_cambios_disponibilidad(self, mock_cambios):
+        """Test para el feed de cambios de disponibilidad desde un seq"""
+        mock_cambios.return_value = {
+            "desde_seq": 7,
+            "hasta_seq": 9,
+            "hay_mas": False,
+            "celdas": [{"tipo": "simple", "fecha": "2024-01-10", "disponibles": 4, "precio_noche": 50.0}]
+        }
+        response = client.get("/habitaciones/disponibilidad/cambios?desde_seq=7&fecha_inicio=2024-01-01")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["hasta_seq"] == 9
+        assert data["celdas"][0]["disponibles"] == 4
+        args = mock_cambios.call_args.args
+        assert args[1] == 7
+        assert str(args[2]) == "2024-01-01"
+
+    def test_cambios_disponibilidad_sin_seq(self):
+        """Test para el feed de cambios sin seq de partida"""
+        response = client.get("/habitaciones/disponibilidad/cambios")
+        assert response.status_code == 422
+
     @patch("app.crud.habitacion.actualizar_estado_habitacion")
     def test_actualizar_estado_habitacion(self, mock_actualizar_estado, mock_habitacion):
         """Test para actualizar el estado de una habitación"""
@@ -82,5 +169,27 @@ class TestHabitacionesEndpoints:
         assert response.json()["detail"] == "Habitación no encontrada"
 
 
+class TestRegistroARI:
+    """Tests para el orden de las escrituras en el registro de cambios ARI"""
+
+    def test_bloqueo_antes_de_insertar(self):
+        """Cada escritura toma el bloqueo del registro antes del INSERT, para confirmar en orden de seq"""
+        for registrar in (
+            lambda db: crud_ari.registrar_cambio_habitacion(db, 1, "reserva_creada"),
+            lambda db: crud_ari.registrar_cambios_reservas(db, [1, 2], "reserva_cancelada"),
+        ):
+            db = AsyncMock()
+            asyncio.run(registrar(db))
+            sentencias = [str(c.args[0]) for c in db.execute.call_args_list]
+            assert "pg_advisory_xact_lock" in sentencias[0]
+            assert sentencias[1].startswith("INSERT INTO cambios_ari")
+
+        db = MagicMock()
+        db.execute = AsyncMock()
+        asyncio.run(crud_ari.registrar_cambio(db, "simple", "habitacion_creada"))
+        assert "pg_advisory_xact_lock" in str(db.execute.call_args.args[0])
+        db.add.assert_called_once()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,51 @@
+import pytest
+from datetime import date
+
+from app.services.indice_reservas import IndiceReservas
+
+
+class TestIndiceReservas:
+    """Tests para el índice en memoria de reservas activas"""
+
+    @pytest.fixture
+    def indice(self):
+        indice = IndiceReservas()
+        indice.reconstruir([
+            (1, 1, date(2024, 1, 10), date(2024, 1, 12)),
+            (2, 1, date(2024, 1, 15), date(2024, 1, 20)),
+            (3, 2, date(2024, 1, 10), date(2024, 1, 12)),
+        ])
+        return indice
+
+    @pytest.mark.parametrize("inicio, fin, esperado", [
+        (date(2024, 1, 8), date(2024, 1, 10), False),   # termina cuando empieza otra
+        (date(2024, 1, 12), date(2024, 1, 15), False),  # hueco exacto entre reservas
+        (date(2024, 1, 9), date(2024, 1, 11), True),    # solapa el inicio
+        (date(2024, 1, 11), date(2024, 1, 13), True),   # solapa el fin
+        (date(2024, 1, 16), date(2024, 1, 17), True),   # contenida en otra
+        (date(2024, 1, 5), date(2024, 1, 25), True),    # contiene a otras
+    ])
+    def test_hay_conflicto(self, indice, inicio, fin, esperado):
+        """Test de detección de solapamientos en la misma habitación"""
+        assert indice.hay_conflicto(1, inicio, fin) is esperado
+
+    def test_habitacion_sin_reservas(self, indice):
+        """Test para una habitación sin reservas activas"""
+        assert not indice.hay_conflicto(99, date(2024, 1, 10), date(2024, 1, 12))
+
+    def test_apartar_y_liberar(self, indice):
+        """Test para apartar un rango, rechazar el duplicado y liberarlo"""
+        assert indice.apartar(2, date(2024, 1, 12), date(2024, 1, 14))
+        assert not indice.apartar(2, date(2024, 1, 13), date(2024, 1, 14))
+        indice.liberar(2, date(2024, 1, 12), date(2024, 1, 14))
+        assert not indice.hay_conflicto(2, date(2024, 1, 13), date(2024, 1, 14))
+
+    def test_quitar_reserva_cancelada(self, indice):
+        """Test para quitar del índice una reserva cancelada"""
+        indice.quitar(2)
+        assert not indice.hay_conflicto(1, date(2024, 1, 16), date(2024, 1, 17))
+        assert indice.hay_conflicto(1, date(2024, 1, 11), date(2024, 1, 13))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,53 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.services.kpis import ReservasKPI, calcular_kpis
+
+
+class TestCalculoKPIs:
+    """Tests para el cálculo vectorizado de KPIs en memoria"""
+
+    @pytest.fixture
+    def reservas(self):
+        # (fecha_inicio, fecha_fin, anticipacion, importe)
+        return ReservasKPI.desde_filas([
+            (date(2024, 1, 30), date(2024, 2, 2), 0, Decimal("300.00")),    # 3 noches, 1 en febrero
+            (date(2024, 2, 10), date(2024, 2, 14), 10, Decimal("400.00")),  # 4 noches
+            (date(2024, 2, 27), date(2024, 3, 3), 45, Decimal("500.00")),   # 5 noches, 3 en febrero
+            (date(2024, 3, 10), date(2024, 3, 12), 200, Decimal("200.00")), # fuera de febrero
+        ])
+
+    def test_kpis_del_mes(self, reservas):
+        """Test para prorratear importes y noches al período"""
+        kpis = calcular_kpis(reservas, 2, date(2024, 2, 1), date(2024, 2, 29))
+        assert kpis["noches_disponibles"] == 58
+        assert kpis["noches_vendidas"] == 1 + 4 + 3
+        assert kpis["ingresos_habitaciones"] == Decimal("800.00")
+
+    def test_llegadas_y_anticipacion(self, reservas):
+        """Test para medir estadía y anticipación solo sobre las llegadas del período"""
+        kpis = calcular_kpis(reservas, 2, date(2024, 2, 1), date(2024, 2, 29))
+        assert kpis["llegadas"] == 2
+        assert kpis["estadia_promedio"] == pytest.approx(4.5)
+        # Tramos: 0, 1-7, 8-14, 15-30, 31-60, 61-90, 91-180, 181+
+        assert kpis["anticipacion"] == [0, 0, 1, 0, 1, 0, 0, 0]
+
+    def test_periodo_sin_reservas(self, reservas):
+        """Test para un período sin noches vendidas"""
+        kpis = calcular_kpis(reservas, 2, date(2025, 1, 1), date(2025, 1, 31))
+        assert kpis["noches_vendidas"] == 0
+        assert kpis["llegadas"] == 0
+        assert kpis["estadia_promedio"] == 0.0
+        assert kpis["ingresos_habitaciones"] == Decimal(0)
+
+    def test_importes_en_decimal(self):
+        """Test para prorratear en Decimal como la consulta SQL (en float 0.575 se redondea a 0.57)"""
+        reservas = ReservasKPI.desde_filas([(date(2024, 2, 29), date(2024, 3, 2), 0, Decimal("1.15"))])
+        kpis = calcular_kpis(reservas, 1, date(2024, 2, 1), date(2024, 2, 29))
+        assert kpis["ingresos_habitaciones"] == Decimal("0.575")
+
+        reservas = ReservasKPI.desde_filas([(date(2024, 2, 1), date(2024, 2, 2), 0, Decimal("0.10"))] * 10)
+        kpis = calcular_kpis(reservas, 1, date(2024, 2, 1), date(2024, 2, 29))
+        assert kpis["ingresos_habitaciones"] == Decimal("1.00")
@@ -0,0 +1,250 @@
+import asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.main import app
+from app.crud import egreso as crud_egreso
+from app.crud import ingreso as crud_ingreso
+from app.crud import periodos as crud_periodos
+from app.crud import reportes as crud_reportes
+from app.crud import reserva as crud_reserva
+from app.crud import transiciones as crud_transiciones
+from app.models.periodo_cerrado import InstantaneaReporte
+from app.schemas.egreso import EgresoCreate
+from app.schemas.ingreso import IngresoCreate
+from app.schemas.reserva import ReservaCreate
+from app.services.periodos import (
+    CHECK_VIOLATION,
+    INSTANTANEA_LIBRO_DIARIO,
+    INSTANTANEA_OCUPACION_DIARIA,
+    INSTANTANEA_RESUMEN_DIARIO,
+    comprimir,
+    descomprimir,
+    periodos_cerrados,
+)
+
+client = TestClient(app)
+
+ENERO = (1, date(2024, 1, 1), date(2024, 1, 31))
+FEBRERO = (2, date(2024, 2, 1), date(2024, 2, 29))
+
+LIBRO_ENERO = [
+    (date(2024, 1, 5), "Egreso", "Compra", Decimal("20.00"), 7),
+    (date(2024, 1, 5), "Ingreso", "Pago 1", Decimal("100.00"), 3),
+    (date(2024, 1, 20), "Ingreso", "Pago 2", Decimal("80.50"), 4),
+]
+
+
+def _instantanea(periodo_id, filas):
+    return [(periodo_id, comprimir(filas))]
+
+
+class TestInstantaneas:
+    def test_compresion_conserva_tipos(self):
+        filas = LIBRO_ENERO + [(date(2024, 1, 21), "Ingreso", None, Decimal("0.10"), 5)]
+        assert descomprimir(INSTANTANEA_LIBRO_DIARIO, comprimir(filas)) == filas
+
+    def test_dividir_en_tramos(self):
+        periodos_cerrados.reconstruir([ENERO, FEBRERO])
+        assert periodos_cerrados.dividir(date(2023, 12, 15), date(2024, 3, 10)) == [
+            (date(2023, 12, 15), date(2023, 12, 31), False),
+            (date(2024, 1, 1), date(2024, 2, 29), True),
+            (date(2024, 3, 1), date(2024, 3, 10), False),
+        ]
+        assert periodos_cerrados.dividir(date(2024, 1, 10), date(2024, 2, 5)) == [
+            (date(2024, 1, 10), date(2024, 2, 5), True)
+        ]
+        assert periodos_cerrados.dividir(date(2024, 5, 1), None) == [(date(2024, 5, 1), None, False)]
+
+
+class TestReportesDesdeInstantaneas:
+    def test_libro_diario_combina_instantanea_y_tramo_abierto(self, sesion_falsa):
+        """Test para leer el tramo abierto en vivo (con LIMIT) y completar desde la instantánea"""
+        periodos_cerrados.reconstruir([ENERO])
+        en_vivo = [(date(2024, 2, 3), "Ingreso", "Pago 3", Decimal("60.00"))]
+        db = sesion_falsa(en_vivo, _instantanea(1, LIBRO_ENERO))
+        movimientos = asyncio.run(crud_reportes.obtener_libro_diario(db, fecha_inicio=date(2024, 1, 1), limite=3))
+
+        assert "vistadellibro_diario.fecha >= '2024-02-01'" in db.sentencias[0]
+        assert "LIMIT 3" in db.sentencias[0]
+        assert "FROM instantaneas_reportes" in db.sentencias[1]
+        assert [m.descripcion for m in movimientos] == ["Pago 3", "Pago 2", "Compra"]
+
+    def test_periodo_cerrado_sin_consultar_la_vista(self, sesion_falsa):
+        """Test para servir un rango cerrado solo desde la instantánea, que queda en memoria"""
+        periodos_cerrados.reconstruir([ENERO])
+        db = sesion_falsa(_instantanea(1, LIBRO_ENERO))
+        rango = dict(fecha_inicio=date(2024, 1, 1), fecha_fin=date(2024, 1, 31), orden="asc")
+        movimientos = asyncio.run(crud_reportes.obtener_libro_diario(db, tipo="Ingreso", **rango))
+        assert [m.monto for m in movimientos] == [Decimal("100.00"), Decimal("80.50")]
+
+        asyncio.run(crud_reportes.obtener_libro_diario(db, desplazamiento=1, **rango))
+        assert len(db.sentencias) == 1
+        assert "vistadellibro_diario" not in db.sentencias[0]
+
+    def test_resumen_financiero_suma_instantanea_y_tramo_abierto(self, sesion_falsa):
+        periodos_cerrados.reconstruir([ENERO])
+        resumen_enero = [
+            (date(2024, 1, 5), Decimal("100.00"), Decimal("20.00"), 1, 1),
+            (date(2024, 1, 20), Decimal("80.50"), Decimal("0"), 1, 0),
+        ]
+        db = sesion_falsa(_instantanea(1, resumen_enero), [(Decimal("60.00"), Decimal("10.00"))])
+        resumen = asyncio.run(crud_reportes.obtener_resumen_financiero(
+            db, fecha_inicio=date(2024, 1, 10), fecha_fin=date(2024, 2, 15)
+        ))
+
+        assert "resumen_diario.fecha >= '2024-02-01'" in db.sentencias[1]
+        assert resumen.total_ingresos == Decimal("140.50")
+        assert resumen.total_egresos == Decimal("10.00")
+        assert resumen.periodo == "2024-01-10 - 2024-02-15"
+
+    def test_ocupacion_diaria_usa_el_total_al_cerrar(self, sesion_falsa):
+        periodos_cerrados.reconstruir([ENERO])
+        ocupacion_enero = [(date(2024, 1, 31), 5, 10)]
+        db = sesion_falsa(_instantanea(1, ocupacion_enero), [(20,)], [(date(2024, 2, 1), 5)])
+        serie = asyncio.run(crud_reportes.obtener_ocupacion_diaria(db, date(2024, 1, 31), date(2024, 2, 1)))
+
+        assert [(d.habitaciones_ocupadas, d.porcentaje_ocupacion) for d in serie] == [(5, 50.0), (5, 25.0)]
+
+
+class TestCierrePeriodo:
+    def test_cerrar_guarda_instantaneas_y_registra(self, sesion_falsa):
+        libro = [(date(2024, 1, 5), "Ingreso", "Pago", Decimal("100.00"), 3)]
+        resumen = [(date(2024, 1, 5), Decimal("100.00"), Decimal("0"), 1, 0)]
+        db = sesion_falsa([], [], [], libro, resumen, [(4,)], [(date(2024, 1, 2), 1)])
+        periodo = asyncio.run(crud_periodos.cerrar_periodo(db, 2024, 1))
+
+        assert db.sentencias[0] == "LOCK TABLE periodos_cerrados IN SHARE ROW EXCLUSIVE MODE"
+        assert "max(periodos_cerrados.fecha_fin)" in db.sentencias[1]
+        assert db.sentencias[2] == "LOCK TABLE ingresos, egresos, resumen_diario, noches_ocupadas IN SHARE MODE"
+        assert (periodo.fecha_inicio, periodo.fecha_fin) == (date(2024, 1, 1), date(2024, 1, 31))
+        instantaneas = {i.reporte: i for i in db.agregados if isinstance(i, InstantaneaReporte)}
+        assert descomprimir(INSTANTANEA_LIBRO_DIARIO, instantaneas[INSTANTANEA_LIBRO_DIARIO].contenido) == libro
+        assert instantaneas[INSTANTANEA_RESUMEN_DIARIO].filas == 1
+        ocupacion = descomprimir(INSTANTANEA_OCUPACION_DIARIA, instantaneas[INSTANTANEA_OCUPACION_DIARIA].contenido)
+        assert len(ocupacion) == 31 and ocupacion[1] == (date(2024, 1, 2), 1, 4)
+        assert periodos_cerrados.ultimo_cierre == date(2024, 1, 31)
+
+    def test_cierres_en_orden_y_solo_meses_terminados(self, sesion_falsa):
+        """Test para verificar el orden con el último cierre de la base, no el de memoria"""
+        hoy = date.today()
+        casos = [((2024, 1), 409), ((2024, 3), 400), ((hoy.year, hoy.month), 400)]
+        for (anio, mes), codigo in casos:
+            with pytest.raises(HTTPException) as error:
+                asyncio.run(crud_periodos.cerrar_periodo(sesion_falsa([], [(date(2024, 1, 31),)]), anio, mes))
+            assert error.value.status_code == codigo
+
+    def test_cierre_concurrente_del_mismo_mes(self, sesion_falsa):
+        """Test para responder 409 (no 500) si la restricción única rechaza el cierre"""
+        rechazo = IntegrityError("INSERT INTO periodos_cerrados", {}, Exception("duplicado"))
+        rechazo.orig.sqlstate = crud_periodos.UNIQUE_VIOLATION
+        db = sesion_falsa()
+        db.flush = AsyncMock(side_effect=rechazo)
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(crud_periodos.cerrar_periodo(db, 2024, 1))
+        assert error.value.status_code == 409
+        assert not periodos_cerrados.esta_cerrada(date(2024, 1, 15))
+
+    def test_cierres_en_curso(self):
+        periodos_cerrados.iniciar_cierre(*ENERO[1:])
+        periodos_cerrados.iniciar_cierre(*FEBRERO[1:])
+        periodos_cerrados.terminar_cierre(*ENERO[1:])
+        assert not periodos_cerrados.esta_cerrada(date(2024, 1, 15))
+        assert periodos_cerrados.esta_cerrada(date(2024, 2, 15))
+        periodos_cerrados.terminar_cierre(*FEBRERO[1:])
+        assert not periodos_cerrados.esta_cerrada(date(2024, 2, 15))
+
+    def test_ingreso_en_periodo_cerrado_rechazado(self):
+        # Los ingresos se fechan hoy: se simula un cierre que incluye el día actual
+        periodos_cerrados.reconstruir([(1, date.today(), date.today())])
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        ingreso = IngresoCreate(reserva_id=1, monto=50, descripcion="Tarde")
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(crud_ingreso.crear_ingreso(db, ingreso))
+        assert error.value.status_code == 400
+        db.commit.assert_not_called()
+
+    def test_trigger_de_la_base_rechaza_el_egreso(self):
+        """Test para traducir a 400 el rechazo del trigger cuando el cierre no se conocía en memoria"""
+        rechazo = IntegrityError("INSERT INTO egresos", {}, Exception("período cerrado"))
+        rechazo.orig.sqlstate = CHECK_VIOLATION
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock(side_effect=rechazo)
+        db.rollback = AsyncMock()
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(crud_egreso.crear_egreso(db, EgresoCreate(descripcion="Compra", monto=20)))
+        assert error.value.status_code == 400
+        assert "está cerrado" in error.value.detail
+        db.rollback.assert_awaited_once()
+
+
+class TestReservasEnPeriodosCerrados:
+    """Tests para no cambiar la ocupación de un período cerrado"""
+
+    def test_noches_de_la_estadia(self):
+        """Test para revisar solo las noches: salir el primer día del período cerrado se admite"""
+        periodos_cerrados.reconstruir([ENERO])
+        periodos_cerrados.verificar_estadia_abierta(date(2023, 12, 28), date(2024, 1, 1))
+        periodos_cerrados.verificar_estadia_abierta(date(2024, 2, 1), date(2024, 2, 3))
+        with pytest.raises(HTTPException) as error:
+            periodos_cerrados.verificar_estadia_abierta(date(2023, 12, 30), date(2024, 1, 2))
+        assert error.value.status_code == 400
+        assert "2024-01" in error.value.detail
+
+    def test_crear_reserva_con_noches_cerradas(self, sesion_falsa):
+        """Test para rechazar la reserva antes de apartar el rango en el índice"""
+        hoy = date.today()
+        periodos_cerrados.reconstruir([(1, hoy - timedelta(days=40), hoy - timedelta(days=10))])
+        reserva = ReservaCreate(
+            cliente_id=1, habitacion_id=1, fecha_inicio=hoy - timedelta(days=12), fecha_fin=hoy - timedelta(days=8)
+        )
+        db = sesion_falsa()
+        with patch("app.crud.reserva.indice_reservas") as indice:
+            with pytest.raises(HTTPException) as error:
+                asyncio.run(crud_reserva.crear_reserva(db, reserva))
+        assert error.value.status_code == 400
+        indice.apartar.assert_not_called()
+        assert db.sentencias == []
+
+    def test_cancelacion_excluye_reservas_con_noches_cerradas(self, sesion_falsa):
+        """Test para dejar rechazadas (sin borrar noches) las reservas con noches en períodos cerrados"""
+        db = sesion_falsa()
+        asyncio.run(crud_transiciones.transicionar_reservas(db, [5], "cancelada"))
+        asyncio.run(crud_transiciones.transicionar_reservas(db, [5], "completada"))
+
+        cancelacion, check_out = db.sentencias[1], db.sentencias[4]
+        assert "NOT (EXISTS (SELECT" in cancelacion and "FROM periodos_cerrados" in cancelacion
+        assert "periodos_cerrados.fecha_inicio < reservas.fecha_fin" in cancelacion
+        assert "periodos_cerrados" not in check_out
+
+    def test_cancelar_reserva_de_periodo_cerrado(self, sesion_falsa):
+        """Test para explicar el rechazo cuando la reserva está en un estado cancelable"""
+        db = sesion_falsa([], [], [("reservada",)])
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(crud_reserva.cancelar_reserva(db, 5))
+        assert error.value.status_code == 400
+        assert "período contable cerrado" in error.value.detail
+
+
+class TestPeriodosEndpoints:
+    @patch("app.crud.periodos.cerrar_periodo")
+    def test_cerrar_periodo(self, mock_cerrar):
+        mock_cerrar.return_value = {
+            "id": 1, "anio": 2024, "mes": 1, "fecha_inicio": "2024-01-01",
+            "fecha_fin": "2024-01-31", "cerrado_en": "2024-02-01T08:00:00",
+        }
+        response = client.post("/periodos/2024/1/cierre")
+        assert response.status_code == 201
+        assert response.json()["fecha_fin"] == "2024-01-31"
+
+    def test_mes_invalido(self):
+        assert client.post("/periodos/2024/13/cierre").status_code == 422
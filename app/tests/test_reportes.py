@@ -1,6 +1,8 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from datetime import date, datetime, timedelta
+from decimal import Decimal
 from unittest.mock import AsyncMock, patch
 import json
 
@@ -91,6 +93,8 @@ class TestReportesRoutes:
             "total_reservas": 25,
             "habitaciones_ocupadas": 15,
             "habitaciones_disponibles": 5,
+            "noches_ocupadas": 465,
+            "noches_disponibles": 620,
             "porcentaje_ocupacion": 75.0,
             "periodo": "2024-01-01 - 2024-01-31"
         }
@@ -113,6 +117,16 @@ class TestLibroDiarioEndpoint(TestReportesRoutes):
         assert data[1]["tipo"] == "Egreso"
         mock_crud.assert_called_once()
     
+    @patch('app.crud.reportes.obtener_libro_diario')
+    def test_obtener_libro_diario_indica_desfase(self, mock_crud, libro_diario_mock_data):
+        """Test para la cabecera de desfase de la vista materializada"""
+        mock_crud.return_value = libro_diario_mock_data
+        
+        response = client.get("/reportes/libro-diario")
+        
+        assert response.status_code == 200
+        assert float(response.headers["X-Reporte-Desfase"]) >= 0
+    
     @patch('app.crud.reportes.obtener_libro_diario')
     def test_obtener_libro_diario_con_filtros_fecha(self, mock_crud, libro_diario_mock_data):
         """Test para obtener libro diario con filtros de fecha"""
@@ -141,6 +155,24 @@ class TestLibroDiarioEndpoint(TestReportesRoutes):
         data = response.json()
         assert len(data) == 1
         assert data[0]["tipo"] == "Ingreso"
+    
+    @patch('app.crud.reportes.obtener_libro_diario')
+    def test_obtener_libro_diario_paginado(self, mock_crud, libro_diario_mock_data):
+        """Test para pasar limite, desplazamiento y orden al CRUD"""
+        mock_crud.return_value = libro_diario_mock_data
+        
+        params = {"limite": 50, "desplazamiento": 100, "orden": "asc"}
+        response = client.get("/reportes/libro-diario", params=params)
+        
+        assert response.status_code == 200
+        kwargs = mock_crud.call_args.kwargs
+        assert (kwargs["limite"], kwargs["desplazamiento"], kwargs["orden"]) == (50, 100, "asc")
+    
+    def test_obtener_libro_diario_orden_invalido(self):
+        """Test para rechazar un orden distinto de asc/desc"""
+        response = client.get("/reportes/libro-diario", params={"orden": "fecha"})
+        
+        assert response.status_code == 422
 
 
 class TestRegistroHuespedesEndpoint(TestReportesRoutes):
@@ -245,6 +277,20 @@ class TestResumenFinancieroEndpoint(TestReportesRoutes):
         assert data["total_egresos"] == 450.00
         assert data["saldo"] == 1050.00
     
+    @patch('app.crud.reportes.obtener_resumen_financiero')
+    def test_resumen_financiero_decimales_como_numeros(self, mock_crud):
+        """Test para serializar los importes Decimal como números JSON"""
+        mock_crud.return_value = ResumenFinanciero(
+            total_ingresos=Decimal("1500.10"), total_egresos=Decimal("450.05"),
+            saldo=Decimal("1050.05"), periodo="Todo el tiempo"
+        )
+        
+        response = client.get("/reportes/resumen-financiero")
+        
+        assert response.status_code == 200
+        assert '"total_ingresos":1500.1' in response.text
+        assert response.json()["saldo"] == 1050.05
+    
     @patch('app.crud.reportes.obtener_resumen_financiero')
     def test_obtener_resumen_financiero_con_fechas(self, mock_crud, resumen_financiero_mock_data):
         """Test para obtener resumen financiero con filtro de fechas"""
@@ -296,16 +342,148 @@ class TestEstadisticasOcupacionEndpoint(TestReportesRoutes):
         assert data["porcentaje_ocupacion"] <= 100
 
 
+class TestOcupacionDiariaEndpoint(TestReportesRoutes):
+    """Tests para el endpoint de ocupación diaria"""
+    
+    @patch('app.crud.reportes.obtener_ocupacion_diaria')
+    def test_obtener_ocupacion_diaria(self, mock_crud):
+        """Test para obtener la serie diaria de ocupación"""
+        mock_crud.return_value = [
+            {"fecha": "2024-01-01", "habitaciones_ocupadas": 15, "porcentaje_ocupacion": 75.0},
+            {"fecha": "2024-01-02", "habitaciones_ocupadas": 0, "porcentaje_ocupacion": 0.0}
+        ]
+        
+        params = {"fecha_inicio": "2024-01-01", "fecha_fin": "2024-01-02"}
+        response = client.get("/reportes/ocupacion-diaria", params=params)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 2
+        assert data[0]["habitaciones_ocupadas"] == 15
+        assert data[1]["porcentaje_ocupacion"] == 0.0
+    
+    def test_ocupacion_diaria_fechas_invertidas(self):
+        """Test para un período con la fecha de inicio posterior a la de fin"""
+        params = {"fecha_inicio": "2024-02-01", "fecha_fin": "2024-01-01"}
+        response = client.get("/reportes/ocupacion-diaria", params=params)
+        
+        assert response.status_code == 400
+    
+    def test_ocupacion_diaria_sin_fechas(self):
+        """Test para la serie diaria sin fechas obligatorias"""
+        response = client.get("/reportes/ocupacion-diaria")
+        
+        assert response.status_code == 422
+
+
+class TestSeriesEndpoint(TestReportesRoutes):
+    """Tests para el endpoint de series de ingresos y egresos"""
+    
+    @patch('app.crud.reportes.obtener_serie_movimientos')
+    def test_obtener_series_mensual(self, mock_crud):
+        """Test para obtener la serie mensual de movimientos"""
+        mock_crud.return_value = [
+            {"periodo": "2024-01-01", "ingresos": 1500.0, "egresos": 450.0, "saldo": 1050.0, "cantidad": 12},
+            {"periodo": "2024-02-01", "ingresos": 0, "egresos": 0, "saldo": 0, "cantidad": 0}
+        ]
+        
+        params = {"granularidad": "mes", "fecha_inicio": "2024-01-01", "fecha_fin": "2024-02-29"}
+        response = client.get("/reportes/series", params=params)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 2
+        assert data[0]["saldo"] == 1050.0
+        assert data[1]["cantidad"] == 0
+        assert mock_crud.call_args.args[1] == "mes"
+    
+    def test_series_granularidad_invalida(self):
+        """Test para una granularidad desconocida"""
+        params = {"granularidad": "hora", "fecha_inicio": "2024-01-01", "fecha_fin": "2024-01-31"}
+        response = client.get("/reportes/series", params=params)
+        
+        assert response.status_code == 422
+    
+    def test_series_fechas_invertidas(self):
+        """Test para un período con la fecha de inicio posterior a la de fin"""
+        params = {"granularidad": "dia", "fecha_inicio": "2024-02-01", "fecha_fin": "2024-01-01"}
+        response = client.get("/reportes/series", params=params)
+        
+        assert response.status_code == 400
+
+
+class TestKPIsEndpoint(TestReportesRoutes):
+    """Tests para los endpoints de KPIs del hotel"""
+    
+    @pytest.fixture
+    def kpis_mock_data(self):
+        """Datos mock de KPIs de un período"""
+        return {
+            "periodo": "2024-01-01 - 2024-01-31",
+            "tipo_habitacion": None,
+            "habitaciones": 20,
+            "noches_disponibles": 620,
+            "noches_vendidas": 465,
+            "ocupacion": 75.0,
+            "ingresos_habitaciones": 23250.00,
+            "adr": 50.00,
+            "revpar": 37.50,
+            "llegadas": 120,
+            "estadia_promedio": 3.88,
+            "anticipacion": [{"tramo": "0", "reservas": 10}, {"tramo": "1-7", "reservas": 110}]
+        }
+    
+    @patch('app.crud.kpis.obtener_kpis')
+    def test_obtener_kpis(self, mock_crud, kpis_mock_data):
+        """Test para obtener ADR, RevPAR y ocupación de un período"""
+        mock_crud.return_value = kpis_mock_data
+        
+        params = {"fecha_inicio": "2024-01-01", "fecha_fin": "2024-01-31", "tipo_habitacion": "doble"}
+        response = client.get("/reportes/kpis", params=params)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["adr"] == 50.0
+        assert data["revpar"] == 37.5
+        assert data["anticipacion"][1]["tramo"] == "1-7"
+        assert mock_crud.call_args.args[3] == "doble"
+    
+    @patch('app.crud.kpis.obtener_kpis_mensuales')
+    def test_obtener_kpis_mensuales(self, mock_crud, kpis_mock_data):
+        """Test para obtener el informe mensual de KPIs"""
+        mock_crud.return_value = [kpis_mock_data] * 12
+        
+        response = client.get("/reportes/kpis/mensual", params={"anio": 2024})
+        
+        assert response.status_code == 200
+        assert len(response.json()) == 12
+    
+    def test_kpis_fechas_invertidas(self):
+        """Test para un período con la fecha de inicio posterior a la de fin"""
+        params = {"fecha_inicio": "2024-02-01", "fecha_fin": "2024-01-01"}
+        response = client.get("/reportes/kpis", params=params)
+        
+        assert response.status_code == 400
+
+
 class TestExportacionEndpoint(TestReportesRoutes):
     """Tests para el endpoint de exportación"""
     
-    @patch('app.crud.reportes.obtener_libro_diario')
-    def test_exportar_libro_diario_json(self, mock_crud, libro_diario_mock_data):
+    @pytest.fixture
+    def lotes_libro_diario(self, libro_diario_mock_data):
+        """Reemplazo de la lectura por lotes: un lote por fila del mock"""
+        def iterar(db, **filtros):
+            async def lotes():
+                for fila in libro_diario_mock_data:
+                    yield [tuple(fila.values())]
+            return lotes()
+        return iterar
+    
+    def test_exportar_libro_diario_json(self, lotes_libro_diario):
         """Test para exportar libro diario en formato JSON"""
-        mock_crud.return_value = libro_diario_mock_data
-        
-        params = {"formato": "json"}
-        response = client.get("/reportes/libro-diario/exportar", params=params)
+        with patch('app.crud.reportes.iterar_libro_diario', lotes_libro_diario):
+            params = {"formato": "json"}
+            response = client.get("/reportes/libro-diario/exportar", params=params)
         
         assert response.status_code == 200
         data = response.json()
@@ -313,19 +491,78 @@ class TestExportacionEndpoint(TestReportesRoutes):
         assert data["total_registros"] == 2
         assert "datos" in data
         assert len(data["datos"]) == 2
+        assert data["datos"][1] == {
+            "fecha": "2024-01-15", "tipo": "Egreso", "descripcion": "Compra suministros limpieza", "monto": 45.5
+        }
     
-    @patch('app.crud.reportes.obtener_libro_diario')
-    def test_exportar_libro_diario_csv(self, mock_crud, libro_diario_mock_data):
-        """Test para exportar libro diario en formato CSV (no implementado)"""
-        mock_crud.return_value = libro_diario_mock_data
+    def test_exportar_libro_diario_csv(self, lotes_libro_diario):
+        """Test para exportar libro diario en formato CSV"""
+        with patch('app.crud.reportes.iterar_libro_diario', lotes_libro_diario):
+            params = {"formato": "csv"}
+            response = client.get("/reportes/libro-diario/exportar", params=params)
         
-        params = {"formato": "csv"}
-        response = client.get("/reportes/libro-diario/exportar", params=params)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "libro_diario.csv" in response.headers["content-disposition"]
+        lineas = response.text.splitlines()
+        assert lineas[0] == "fecha,tipo,descripcion,monto"
+        assert lineas[1] == "2024-01-15,Ingreso,Pago reserva habitación 101,150.0"
+        assert len(lineas) == 3
+    
+    def test_exportar_libro_diario_ndjson(self, lotes_libro_diario):
+        """Test para exportar libro diario con un objeto JSON por línea"""
+        with patch('app.crud.reportes.iterar_libro_diario', lotes_libro_diario):
+            params = {"formato": "ndjson"}
+            response = client.get("/reportes/libro-diario/exportar", params=params)
         
         assert response.status_code == 200
-        data = response.json()
-        assert "CSV no implementada" in data["mensaje"]
-        assert "datos" in data
+        objetos = [json.loads(linea) for linea in response.text.splitlines()]
+        assert [o["tipo"] for o in objetos] == ["Ingreso", "Egreso"]
+    
+    def test_exportar_libro_diario_parquet(self, lotes_libro_diario):
+        """Test para exportar libro diario en Parquet con tipos fecha y decimal"""
+        pytest.importorskip("pyarrow")
+        import io
+        import pyarrow.parquet as pq
+        
+        def iterar(db, **filtros):
+            async def lotes():
+                yield [(date(2024, 1, 15), "Ingreso", "Pago reserva habitación 101", Decimal("150.00"))]
+            return lotes()
+        
+        with patch('app.crud.reportes.iterar_libro_diario', iterar):
+            response = client.get("/reportes/libro-diario/exportar", params={"formato": "parquet"})
+        
+        assert response.status_code == 200
+        assert "libro_diario.parquet" in response.headers["content-disposition"]
+        tabla = pq.read_table(io.BytesIO(response.content))
+        assert tabla.to_pylist() == [{
+            "fecha": date(2024, 1, 15), "tipo": "Ingreso",
+            "descripcion": "Pago reserva habitación 101", "monto": Decimal("150.00")
+        }]
+    
+    def test_exportar_formato_invalido(self):
+        """Test para rechazar un formato de exportación desconocido"""
+        response = client.get("/reportes/libro-diario/exportar", params={"formato": "xml"})
+        
+        assert response.status_code == 400
+    
+    def test_exportar_registro_huespedes_csv(self, registro_huespedes_mock_data):
+        """Test para exportar el registro de huéspedes en CSV con las columnas del esquema"""
+        def iterar(db, **filtros):
+            assert filtros["documento_identidad"] == "1234567890"
+            async def lotes():
+                yield [tuple(fila.values()) for fila in registro_huespedes_mock_data]
+            return lotes()
+        
+        with patch('app.crud.reportes.iterar_registro_huespedes', iterar):
+            params = {"formato": "csv", "documento_identidad": "1234567890"}
+            response = client.get("/reportes/registro-huespedes/exportar", params=params)
+        
+        assert response.status_code == 200
+        lineas = response.text.splitlines()
+        assert lineas[0].split(",") == list(RegistroHuespedesSchema.model_fields)
+        assert "Juan Pérez" in lineas[1]
 
 
 class TestDashboardEndpoint(TestReportesRoutes):
@@ -333,14 +570,14 @@ class TestDashboardEndpoint(TestReportesRoutes):
     
     @patch('app.crud.reportes.obtener_resumen_financiero')
     @patch('app.crud.reportes.obtener_estadisticas_ocupacion')
-    @patch('app.crud.reportes.obtener_libro_diario')
-    def test_obtener_dashboard(self, mock_libro, mock_estadisticas, mock_resumen,
+    @patch('app.crud.reportes.obtener_ultimos_movimientos')
+    def test_obtener_dashboard(self, mock_movimientos, mock_estadisticas, mock_resumen,
                               resumen_financiero_mock_data, estadisticas_ocupacion_mock_data,
                               libro_diario_mock_data):
         """Test para obtener datos del dashboard"""
         mock_resumen.return_value = resumen_financiero_mock_data
         mock_estadisticas.return_value = estadisticas_ocupacion_mock_data
-        mock_libro.return_value = libro_diario_mock_data
+        mock_movimientos.return_value = libro_diario_mock_data
         
         response = client.get("/reportes/dashboard")
         
@@ -355,21 +592,51 @@ class TestDashboardEndpoint(TestReportesRoutes):
     
     @patch('app.crud.reportes.obtener_resumen_financiero')
     @patch('app.crud.reportes.obtener_estadisticas_ocupacion')
+    @patch('app.crud.reportes.obtener_ultimos_movimientos')
     @patch('app.crud.reportes.obtener_libro_diario')
-    def test_dashboard_ultimos_movimientos_limitados(self, mock_libro, mock_estadisticas, 
-                                                   mock_resumen, libro_diario_mock_data):
-        """Test para verificar que el dashboard limita los últimos movimientos a 10"""
-        # Crear datos mock con más de 10 registros
-        muchos_movimientos = libro_diario_mock_data * 6  # 12 registros
-        mock_libro.return_value = muchos_movimientos
-        mock_resumen.return_value = {}
-        mock_estadisticas.return_value = {}
+    def test_dashboard_ultimos_movimientos_limitados(self, mock_libro, mock_movimientos,
+                                                   mock_estadisticas, mock_resumen, libro_diario_mock_data,
+                                                   resumen_financiero_mock_data,
+                                                   estadisticas_ocupacion_mock_data):
+        """Test para verificar que el dashboard pide a la base solo los últimos 10 movimientos"""
+        mock_movimientos.return_value = libro_diario_mock_data
+        mock_resumen.return_value = resumen_financiero_mock_data
+        mock_estadisticas.return_value = estadisticas_ocupacion_mock_data
         
         response = client.get("/reportes/dashboard")
         
         assert response.status_code == 200
-        data = response.json()
-        assert len(data["ultimos_movimientos"]) == 10
+        assert mock_movimientos.call_args.kwargs["limite"] == 10
+        mock_libro.assert_not_called()
+        assert len(response.json()["ultimos_movimientos"]) == 2
+    
+    def test_dashboard_consultas_concurrentes(self, resumen_financiero_mock_data,
+                                              estadisticas_ocupacion_mock_data):
+        """Test para consultar los reportes a la vez, cada uno en su sesión, e informar Server-Timing"""
+        sesiones = []
+        en_curso = {"actual": 0, "maximo": 0}
+        
+        def consulta(resultado):
+            async def _consulta(db, **kwargs):
+                sesiones.append(db)
+                en_curso["actual"] += 1
+                en_curso["maximo"] = max(en_curso["maximo"], en_curso["actual"])
+                await asyncio.sleep(0.01)
+                en_curso["actual"] -= 1
+                return resultado
+            return _consulta
+        
+        with patch('app.crud.reportes.obtener_resumen_financiero', consulta(resumen_financiero_mock_data)), \
+             patch('app.crud.reportes.obtener_estadisticas_ocupacion', consulta(estadisticas_ocupacion_mock_data)), \
+             patch('app.crud.reportes.obtener_ultimos_movimientos', consulta([])):
+            response = client.get("/reportes/dashboard")
+        
+        assert response.status_code == 200
+        assert en_curso["maximo"] == 3
+        assert len({id(sesion) for sesion in sesiones}) == 3
+        timing = response.headers["Server-Timing"]
+        for nombre in ("resumen", "ocupacion", "movimientos", "total"):
+            assert f"{nombre};dur=" in timing
 
 
 class TestErrorHandling(TestReportesRoutes):
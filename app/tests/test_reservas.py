@@ -1,9 +1,17 @@
 import pytest
 from fastapi.testclient import TestClient
 from datetime import date, timedelta
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException
+from types import SimpleNamespace
+import asyncio
 
 from app.main import app
+from app.crud import reserva as crud_reserva
+from app.crud import transiciones as crud_transiciones
+from app.schemas.reserva import ReservaCreate
+from app.services.versiones import versiones_tablas
+from app.services.indice_reservas import indice_reservas
 
 client = TestClient(app)
 
@@ -40,6 +48,32 @@ class TestReservasEndpoints:
         assert data["habitacion_id"] == 1
         assert data["estado"] == "reservada"
 
+    def test_crear_reserva_fechas_invalidas(self):
+        """Test para rechazar rangos invertidos, estadías de más de un año y fechas fuera del horizonte"""
+        hoy = date.today()
+        for fecha_inicio, fecha_fin in (
+            (hoy + timedelta(days=2), hoy),
+            (hoy, hoy + timedelta(days=366)),
+            (date(1, 1, 1), date(9999, 12, 31)),
+            (hoy + timedelta(days=800), hoy + timedelta(days=802)),
+        ):
+            response = client.post("/reservas/", json={
+                "cliente_id": 1, "habitacion_id": 1,
+                "fecha_inicio": str(fecha_inicio), "fecha_fin": str(fecha_fin)
+            })
+            assert response.status_code == 422
+
+    def test_crear_reserva_estadia_excesiva_en_crud(self):
+        """Test para rechazar en el CRUD una estadía sin acotar antes de generar sus noches"""
+        reserva = ReservaCreate.model_construct(
+            cliente_id=1, habitacion_id=1, fecha_inicio=date(1, 1, 1), fecha_fin=date(9999, 12, 31)
+        )
+        db = AsyncMock()
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(crud_reserva.crear_reserva(db, reserva))
+        assert error.value.status_code == 400
+        db.execute.assert_not_called()
+
     @patch("app.crud.reserva.obtener_reservas")
     def test_listar_reservas(self, mock_obtener_reservas, mock_reserva):
         """Test para listar reservas"""
@@ -50,6 +84,28 @@ class TestReservasEndpoints:
         assert isinstance(data, list)
         assert data[0]["id"] == 1
 
+    @patch("app.crud.reserva.buscar_reservas")
+    def test_buscar_reservas(self, mock_buscar_reservas, mock_reserva):
+        """Test para buscar reservas con filtros y cursor"""
+        mock_buscar_reservas.return_value = ([mock_reserva], 1)
+        response = client.get("/reservas/buscar", params={
+            "habitacion_id": 1, "estado": "reservada", "fecha_inicio": mock_reserva["fecha_inicio"],
+            "cursor": 10, "limite": 1
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"][0]["id"] == 1
+        assert data["siguiente_cursor"] == 1
+        kwargs = mock_buscar_reservas.call_args.kwargs
+        assert kwargs["habitacion_id"] == 1
+        assert kwargs["cursor"] == 10
+        assert kwargs["limite"] == 1
+
+    def test_buscar_reservas_limite_invalido(self):
+        """Test para un tamaño de página fuera de rango"""
+        response = client.get("/reservas/buscar", params={"limite": 0})
+        assert response.status_code == 422
+
     @patch("app.crud.reserva.cancelar_reserva")
     def test_cancelar_reserva_valida(self, mock_cancelar_reserva, mock_reserva):
         """Test para cancelar una reserva existente"""
@@ -68,6 +124,66 @@ class TestReservasEndpoints:
         assert response.status_code == 404
         assert response.json()["detail"] == "Reserva no encontrada"
 
+    @patch("app.crud.transiciones.transicionar_reservas")
+    def test_transicionar_reservas(self, mock_transicionar, mock_reserva):
+        """Test para hacer check-in de un lote de reservas"""
+        mock_reserva["estado"] = "en_curso"
+        mock_transicionar.return_value = ([mock_reserva], [99])
+        response = client.post("/reservas/transiciones", json={"ids": [1, 99], "estado": "en_curso"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["actualizadas"][0]["estado"] == "en_curso"
+        assert data["rechazadas"] == [99]
+        mock_transicionar.assert_called_once()
+
+    def test_lote_en_una_sola_transaccion(self, sesion_falsa):
+        """Test para no aplicar nada del lote si falla la parte de una de sus habitaciones"""
+        indice_reservas.reconstruir([
+            (1, 10, date(2030, 1, 1), date(2030, 1, 3)),
+            (2, 20, date(2030, 1, 1), date(2030, 1, 3)),
+        ])
+        actualizadas = [
+            SimpleNamespace(id=1, habitacion_id=10, fecha_inicio=date(2030, 1, 1), fecha_fin=date(2030, 1, 3)),
+            SimpleNamespace(id=2, habitacion_id=20, fecha_inicio=date(2030, 1, 1), fecha_fin=date(2030, 1, 3)),
+        ]
+        db = sesion_falsa([], actualizadas)
+        db.commit = AsyncMock()
+        db.rollback = AsyncMock()
+        version = versiones_tablas.version("reservas")
+
+        async def registrar_cambios(db, ids, motivo):
+            raise RuntimeError("fallo en la habitación 20")
+
+        try:
+            with patch("app.crud.transiciones.registrar_cambios_reservas", side_effect=registrar_cambios):
+                with pytest.raises(RuntimeError):
+                    asyncio.run(crud_transiciones.transicionar_reservas(db, [2, 1], "cancelada"))
+            quedan = (indice_reservas.habitacion_de(1), indice_reservas.habitacion_de(2))
+        finally:
+            indice_reservas.reconstruir([])
+            indice_reservas.cargado = False
+
+        assert db.sentencias[0].endswith("ORDER BY reservas.id FOR UPDATE")
+        assert "reservas.id IN (2, 1)" in db.sentencias[1]
+        db.commit.assert_not_awaited()
+        db.rollback.assert_awaited_once()
+        assert quedan == (10, 20)
+        assert versiones_tablas.version("reservas") == version
+
+    def test_transicionar_reservas_estado_invalido(self):
+        """Test para una transición a un estado desconocido"""
+        response = client.post("/reservas/transiciones", json={"ids": [1], "estado": "reservada"})
+        assert response.status_code == 422
+
+    def test_estado_colas(self):
+        """Test para consultar la profundidad y espera de las colas por habitación"""
+        response = client.get("/reservas/colas")
+        assert response.status_code == 200
+        data = response.json()
+        assert isinstance(data, list)
+        for carril in data:
+            assert {"habitacion_id", "profundidad", "procesadas", "espera_promedio_ms"} <= carril.keys()
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Tests de concurrencia contra PostgreSQL real.
+
+Requieren la base de datos de DATABASE_URL con las migraciones aplicadas;
+se ejecutan solo con RUN_DB_TESTS=1:
+
+    RUN_DB_TESTS=1 pytest app/tests/test_reservas_concurrencia.py
+"""
+import asyncio
+import os
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from app.main import app
+from app.database import AsyncSessionLocal, engine
+from app.crud import reserva as crud_reserva
+from app.schemas.reserva import ReservaCreate
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("RUN_DB_TESTS") != "1", reason="Requiere PostgreSQL (RUN_DB_TESTS=1)"
+)
+
+SOLICITUDES = 200
+
+
+async def _crear_datos():
+    async with AsyncSessionLocal() as session:
+        cliente_id = (await session.execute(text(
+            "INSERT INTO clientes (nombre, documento_identidad) VALUES ('Concurrencia', :doc) RETURNING id"
+        ), {"doc": uuid.uuid4().hex[:20]})).scalar()
+        habitacion_id = (await session.execute(text(
+            "INSERT INTO habitaciones (numero, tipo, precio_noche, estado) "
+            "VALUES (:numero, 'simple', 50, 'disponible') RETURNING id"
+        ), {"numero": uuid.uuid4().hex[:10]})).scalar()
+        await session.commit()
+    return cliente_id, habitacion_id
+
+
+async def _borrar_datos(cliente_id, habitacion_id):
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("DELETE FROM reservas WHERE habitacion_id = :id"), {"id": habitacion_id})
+        await session.execute(text("DELETE FROM habitaciones WHERE id = :id"), {"id": habitacion_id})
+        await session.execute(text("DELETE FROM clientes WHERE id = :id"), {"id": cliente_id})
+        await session.commit()
+    await engine.dispose()
+
+
+async def _contar_reservas(habitacion_id):
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(text(
+            "SELECT count(*) FROM reservas WHERE habitacion_id = :id AND estado = 'reservada'"
+        ), {"id": habitacion_id})).scalar()
+
+
+class TestReservasConcurrentes:
+    """Cientos de reservas simultáneas sobre la misma habitación"""
+
+    def test_post_reservas_simultaneas(self):
+        """Solo una de las solicitudes simultáneas por las mismas fechas debe crear la reserva"""
+        async def escenario():
+            cliente_id, habitacion_id = await _crear_datos()
+            try:
+                payload = {
+                    "cliente_id": cliente_id,
+                    "habitacion_id": habitacion_id,
+                    "fecha_inicio": str(date.today() + timedelta(days=10)),
+                    "fecha_fin": str(date.today() + timedelta(days=12)),
+                }
+                transport = ASGITransport(app=app)
+                async with AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+                    respuestas = await asyncio.gather(
+                        *(client.post("/reservas/", json=payload) for _ in range(SOLICITUDES))
+                    )
+                codigos = [r.status_code for r in respuestas]
+                return codigos, await _contar_reservas(habitacion_id)
+            finally:
+                await _borrar_datos(cliente_id, habitacion_id)
+
+        codigos, reservas = asyncio.run(escenario())
+        assert codigos.count(200) == 1
+        assert codigos.count(400) == SOLICITUDES - 1
+        assert reservas == 1
+
+    def test_restriccion_exclusion_sin_indice(self):
+        """Sin el índice en memoria, la base de datos rechaza los solapamientos con un 400"""
+        async def escenario():
+            cliente_id, habitacion_id = await _crear_datos()
+            try:
+                async def reservar(desfase):
+                    # Rangos distintos pero solapados entre sí, cada uno en su propia sesión
+                    inicio = date.today() + timedelta(days=30 + desfase % 3)
+                    datos = ReservaCreate(
+                        cliente_id=cliente_id, habitacion_id=habitacion_id,
+                        fecha_inicio=inicio, fecha_fin=inicio + timedelta(days=3),
+                    )
+                    async with AsyncSessionLocal() as session:
+                        try:
+                            await crud_reserva._insertar_reserva(session, datos)
+                            return 200
+                        except HTTPException as exc:
+                            return exc.status_code
+
+                codigos = await asyncio.gather(*(reservar(i) for i in range(SOLICITUDES)))
+                return codigos, await _contar_reservas(habitacion_id)
+            finally:
+                await _borrar_datos(cliente_id, habitacion_id)
+
+        codigos, reservas = asyncio.run(escenario())
+        assert codigos.count(200) == 1
+        assert set(codigos) <= {200, 400}
+        assert reservas == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
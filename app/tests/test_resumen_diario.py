@@ -0,0 +1,60 @@
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.crud import reportes as crud_reportes
+from app.crud.resumen_diario import acumular_ingreso, acumular_egreso
+
+
+class TestResumenDiario:
+    """Tests para el resumen diario de ingresos y egresos"""
+
+    def test_acumular_ingreso_hace_upsert(self, sesion_falsa):
+        """Test para sumar el ingreso a la fila del día con INSERT ... ON CONFLICT"""
+        db = sesion_falsa()
+        asyncio.run(acumular_ingreso(db, date(2024, 1, 10), 150.0))
+        sql = db.sentencias[0]
+        assert "INSERT INTO resumen_diario" in sql
+        assert "ON CONFLICT (fecha) DO UPDATE" in sql
+        assert "total_ingresos = (resumen_diario.total_ingresos +" in sql
+        assert "cantidad_ingresos = (resumen_diario.cantidad_ingresos +" in sql
+        assert "total_egresos =" not in sql
+
+    def test_acumular_egreso_hace_upsert(self, sesion_falsa):
+        """Test para sumar el egreso solo a las columnas de egresos"""
+        db = sesion_falsa()
+        asyncio.run(acumular_egreso(db, date(2024, 1, 10), 40.5))
+        sql = db.sentencias[0]
+        assert "total_egresos = (resumen_diario.total_egresos +" in sql
+        assert "total_ingresos =" not in sql
+
+    def test_resumen_financiero_una_consulta(self, sesion_falsa):
+        """Test para obtener el resumen con una sola consulta y filtros indexables"""
+        db = sesion_falsa([(Decimal("1500.00"), Decimal("450.00"))])
+        resumen = asyncio.run(crud_reportes.obtener_resumen_financiero(
+            db, fecha_inicio=date(2024, 1, 1), fecha_fin=date(2024, 1, 31)
+        ))
+        assert len(db.sentencias) == 1
+        assert "FROM resumen_diario" in db.sentencias[0]
+        assert "IS NULL" not in db.sentencias[0]
+        assert resumen.saldo == Decimal("1050.00")
+        assert resumen.periodo == "2024-01-01 - 2024-01-31"
+
+    def test_serie_agrupa_en_la_base_de_datos(self, sesion_falsa):
+        """Test para agrupar con date_trunc y rellenar períodos con generate_series"""
+        filas = [
+            (date(2024, 1, 1), Decimal("100.00"), Decimal("30.00"), 2, 1),
+            (date(2024, 2, 1), Decimal("0"), Decimal("0"), 0, 0),
+        ]
+        db = sesion_falsa(filas)
+        serie = asyncio.run(crud_reportes.obtener_serie_movimientos(
+            db, "mes", date(2024, 1, 15), date(2024, 2, 10), tipo="Ingreso"
+        ))
+        sql = db.sentencias[0]
+        assert "date_trunc" in sql and "generate_series" in sql
+        assert "FROM resumen_diario" in sql
+        assert db.parametros[0]["unidad"] == "month"
+        assert [p.periodo for p in serie] == [date(2024, 1, 1), date(2024, 2, 1)]
+        assert serie[0].egresos == 0 and serie[0].saldo == Decimal("100.00")
+        assert serie[0].cantidad == 2
@@ -0,0 +1,213 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.trabajos_reportes import (
+    CANCELADO,
+    EN_PROCESO,
+    ERROR,
+    PENDIENTE,
+    TERMINADO,
+    ColaTrabajos,
+    Trabajo,
+)
+
+client = TestClient(app)
+
+COLUMNAS = ("fecha", "tipo", "descripcion", "monto")
+FILA = (date(2024, 1, 15), "Ingreso", "Pago", Decimal("150.00"))
+
+
+@asynccontextmanager
+async def _sesion():
+    yield None
+
+
+def _lectura(lotes, espera=None):
+    """(iterar, contar) de un reporte falso con `lotes` lotes de 3 filas; `espera` los detiene al empezar"""
+    async def iterar(db, **filtros):
+        if espera is not None:
+            await espera.wait()
+        for _ in range(lotes):
+            yield [FILA] * 3
+
+    async def contar(db, **filtros):
+        return lotes * 3
+
+    return iterar, contar
+
+
+def _cola(tmp_path, **opciones) -> ColaTrabajos:
+    return ColaTrabajos(directorio=tmp_path, ejecutor=ThreadPoolExecutor(1), **opciones)
+
+
+async def _esperar(trabajo: Trabajo):
+    await asyncio.wait_for(asyncio.shield(trabajo.tarea), 10)
+
+
+class TestColaTrabajos:
+    """Tests para la cola de trabajos de exportación en segundo plano"""
+    def test_json_completo_en_disco(self, tmp_path):
+        """Test para escribir el JSON completo en disco y registrar el progreso"""
+        async def escenario():
+            cola = _cola(tmp_path)
+            iterar, contar = _lectura(lotes=4)
+            trabajo = cola.encolar("libro_diario", "json", COLUMNAS, iterar, contar, {}, {"periodo": "x"}, _sesion)
+            await _esperar(trabajo)
+            return trabajo
+
+        trabajo = asyncio.run(escenario())
+        assert trabajo.estado == TERMINADO and trabajo.progreso == 100.0
+        assert (trabajo.filas_procesadas, trabajo.total_filas) == (12, 12)
+        datos = json.loads(trabajo.archivo.read_bytes())
+        assert datos["periodo"] == "x" and datos["total_registros"] == 12
+        assert datos["datos"][0] == {"fecha": "2024-01-15", "tipo": "Ingreso", "descripcion": "Pago", "monto": 150.0}
+        assert trabajo.tamano_bytes == trabajo.archivo.stat().st_size
+        assert list(tmp_path.glob("*.parcial")) == []
+
+    def test_formato_en_pool_de_procesos(self, tmp_path):
+        """Test para convertir los lotes en otro proceso (las funciones y filas se pueden enviar)"""
+        async def escenario():
+            cola = ColaTrabajos(directorio=tmp_path, procesos=1)
+            iterar, contar = _lectura(lotes=2)
+            trabajo = cola.encolar("libro_diario", "csv", COLUMNAS, iterar, contar, {}, {}, _sesion)
+            await _esperar(trabajo)
+            await cola.detener()
+            return trabajo
+
+        trabajo = asyncio.run(escenario())
+        lineas = trabajo.archivo.read_text().splitlines()
+        assert lineas[0] == "fecha,tipo,descripcion,monto"
+        assert lineas[1:] == ["2024-01-15,Ingreso,Pago,150.00"] * 6
+
+    def test_trabajos_simultaneos_acotados(self, tmp_path):
+        """Test para dejar pendientes los trabajos que superan el límite de simultáneos"""
+        async def escenario():
+            cola = _cola(tmp_path, simultaneos=1)
+            espera = asyncio.Event()
+            primero = cola.encolar("libro_diario", "ndjson", COLUMNAS, *_lectura(1, espera), {}, {}, _sesion)
+            segundo = cola.encolar("libro_diario", "ndjson", COLUMNAS, *_lectura(1), {}, {}, _sesion)
+            await asyncio.sleep(0.05)
+            estados = (primero.estado, segundo.estado)
+            espera.set()
+            await _esperar(segundo)
+            return estados, segundo.estado
+
+        estados, final = asyncio.run(escenario())
+        assert estados == (EN_PROCESO, PENDIENTE)
+        assert final == TERMINADO
+
+    def test_error_y_cancelacion(self, tmp_path):
+        """Test para registrar el error de un trabajo y borrar el archivo de uno cancelado"""
+        async def escenario():
+            cola = _cola(tmp_path)
+
+            async def contar_falla(db, **filtros):
+                raise RuntimeError("sin conexión")
+
+            iterar, _ = _lectura(1)
+            fallido = cola.encolar("libro_diario", "csv", COLUMNAS, iterar, contar_falla, {}, {}, _sesion)
+            await asyncio.gather(fallido.tarea, return_exceptions=True)
+
+            espera = asyncio.Event()
+            detenido = cola.encolar("libro_diario", "csv", COLUMNAS, *_lectura(1, espera), {}, {}, _sesion)
+            await asyncio.sleep(0.05)
+            cancelado = await cola.cancelar(detenido.id)
+            return fallido, detenido, cancelado, cola
+
+        fallido, detenido, cancelado, cola = asyncio.run(escenario())
+        assert fallido.estado == ERROR and fallido.error == "sin conexión"
+        assert cancelado and detenido.estado == CANCELADO
+        assert cola.obtener(detenido.id) is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_resultados_vencen(self, tmp_path):
+        """Test para descartar el trabajo y su archivo al vencer el resultado"""
+        async def escenario():
+            cola = _cola(tmp_path)
+            trabajo = cola.encolar("libro_diario", "csv", COLUMNAS, *_lectura(1), {}, {}, _sesion)
+            await _esperar(trabajo)
+            trabajo.expira = datetime.now() - timedelta(seconds=1)
+            return cola, trabajo
+
+        cola, trabajo = asyncio.run(escenario())
+        assert cola.obtener(trabajo.id) is None
+        assert not trabajo.archivo.exists()
+
+    def test_limite_de_trabajos_pendientes(self, tmp_path):
+        """Test para rechazar con 429 los trabajos que superan el máximo de pendientes"""
+        async def escenario():
+            cola = _cola(tmp_path, max_pendientes=1)
+            espera = asyncio.Event()
+            cola.encolar("libro_diario", "csv", COLUMNAS, *_lectura(1, espera), {}, {}, _sesion)
+            try:
+                cola.encolar("libro_diario", "csv", COLUMNAS, *_lectura(1), {}, {}, _sesion)
+            finally:
+                await cola.detener()
+
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(escenario())
+        assert error.value.status_code == 429
+
+
+class TestTrabajosEndpoints:
+    """Tests para los endpoints de trabajos de reportes"""
+    @patch("app.routers.reportes.cola_reportes")
+    def test_crear_trabajo(self, mock_cola):
+        """Test para encolar un trabajo y responder 202 con la URL de su estado"""
+        mock_cola.encolar.return_value = Trabajo(id="abc", reporte="registro_huespedes", formato="csv")
+        response = client.post("/reportes/trabajos", json={
+            "reporte": "registro_huespedes", "fecha_inicio": "2024-01-01", "documento_identidad": "123"
+        })
+        assert response.status_code == 202
+        assert response.headers["Location"].endswith("/reportes/trabajos/abc")
+        assert response.json()["estado"] == PENDIENTE
+        args = mock_cola.encolar.call_args.args
+        assert args[:2] == ("registro_huespedes", "csv")
+        assert args[5] == {
+            "fecha_inicio": date(2024, 1, 1), "fecha_fin": None,
+            "documento_identidad": "123", "nombre_cliente": None,
+        }
+
+    def test_filtro_de_otro_reporte(self):
+        """Test para rechazar filtros que no corresponden al reporte pedido"""
+        response = client.post("/reportes/trabajos", json={"reporte": "libro_diario", "nombre_cliente": "Ana"})
+        assert response.status_code == 400
+
+    @patch("app.routers.reportes.cola_reportes")
+    def test_estado_y_descarga(self, mock_cola, tmp_path):
+        """Test para consultar el estado de un trabajo terminado y descargar su archivo"""
+        archivo = tmp_path / "libro_diario_abc.csv"
+        archivo.write_text("fecha,tipo\n")
+        trabajo = Trabajo(id="abc", reporte="libro_diario", formato="csv", estado=TERMINADO, archivo=archivo)
+        mock_cola.obtener.return_value = trabajo
+
+        estado = client.get("/reportes/trabajos/abc").json()
+        assert estado["progreso"] == 100.0
+        assert estado["url_descarga"].endswith("/reportes/trabajos/abc/descarga")
+
+        descarga = client.get("/reportes/trabajos/abc/descarga")
+        assert descarga.status_code == 200
+        assert descarga.text == "fecha,tipo\n"
+        assert "libro_diario_abc.csv" in descarga.headers["Content-Disposition"]
+
+    @patch("app.routers.reportes.cola_reportes")
+    def test_descarga_antes_de_terminar(self, mock_cola):
+        """Test para responder 409 si se descarga un trabajo que no terminó"""
+        mock_cola.obtener.return_value = Trabajo(id="abc", reporte="libro_diario", formato="csv", estado=EN_PROCESO)
+        assert client.get("/reportes/trabajos/abc/descarga").status_code == 409
+
+    @patch("app.routers.reportes.cola_reportes")
+    def test_trabajo_inexistente(self, mock_cola):
+        """Test para responder 404 si el trabajo no existe o ya venció"""
+        mock_cola.obtener.return_value = None
+        assert client.get("/reportes/trabajos/nada").status_code == 404
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.crud import reportes as crud_reportes
+
+
+class TestUltimosMovimientos:
+    """Tests para los últimos movimientos y la paginación de reportes en SQL"""
+
+    def test_ultimos_movimientos_limita_cada_tabla(self, sesion_falsa):
+        """Test para leer solo los N más recientes de ingresos y de egresos"""
+        fila = type("Fila", (), {
+            "fecha": date(2024, 1, 15), "tipo": "Ingreso", "descripcion": "Pago", "monto": Decimal("150.00")
+        })()
+        db = sesion_falsa([fila])
+        movimientos = asyncio.run(crud_reportes.obtener_ultimos_movimientos(db, limite=10))
+
+        sql = db.sentencias[0]
+        assert "UNION ALL" in sql
+        assert "vistadellibro_diario" not in sql
+        assert sql.count("LIMIT 10") == 3
+        assert "ORDER BY ingresos.fecha DESC NULLS LAST, ingresos.id DESC" in sql
+        assert "ORDER BY egresos.fecha DESC NULLS LAST, egresos.id DESC" in sql
+        assert "ORDER BY anon_1.fecha DESC NULLS LAST, anon_1.id DESC" in sql
+        assert movimientos[0].tipo == "Ingreso" and movimientos[0].monto == Decimal("150.00")
+
+    def test_libro_diario_paginado_en_sql(self, sesion_falsa):
+        """Test para aplicar orden, LIMIT y OFFSET en la consulta"""
+        db = sesion_falsa()
+        asyncio.run(crud_reportes.obtener_libro_diario(db, limite=50, desplazamiento=100, orden="asc"))
+
+        sql = db.sentencias[0]
+        assert "ORDER BY vistadellibro_diario.fecha ASC" in sql
+        assert "LIMIT 50 OFFSET 100" in sql
+
+    def test_libro_diario_sin_limite(self, sesion_falsa):
+        """Test para mantener el comportamiento sin paginación por defecto"""
+        db = sesion_falsa()
+        asyncio.run(crud_reportes.obtener_libro_diario(db))
+
+        sql = db.sentencias[0]
+        assert "fecha DESC" in sql
+        assert "LIMIT" not in sql and "OFFSET" not in sql
+
+    def test_registros_paginados_en_sql(self, sesion_falsa):
+        """Test para paginar los registros de huéspedes y ocupación"""
+        db = sesion_falsa()
+        asyncio.run(crud_reportes.obtener_registro_huespedes(db, limite=20))
+        asyncio.run(crud_reportes.obtener_registro_ocupacion(db, limite=20, desplazamiento=40))
+
+        assert "LIMIT 20" in db.sentencias[0]
+        assert "LIMIT 20 OFFSET 40" in db.sentencias[1]
+
+    def test_libro_diario_sin_mapa_de_identidad(self, sesion_falsa):
+        """Test para leer columnas y no fusionar movimientos con igual fecha, tipo y descripción"""
+        fila = (date(2024, 1, 15), "Ingreso", "Pago", Decimal("50.00"))
+        db = sesion_falsa([fila, fila])
+        movimientos = asyncio.run(crud_reportes.obtener_libro_diario(db))
+
+        assert len(movimientos) == 2
+        assert movimientos[0].monto == Decimal("50.00")
+        assert db.sentencias[0].startswith(
+            "SELECT vistadellibro_diario.fecha, vistadellibro_diario.tipo, "
+            "vistadellibro_diario.descripcion, vistadellibro_diario.monto \nFROM"
+        )
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.services.cache_reportes import CacheReportes
+from app.services.un_solo_vuelo import UnSoloVuelo, un_solo_vuelo
+from app.services.versiones import VersionesTablas
+
+
+class TestUnSoloVuelo:
+    """Tests para la coalescencia de consultas idénticas concurrentes"""
+
+    def test_llamadas_identicas_comparten_consulta(self):
+        """Test para ejecutar una sola vez las llamadas concurrentes con los mismos argumentos"""
+        llamadas = []
+
+        @un_solo_vuelo
+        async def consulta(db, fecha_inicio=None, fecha_fin=None):
+            llamadas.append(db)
+            await asyncio.sleep(0.01)
+            return [fecha_inicio, fecha_fin]
+
+        async def escenario():
+            return await asyncio.gather(
+                consulta("sesion-1", fecha_inicio=date(2024, 1, 1)),
+                consulta("sesion-2", date(2024, 1, 1)),
+                consulta("sesion-3", fecha_inicio=date(2024, 1, 1), fecha_fin=None),
+                consulta("sesion-4", fecha_inicio=date(2024, 2, 1)),
+            )
+
+        resultados = asyncio.run(escenario())
+        assert len(llamadas) == 2
+        assert resultados[0] is resultados[1] is resultados[2]
+        assert resultados[3] == [date(2024, 2, 1), None]
+
+    def test_excepcion_llega_a_todos(self):
+        """Test para propagar el error de la consulta compartida a quienes esperaban"""
+        vuelo = UnSoloVuelo()
+
+        async def falla():
+            await asyncio.sleep(0.01)
+            raise ValueError("Error de base de datos")
+
+        async def escenario():
+            return await asyncio.gather(
+                vuelo.ejecutar("k", falla), vuelo.ejecutar("k", falla), return_exceptions=True
+            )
+
+        resultados = asyncio.run(escenario())
+        assert all(isinstance(r, ValueError) for r in resultados)
+        assert (vuelo.ejecutadas, vuelo.compartidas) == (1, 1)
+
+    def test_no_guarda_resultados(self):
+        """Test para volver a consultar cuando ya no hay una llamada en curso"""
+        vuelo = UnSoloVuelo()
+        contador = {"n": 0}
+
+        async def consulta():
+            contador["n"] += 1
+            return contador["n"]
+
+        assert asyncio.run(vuelo.ejecutar("k", consulta)) == 1
+        assert asyncio.run(vuelo.ejecutar("k", consulta)) == 2
+
+    def test_reintenta_si_se_cancela_quien_ejecuta(self):
+        """Test para que quien espera consulte por su cuenta si se cancela la ejecución compartida"""
+        vuelo = UnSoloVuelo()
+
+        async def consulta():
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        async def escenario():
+            primera = asyncio.ensure_future(vuelo.ejecutar("k", consulta))
+            await asyncio.sleep(0)
+            segunda = asyncio.ensure_future(vuelo.ejecutar("k", consulta))
+            await asyncio.sleep(0)
+            primera.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await primera
+            return await segunda
+
+        assert asyncio.run(escenario()) == "ok"
+        assert vuelo.ejecutadas == 2
+
+    def test_escritura_durante_la_consulta_no_queda_en_cache(self):
+        """Test para no unir a una consulta empezada antes de una escritura a quien llega después"""
+        cache = CacheReportes()
+        versiones = VersionesTablas()
+        vuelo = UnSoloVuelo(generacion=lambda: versiones.generacion)
+        base = {"valor": 100}
+        liberar = asyncio.Event()
+
+        async def consulta():
+            valor = base["valor"]  # lo que ve la consulta al empezar
+            await liberar.wait()
+            return valor
+
+        def reporte():
+            return cache.obtener_o_calcular(
+                "saldo", {"ingresos": (None, None)}, lambda: vuelo.ejecutar("saldo", consulta)
+            )
+
+        async def escenario():
+            antes = asyncio.ensure_future(reporte())
+            await asyncio.sleep(0)
+            base["valor"] = 200  # escritura confirmada mientras la primera consulta está en curso
+            versiones.incrementar("ingresos")
+            cache.invalidar("ingresos")
+            despues = asyncio.ensure_future(reporte())
+            await asyncio.sleep(0)
+            liberar.set()
+            return await antes, await despues
+
+        (valor_antes, _), (valor_despues, _) = asyncio.run(escenario())
+        assert valor_antes == 100
+        assert valor_despues == 200
+        assert vuelo.ejecutadas == 2
+        assert cache.obtener("saldo") == (True, 200)
@@ -0,0 +1,171 @@
+import asyncio
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.crud import cuenta as crud_cuenta
+from app.schemas.cuenta import CuentaCreate
+from app.services.versiones import (
+    CATALOGO,
+    PERIODO_CERRADO,
+    SIN_CACHE,
+    VersionesTablas,
+    reservar_proceso,
+    versiones_tablas,
+)
+from app.services.periodos import periodos_cerrados
+from app.services.vistas_reportes import VISTA_LIBRO_DIARIO
+
+client = TestClient(app)
+
+PARAMETRO = {"id": 1, "clave": "IVA", "valor": "15", "descripcion": "Impuesto"}
+HABITACION = {
+    "id": 1, "numero": "101", "tipo": "simple", "precio_noche": 50.0,
+    "estado": "disponible", "reservas_activas": 0,
+}
+
+
+class TestVersionesTablas:
+    def test_etag_cambia_solo_con_sus_tablas(self):
+        versiones = VersionesTablas()
+        etag = versiones.etag(["parametros"], "/parametros")
+        versiones.incrementar("cuentas")
+        assert versiones.etag(["parametros"], "/parametros") == etag
+        versiones.incrementar("parametros")
+        assert versiones.etag(["parametros"], "/parametros") != etag
+
+    def test_etag_fuerte_y_distinto_por_instancia(self):
+        a, b = VersionesTablas(), VersionesTablas()
+        etag = a.etag(["parametros"])
+        assert etag.startswith('"') and etag.endswith('"')
+        # Un reinicio vuelve los contadores a cero, pero no repite ETags
+        assert etag != b.etag(["parametros"])
+
+    def test_escritura_de_cuenta_incrementa_la_version(self):
+        db = MagicMock()
+        db.commit = AsyncMock()
+        db.refresh = AsyncMock()
+        antes = versiones_tablas.version("cuentas")
+        datos = CuentaCreate(codigo="1001", nombre="Caja", tipo="activo", nivel=1)
+        asyncio.run(crud_cuenta.crear_cuenta(db, datos))
+        assert versiones_tablas.version("cuentas") == antes + 1
+
+
+def _motor_con_bloqueo(libre: bool):
+    conexion = MagicMock()
+    conexion.execution_options = AsyncMock(return_value=conexion)
+    conexion.execute = AsyncMock(return_value=MagicMock(scalar=MagicMock(return_value=libre)))
+    conexion.close = AsyncMock()
+    motor = MagicMock()
+    motor.connect = AsyncMock(return_value=conexion)
+    return motor, conexion
+
+
+class TestProcesoUnico:
+    def test_primer_proceso_conserva_la_conexion(self):
+        motor, conexion = _motor_con_bloqueo(libre=True)
+        assert asyncio.run(reservar_proceso(motor)) is conexion
+        assert "pg_try_advisory_lock" in str(conexion.execute.call_args.args[0])
+        conexion.close.assert_not_called()
+
+    def test_segundo_proceso_no_arranca(self):
+        """Test para detener el arranque si otro proceso ya tiene el bloqueo"""
+        motor, conexion = _motor_con_bloqueo(libre=False)
+        with pytest.raises(RuntimeError, match="único proceso"):
+            asyncio.run(reservar_proceso(motor))
+        conexion.close.assert_awaited_once()
+
+
+class TestGetCondicional:
+    @patch("app.crud.parametro.get_parametros")
+    def test_304_sin_consultar(self, mock_get_parametros):
+        mock_get_parametros.return_value = [PARAMETRO]
+        respuesta = client.get("/parametros")
+        assert respuesta.status_code == 200
+        assert respuesta.headers["Cache-Control"] == CATALOGO
+        etag = respuesta.headers["ETag"]
+
+        mock_get_parametros.reset_mock()
+        respuesta = client.get("/parametros", headers={"If-None-Match": etag})
+        assert respuesta.status_code == 304
+        assert respuesta.content == b""
+        assert respuesta.headers["ETag"] == etag
+        mock_get_parametros.assert_not_called()
+
+    @patch("app.crud.parametro.get_parametros")
+    def test_escritura_invalida_el_etag(self, mock_get_parametros):
+        mock_get_parametros.return_value = [PARAMETRO]
+        etag = client.get("/parametros").headers["ETag"]
+        versiones_tablas.incrementar("parametros")
+        respuesta = client.get("/parametros", headers={"If-None-Match": etag})
+        assert respuesta.status_code == 200
+        assert respuesta.headers["ETag"] != etag
+
+    @patch("app.crud.parametro.get_parametros")
+    def test_if_none_match_con_lista_y_etag_debil(self, mock_get_parametros):
+        mock_get_parametros.return_value = [PARAMETRO]
+        etag = client.get("/parametros").headers["ETag"]
+        respuesta = client.get("/parametros", headers={"If-None-Match": f'"otro", W/{etag}'})
+        assert respuesta.status_code == 304
+
+    @patch("app.crud.parametro.get_parametros")
+    def test_query_distinta_otro_etag(self, mock_get_parametros):
+        mock_get_parametros.return_value = [PARAMETRO]
+        etag = client.get("/parametros").headers["ETag"]
+        assert client.get("/parametros?limit=10").headers["ETag"] != etag
+
+    @patch("app.crud.parametro.create_parametro")
+    @patch("app.crud.parametro.get_parametro_by_clave")
+    def test_escrituras_sin_etag(self, mock_get_by_clave, mock_crear):
+        mock_get_by_clave.return_value = None
+        mock_crear.return_value = PARAMETRO
+        respuesta = client.post("/parametros", json={"clave": "IVA", "valor": "15"}, headers={"If-None-Match": "*"})
+        assert respuesta.status_code == 201
+        assert "ETag" not in respuesta.headers
+
+    @patch("app.crud.habitacion.obtener_habitaciones")
+    def test_habitaciones_dependen_de_reservas(self, mock_obtener):
+        mock_obtener.return_value = [HABITACION]
+        respuesta = client.get("/habitaciones/")
+        assert respuesta.headers["Cache-Control"] == SIN_CACHE
+        etag = respuesta.headers["ETag"]
+        assert client.get("/habitaciones/", headers={"If-None-Match": etag}).status_code == 304
+        versiones_tablas.incrementar("reservas")
+        assert client.get("/habitaciones/", headers={"If-None-Match": etag}).status_code == 200
+
+
+class TestReportesCondicionales:
+    @patch("app.crud.reportes.obtener_libro_diario")
+    def test_politica_segun_periodo(self, mock_libro):
+        """Test para cachear solo los rangos dentro de un período cerrado"""
+        mock_libro.return_value = []
+        periodos_cerrados.reconstruir([(1, date(2024, 1, 1), date(2024, 1, 31))])
+        cerrado = client.get("/reportes/libro-diario?fecha_inicio=2024-01-01&fecha_fin=2024-01-31")
+        parcial = client.get("/reportes/libro-diario?fecha_inicio=2024-01-15&fecha_fin=2024-02-05")
+        sin_inicio = client.get("/reportes/libro-diario?fecha_fin=2024-01-31")
+        pasado = client.get(f"/reportes/libro-diario?fecha_fin={date.today() - timedelta(days=1)}")
+        assert cerrado.headers["Cache-Control"] == PERIODO_CERRADO
+        assert parcial.headers["Cache-Control"] == SIN_CACHE
+        assert sin_inicio.headers["Cache-Control"] == SIN_CACHE
+        assert pasado.headers["Cache-Control"] == SIN_CACHE
+
+    @patch("app.crud.reportes.obtener_registro_ocupacion")
+    def test_reportes_de_reservas_siempre_se_revalidan(self, mock_ocupacion):
+        """Test para revalidar los reportes de reservas aunque el período esté cerrado"""
+        mock_ocupacion.return_value = []
+        periodos_cerrados.reconstruir([(1, date(2024, 1, 1), date(2024, 1, 31))])
+        respuesta = client.get("/reportes/registro-ocupacion?fecha_inicio=2024-01-01&fecha_fin=2024-01-31")
+        assert respuesta.status_code == 200
+        assert respuesta.headers["Cache-Control"] == SIN_CACHE
+
+    @patch("app.crud.reportes.obtener_libro_diario")
+    def test_refresco_de_vista_invalida_el_etag(self, mock_libro):
+        mock_libro.return_value = []
+        ruta = "/reportes/libro-diario?fecha_inicio=2024-01-01&fecha_fin=2024-01-31"
+        etag = client.get(ruta).headers["ETag"]
+        assert client.get(ruta, headers={"If-None-Match": etag}).status_code == 304
+        versiones_tablas.incrementar(VISTA_LIBRO_DIARIO)
+        assert client.get(ruta, headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from app.services.vistas_reportes import (
+    RefrescoVistas,
+    VISTA_LIBRO_DIARIO,
+    VISTA_REGISTRO_HUESPEDES,
+    VISTA_REGISTRO_OCUPACION,
+)
+
+
+class TestRefrescoVistas:
+    """Tests para el refresco de las vistas materializadas de reportes"""
+
+    def test_marcar_por_tabla(self):
+        """Test para marcar solo las vistas que dependen de la tabla modificada"""
+        refresco = RefrescoVistas()
+        refresco.marcar("ingresos")
+        _, desfase = refresco.estado([VISTA_LIBRO_DIARIO])
+        assert desfase >= 0
+        assert VISTA_LIBRO_DIARIO in refresco._pendientes
+        assert VISTA_REGISTRO_HUESPEDES not in refresco._pendientes
+
+    def test_refrescar_pendientes(self, sesion_falsa):
+        """Test para refrescar solo las vistas pendientes y registrar la hora"""
+        refresco = RefrescoVistas()
+        refresco.marcar("reservas")
+        db = sesion_falsa()
+        asyncio.run(refresco.refrescar_pendientes(lambda: db))
+
+        assert sorted(db.sentencias) == sorted(
+            f"REFRESH MATERIALIZED VIEW CONCURRENTLY {vista}"
+            for vista in (VISTA_REGISTRO_HUESPEDES, VISTA_REGISTRO_OCUPACION)
+        )
+        actualizado, desfase = refresco.estado([VISTA_REGISTRO_HUESPEDES, VISTA_REGISTRO_OCUPACION])
+        assert actualizado is not None
+        assert desfase == 0.0
+        # El libro diario nunca se refrescó: no hay fecha que informar
+        assert refresco.estado([VISTA_LIBRO_DIARIO, VISTA_REGISTRO_HUESPEDES])[0] is None
+
+    def test_refresco_fallido_queda_pendiente(self, sesion_falsa):
+        """Test para conservar la vista pendiente si el refresco falla"""
+        refresco = RefrescoVistas()
+        refresco.marcar("egresos")
+        with pytest.raises(RuntimeError):
+            asyncio.run(refresco.refrescar_pendientes(lambda: sesion_falsa(fallar=True)))
+        assert VISTA_LIBRO_DIARIO in refresco._pendientes
+        assert refresco.estado([VISTA_LIBRO_DIARIO])[0] is None
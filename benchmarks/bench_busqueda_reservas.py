@@ -0,0 +1,78 @@
+"""Benchmark: latencia de GET /reservas/buscar según el tamaño de la tabla.
+
+Uso:
+    python -m benchmarks.bench_busqueda_reservas
+    python -m benchmarks.bench_busqueda_reservas --tamanios 10000 100000
+
+Usa DATABASE_URL del .env y la migración 0004 (índices de búsqueda). Los datos
+se insertan en una transacción que se revierte al final. Con paginación por
+cursor el tiempo por página debe mantenerse plano entre 10k y 5M reservas.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.reserva import buscar_reservas
+from benchmarks.datos import DIAS_POR_RESERVA, FECHA_BASE, sembrar_reservas
+
+TAMANIOS = (10_000, 100_000, 1_000_000, 5_000_000)
+POR_HABITACION = 100
+
+
+async def medir(total: int, repeticiones: int, limite: int) -> dict:
+    # Importación diferida: crea el motor a partir de DATABASE_URL
+    from app.database import engine
+
+    rnd = random.Random(42)
+    tiempos = {"sin filtros": [], "habitación": [], "fechas": [], "página 20": []}
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            primera, habitaciones = await sembrar_reservas(conn, total, POR_HABITACION)
+            db = AsyncSession(bind=conn, expire_on_commit=False)
+            dias = POR_HABITACION * DIAS_POR_RESERVA
+
+            async def cronometrar(clave, **filtros):
+                t0 = time.perf_counter()
+                items, siguiente = await buscar_reservas(db, limite=limite, **filtros)
+                tiempos[clave].append((time.perf_counter() - t0) * 1000)
+                db.expunge_all()
+                return siguiente
+
+            for _ in range(repeticiones):
+                await cronometrar("sin filtros")
+                await cronometrar("habitación", habitacion_id=primera + rnd.randrange(habitaciones))
+                inicio = FECHA_BASE + timedelta(days=rnd.randrange(dias))
+                await cronometrar("fechas", fecha_inicio=inicio, fecha_fin=inicio + timedelta(days=7))
+
+            # Recorrer 20 páginas: la última cuesta lo mismo que la primera
+            cursor = None
+            for _ in range(20):
+                cursor = await cronometrar("página 20", cursor=cursor)
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+    return {clave: statistics.median(valores) for clave, valores in tiempos.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanios", type=int, nargs="+", default=TAMANIOS, help="Reservas a sembrar")
+    parser.add_argument("--repeticiones", type=int, default=50, help="Búsquedas por tipo y tamaño")
+    parser.add_argument("--limite", type=int, default=50, help="Reservas por página")
+    args = parser.parse_args()
+
+    columnas = ("sin filtros", "habitación", "fechas", "página 20")
+    print(f"{'reservas':>10} " + " ".join(f"{c + ' (ms)':>17}" for c in columnas))
+    for total in args.tamanios:
+        resultado = asyncio.run(medir(total, args.repeticiones, args.limite))
+        print(f"{total:>10,} " + " ".join(f"{resultado[c]:>17.2f}" for c in columnas))
+
+
+if __name__ == "__main__":
+    main()
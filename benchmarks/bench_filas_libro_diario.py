@@ -0,0 +1,84 @@
+"""Benchmark: filas por segundo al leer el libro diario, con entidades ORM o con filas Core.
+
+Uso:
+    python -m benchmarks.bench_filas_libro_diario
+    python -m benchmarks.bench_filas_libro_diario --filas 100000
+
+Siembra la vista del libro diario como tabla en SQLite en memoria (sin servidor)
+y compara el camino anterior (select de la entidad, mapa de identidad y
+validación desde atributos) con el actual (select de columnas y esquemas
+armados desde las filas). Lo que se mide es el costo del lado de Python, que es
+el mismo con PostgreSQL.
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.crud.reportes import COLUMNAS_LIBRO_DIARIO, _columnas, _construir
+from app.models.reportes import VistaLibroDiario
+from app.schemas.reportes import LibroDiarioSchema
+
+FILAS = 1_000_000
+LOTE_SIEMBRA = 50_000
+
+
+def sembrar(engine, total: int) -> None:
+    VistaLibroDiario.__table__.create(engine)
+    base = date(2024, 1, 1)
+    with engine.begin() as conn:
+        for desde in range(0, total, LOTE_SIEMBRA):
+            conn.execute(insert(VistaLibroDiario), [
+                {
+                    "fecha": base + timedelta(days=i % 365),
+                    "tipo": "Ingreso" if i % 3 else "Egreso",
+                    # Descripciones distintas: con la clave falsa, las repetidas se fusionarían
+                    "descripcion": f"Movimiento {i}",
+                    "monto": Decimal(i % 1000) + Decimal("0.50"),
+                    "movimiento_id": i,
+                }
+                for i in range(desde, min(desde + LOTE_SIEMBRA, total))
+            ])
+
+
+def leer_entidades(engine) -> int:
+    """Camino anterior: entidades ORM validadas por el response_model"""
+    with Session(engine) as db:
+        entidades = db.execute(select(VistaLibroDiario)).scalars().all()
+        return len([LibroDiarioSchema.model_validate(e) for e in entidades])
+
+
+def leer_filas(engine) -> int:
+    """Camino actual: filas Core y esquemas construidos sin validar"""
+    with engine.connect() as conn:
+        filas = conn.execute(select(*_columnas(VistaLibroDiario, COLUMNAS_LIBRO_DIARIO))).all()
+        return len(_construir(LibroDiarioSchema, COLUMNAS_LIBRO_DIARIO, filas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=FILAS, help="Filas del libro diario a sembrar")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Lecturas por camino (se toma la mejor)")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    sembrar(engine, args.filas)
+
+    print(f"{'camino':>10} {'filas':>10} {'segundos':>10} {'filas/s':>12}")
+    for nombre, leer in (("ORM", leer_entidades), ("Core", leer_filas)):
+        mejor = None
+        for _ in range(args.repeticiones):
+            t0 = time.perf_counter()
+            leidas = leer(engine)
+            transcurrido = time.perf_counter() - t0
+            mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+        print(f"{nombre:>10} {leidas:>10,} {mejor:>10.2f} {leidas / mejor:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark: índice en memoria vs. consulta SQL de conflictos de reservas.
+
+Uso:
+    python -m benchmarks.bench_indice_reservas            # solo índice en memoria
+    python -m benchmarks.bench_indice_reservas --sql      # también la consulta SQL original
+
+Con --sql se usa DATABASE_URL del .env; los datos se insertan en una
+transacción que se revierte al final.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import timedelta
+
+from sqlalchemy import and_, or_, select
+
+from app.models.reserva import Reserva
+from app.services.indice_reservas import IndiceReservas
+from benchmarks.datos import DIAS_POR_RESERVA, FECHA_BASE, generar_reservas, sembrar_reservas
+
+TAMANIOS = (10_000, 100_000, 1_000_000)
+POR_HABITACION = 100
+
+
+def consultas_aleatorias(habitaciones: int, cantidad: int, primera_habitacion: int = 1):
+    """Rangos de 1 a 4 noches sobre habitaciones y fechas al azar"""
+    rnd = random.Random(42)
+    dias = POR_HABITACION * DIAS_POR_RESERVA
+    for _ in range(cantidad):
+        inicio = FECHA_BASE + timedelta(days=rnd.randrange(dias))
+        yield primera_habitacion + rnd.randrange(habitaciones), inicio, inicio + timedelta(days=rnd.randint(1, 4))
+
+
+def medir_indice(total: int, cantidad: int) -> dict:
+    indice = IndiceReservas()
+    t0 = time.perf_counter()
+    indice.reconstruir(generar_reservas(total, POR_HABITACION))
+    carga = time.perf_counter() - t0
+
+    consultas = list(consultas_aleatorias(total // POR_HABITACION, cantidad))
+    t0 = time.perf_counter()
+    conflictos = sum(indice.hay_conflicto(*c) for c in consultas)
+    duracion = time.perf_counter() - t0
+    return {"carga_s": carga, "us_por_consulta": duracion / cantidad * 1e6, "conflictos": conflictos}
+
+
+async def medir_sql(total: int, cantidad: int) -> dict:
+    # Importación diferida: crea el motor a partir de DATABASE_URL
+    from app.database import engine
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            primera, habitaciones = await sembrar_reservas(conn, total, POR_HABITACION)
+            consultas = list(consultas_aleatorias(habitaciones, cantidad, primera))
+            t0 = time.perf_counter()
+            conflictos = 0
+            for habitacion_id, fecha_inicio, fecha_fin in consultas:
+                # Misma consulta que usaba crear_reserva antes del índice
+                result = await conn.execute(
+                    select(Reserva.id).where(
+                        Reserva.habitacion_id == habitacion_id,
+                        Reserva.estado == "reservada",
+                        or_(
+                            and_(Reserva.fecha_inicio <= fecha_inicio, Reserva.fecha_fin > fecha_inicio),
+                            and_(Reserva.fecha_inicio < fecha_fin, Reserva.fecha_fin >= fecha_fin),
+                            and_(Reserva.fecha_inicio >= fecha_inicio, Reserva.fecha_fin <= fecha_fin),
+                        )
+                    )
+                )
+                conflictos += bool(result.first())
+            duracion = time.perf_counter() - t0
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+    return {"us_por_consulta": duracion / cantidad * 1e6, "conflictos": conflictos}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sql", action="store_true", help="Medir también la consulta SQL original")
+    parser.add_argument("--consultas", type=int, default=20_000, help="Consultas en memoria por tamaño")
+    parser.add_argument("--consultas-sql", type=int, default=500, help="Consultas SQL por tamaño")
+    args = parser.parse_args()
+
+    print(f"{'reservas':>10} {'carga índice (s)':>17} {'índice (µs)':>12} {'SQL (µs)':>10}")
+    for total in TAMANIOS:
+        indice = medir_indice(total, args.consultas)
+        sql = asyncio.run(medir_sql(total, args.consultas_sql)) if args.sql else None
+        print(
+            f"{total:>10,} {indice['carga_s']:>17.3f} {indice['us_por_consulta']:>12.2f} "
+            f"{sql['us_por_consulta'] if sql else float('nan'):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
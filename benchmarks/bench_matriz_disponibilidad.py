@@ -0,0 +1,89 @@
+"""Benchmark: matriz de disponibilidad tipo × noche para los canales.
+
+Uso:
+    python -m benchmarks.bench_matriz_disponibilidad
+    python -m benchmarks.bench_matriz_disponibilidad --habitaciones 2000 --dias 730
+
+Compara la matriz con arreglos de diferencias y suma acumulada contra
+recorrer noche por noche cada reserva en Python, y mide el tamaño y el
+tiempo de serialización de la respuesta en JSON y en binario. No usa la
+base de datos.
+"""
+import argparse
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from app.services.disponibilidad import matriz_disponibilidad
+
+TIPOS = ("simple", "doble", "triple", "suite", "familiar")
+
+
+def generar_datos(habitaciones: int, dias: int, inicio: date):
+    """Estadías de 1 a 7 noches con huecos de 0 a 3 noches, para cada habitación"""
+    rnd = random.Random(42)
+    por_tipo = defaultdict(int)
+    reservas = []
+    for numero in range(habitaciones):
+        tipo = TIPOS[numero % len(TIPOS)]
+        por_tipo[tipo] += 1
+        noche = rnd.randint(-7, 3)
+        while noche < dias:
+            estadia = rnd.randint(1, 7)
+            reservas.append((tipo, inicio + timedelta(days=noche), inicio + timedelta(days=noche + estadia)))
+            noche += estadia + rnd.randint(0, 3)
+    return dict(por_tipo), reservas
+
+
+def matriz_por_noche(por_tipo, reservas, inicio: date, dias: int):
+    """Referencia: sumar cada noche de cada reserva (equivale a una consulta por fecha)"""
+    ocupadas = {tipo: [0] * dias for tipo in por_tipo}
+    for tipo, fecha_inicio, fecha_fin in reservas:
+        fila = ocupadas[tipo]
+        for n in range(max((fecha_inicio - inicio).days, 0), min((fecha_fin - inicio).days, dias)):
+            fila[n] += 1
+    return {tipo: [por_tipo[tipo] - o for o in fila] for tipo, fila in ocupadas.items()}
+
+
+def cronometrar(funcion, repeticiones: int):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return resultado, mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--habitaciones", type=int, default=2000)
+    parser.add_argument("--dias", type=int, default=730)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    inicio = date(2025, 1, 1)
+    por_tipo, reservas = generar_datos(args.habitaciones, args.dias, inicio)
+    print(f"{args.habitaciones:,} habitaciones, {args.dias} noches, {len(reservas):,} reservas")
+
+    (tipos, matriz), ms_vector = cronometrar(
+        lambda: matriz_disponibilidad(por_tipo, reservas, inicio, args.dias), args.repeticiones
+    )
+    referencia, ms_noche = cronometrar(lambda: matriz_por_noche(por_tipo, reservas, inicio, args.dias), 1)
+    assert all(matriz[i].tolist() == referencia[tipo] for i, tipo in enumerate(tipos))
+
+    cuerpo_json, ms_json = cronometrar(
+        lambda: json.dumps({"tipos": tipos, "disponibles": matriz.tolist()}, separators=(",", ":")).encode(),
+        args.repeticiones,
+    )
+    cuerpo_binario, ms_binario = cronometrar(lambda: matriz.astype("<i4").tobytes(), args.repeticiones)
+
+    print(f"{'matriz (diferencias + cumsum)':<32} {ms_vector:>10.1f} ms")
+    print(f"{'matriz (noche por noche)':<32} {ms_noche:>10.1f} ms")
+    print(f"{'serializar JSON':<32} {ms_json:>10.2f} ms {len(cuerpo_json):>10,} bytes")
+    print(f"{'serializar binario':<32} {ms_binario:>10.2f} ms {len(cuerpo_binario):>10,} bytes")
+
+
+if __name__ == "__main__":
+    main()
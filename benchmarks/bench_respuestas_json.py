@@ -0,0 +1,137 @@
+"""Benchmark: p50 y p99 de la serialización JSON de listas grandes.
+
+Uso:
+    python -m benchmarks.bench_respuestas_json
+    python -m benchmarks.bench_respuestas_json --filas 10000 --repeticiones 50
+
+Mide GET /reservas/, /clientes/ y /reportes/libro-diario con `--filas` registros
+en memoria (el CRUD se reemplaza: no hace falta base de datos), de punta a
+punta por la aplicación ASGI. Compara:
+
+- entidades: el CRUD devuelve objetos con atributos (como las entidades ORM)
+  y el response_model los valida desde atributos, fila por fila;
+- esquemas: el CRUD arma los esquemas desde filas Core (camino actual) y la
+  respuesta por defecto los serializa directo a bytes en el núcleo de Pydantic;
+- orjson: los mismos esquemas con ORJSONResponse como clase de respuesta, que
+  pasa por jsonable_encoder y luego por orjson.
+"""
+import argparse
+import statistics
+import time
+import warnings
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.routers import cliente, reportes, reserva
+from app.schemas.cliente import Cliente
+from app.schemas.reportes import LibroDiarioSchema
+from app.schemas.reserva import ReservaRead
+
+FILAS = 50_000
+RUTAS = ("/reservas/", "/clientes/", "/reportes/libro-diario")
+
+
+def _entidades(filas: int) -> dict:
+    base = date(2024, 1, 1)
+    reservas = [
+        SimpleNamespace(
+            id=i, cliente_id=i % 5000, habitacion_id=i % 200, estado="reservada",
+            fecha_inicio=base + timedelta(days=i % 365), fecha_fin=base + timedelta(days=i % 365 + 3),
+            fecha_reserva=datetime(2023, 12, 1, 10, 30),
+        )
+        for i in range(filas)
+    ]
+    clientes = [
+        SimpleNamespace(
+            id=i, nombre=f"Cliente {i}", documento_identidad=f"{i:010d}",
+            correo=f"cliente{i}@correo.com", telefono="0999123456",
+        )
+        for i in range(filas)
+    ]
+    libro = [
+        LibroDiarioSchema.model_construct(
+            fecha=base + timedelta(days=i % 365), tipo="Ingreso" if i % 3 else "Egreso",
+            descripcion=f"Movimiento {i}", monto=Decimal(i % 1000) + Decimal("0.50"),
+        )
+        for i in range(filas)
+    ]
+    return {"reservas": reservas, "clientes": clientes, "libro": libro}
+
+
+def _esquemas(entidades: dict) -> dict:
+    return {
+        "reservas": [ReservaRead.model_construct(**vars(r)) for r in entidades["reservas"]],
+        "clientes": [Cliente.model_construct(**vars(c)) for c in entidades["clientes"]],
+        "libro": entidades["libro"],
+    }
+
+
+def _aplicacion(clase_respuesta=None) -> FastAPI:
+    aplicacion = FastAPI(default_response_class=clase_respuesta) if clase_respuesta else FastAPI()
+    for modulo in (reserva, cliente, reportes):
+        aplicacion.include_router(modulo.router)
+    return aplicacion
+
+
+def medir(aplicacion: FastAPI, datos: dict, repeticiones: int) -> dict:
+    async def reservas(db):
+        return datos["reservas"]
+
+    async def clientes(db):
+        return datos["clientes"]
+
+    async def libro(db, **filtros):
+        return datos["libro"]
+
+    resultado = {}
+    with patch("app.crud.reserva.obtener_reservas", reservas), \
+         patch("app.crud.cliente.list_clientes", clientes), \
+         patch("app.crud.reportes.obtener_libro_diario", libro):
+        client = TestClient(aplicacion)
+        for ruta in RUTAS:
+            client.get(ruta)  # Calentamiento
+            tiempos = []
+            for _ in range(repeticiones):
+                t0 = time.perf_counter()
+                respuesta = client.get(ruta)
+                tiempos.append((time.perf_counter() - t0) * 1000)
+                assert respuesta.status_code == 200, respuesta.text
+            tiempos.sort()
+            resultado[ruta] = (
+                statistics.median(tiempos),
+                tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))],
+            )
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=FILAS, help="Registros por respuesta")
+    parser.add_argument("--repeticiones", type=int, default=30, help="Solicitudes por ruta")
+    args = parser.parse_args()
+
+    entidades = _entidades(args.filas)
+    esquemas = _esquemas(entidades)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        from fastapi.responses import ORJSONResponse
+        variantes = [
+            ("entidades", _aplicacion(), entidades),
+            ("esquemas", _aplicacion(), esquemas),
+            ("orjson", _aplicacion(ORJSONResponse), esquemas),
+        ]
+
+    print(f"{'variante':>10} {'ruta':>24} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for nombre, aplicacion, datos in variantes:
+        for ruta, (p50, p99) in medir(aplicacion, datos, args.repeticiones).items():
+            print(f"{nombre:>10} {ruta:>24} {p50:>10.1f} {p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
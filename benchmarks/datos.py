@@ -0,0 +1,46 @@
+"""Generación de datos sintéticos para los benchmarks.
+
+Los datos en base de datos se insertan dentro de una transacción que el
+benchmark revierte al terminar, así que no quedan rastros en la BD configurada.
+"""
+from datetime import date, timedelta
+from typing import Iterator, Tuple
+
+from sqlalchemy import text
+
+FECHA_BASE = date(2000, 1, 1)
+DIAS_POR_RESERVA = 3  # 2 noches de estadía + 1 noche libre entre reservas
+
+
+def generar_reservas(total: int, por_habitacion: int = 100) -> Iterator[Tuple[int, int, date, date]]:
+    """Generar (id, habitacion_id, fecha_inicio, fecha_fin) sin solapamientos por habitación"""
+    habitaciones = max(1, total // por_habitacion)
+    for i in range(total):
+        habitacion_id = i % habitaciones + 1
+        inicio = FECHA_BASE + timedelta(days=(i // habitaciones) * DIAS_POR_RESERVA)
+        yield i + 1, habitacion_id, inicio, inicio + timedelta(days=2)
+
+
+async def sembrar_reservas(conn, total: int, por_habitacion: int = 100) -> Tuple[int, int]:
+    """Insertar habitaciones y reservas sintéticas; retorna (primer_habitacion_id, cantidad)"""
+    habitaciones = max(1, total // por_habitacion)
+    cliente_id = (await conn.execute(text(
+        "INSERT INTO clientes (nombre, documento_identidad) "
+        "VALUES ('Benchmark', 'BENCH-' || md5(random()::text)) RETURNING id"
+    ))).scalar()
+    primera = (await conn.execute(text(
+        "INSERT INTO habitaciones (numero, tipo, precio_noche, estado) "
+        "SELECT 'Z' || g, 'simple', 50, 'disponible' FROM generate_series(1, :n) g "
+        "RETURNING id"
+    ), {"n": habitaciones})).scalars().all()[0]
+    await conn.execute(text(
+        "INSERT INTO reservas (cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado) "
+        "SELECT :cliente_id, :primera + (g % :habs), "
+        "       :base + (g / :habs) * :paso, :base + (g / :habs) * :paso + 2, 'reservada' "
+        "FROM generate_series(0, :total - 1) g"
+    ), {
+        "cliente_id": cliente_id, "primera": primera, "habs": habitaciones,
+        "base": FECHA_BASE, "paso": DIAS_POR_RESERVA, "total": total,
+    })
+    await conn.execute(text("ANALYZE reservas"))
+    return primera, habitaciones